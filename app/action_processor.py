@@ -1,23 +1,33 @@
 from app.game_object import GameObject
+from app.handle import unpack
 from app.intractable import Intractable
 from app.location import Location
 from app.container import Container
 from app.npc import Npc
-from app.sound_manager import SoundManager
 from app.transition import Transition
 from app.player import Player
 from app.journal import Journal
+from app.location_graph import LocationGraph
+from app.metrics import Metrics
+from app.sound_manager import SoundManager
 
 class ActionProcessor:
     """Processes commands from the user and executes them returning the results.
     """    
-    def __init__(self, sound_manager: SoundManager):
+    def __init__(self, sound_manager: SoundManager = None, location_graph: LocationGraph = None, metrics: Metrics = None,
+                 reloader=None):
         """Initializes the ActionProcessor class.
 
         Args:
-            sound_manager (SoundManager): Instance of the SoundManager class.
+            sound_manager (SoundManager, optional): Instance of the SoundManager class, None when running without audio.
+            location_graph (LocationGraph, optional): Paths between the session's locations, None disables travel.
+            metrics (Metrics, optional): Metrics the session is instrumented with, reported by stats.
+            reloader (WorldReloader, optional): Reloader of the world's data, None disables reload.
         """        
         self.soundManager = sound_manager
+        self.location_graph = location_graph
+        self.metrics = metrics
+        self.reloader = reloader
 
     def look(self, search_location: Location, game_objects: dict[str, GameObject], *args) -> str:
         """Command to look at the current location or a specific object.
@@ -31,21 +41,16 @@ class ActionProcessor:
         """
         if args:
             looking_for = args[0]
-            entities = [
-                game_objects[f'{kind}s'][obj_id]
-                for kind, obj_id
-                in search_location.entities
-                if game_objects[f'{kind}s'][obj_id].name == looking_for
-            ]
-            if entities:
-                if isinstance(entities[0], Container):
-                    container = entities[0]
+            entity = search_location.index.find(looking_for)
+            if entity:
+                if isinstance(entity, Container):
+                    container = entity
                     if container.inventory:
                         text = f'{container.description}\n\tinventory:'
-                        for kind, obj_id in container.inventory:
-                            text = f'{text}\n\t\t{game_objects[f"{kind}s"][obj_id].name}'
+                        for handle in container.inventory:
+                            text = f'{text}\n\t\t{game_objects.resolve(handle).name}'
                         return text
-                return entities[0].description
+                return entity.description
             return f"You can't seem to find any {looking_for}s here, try using the help command."
 
     def music(self, *args) -> str:
@@ -54,6 +59,8 @@ class ActionProcessor:
         Returns:
             str: Result of the command, or error message.
         """        
+        if self.soundManager is None:
+            return 'sound is not available'
         if args:
             if "pause" == args[0]:  # Spacebar to play/pause music
                 if self.soundManager.sound_enabled:
@@ -85,26 +92,12 @@ class ActionProcessor:
         """        
         if args:
             talking = args[0]
-            journals = [
-                game_objects[f'{kind}s'][obj_id]
-                for kind, obj_id
-                in search_location.entities
-                if game_objects[f'{kind}s'][obj_id].name == talking 
-                and isinstance(game_objects[f'{kind}s'][obj_id], Journal)
-            ]
-            npcs = [
-                game_objects[f'{kind}s'][obj_id]
-                for kind, obj_id
-                in search_location.entities
-                if game_objects[f'{kind}s'][obj_id].name == talking 
-                and isinstance(game_objects[f'{kind}s'][obj_id], Npc)
-            ]
-            if journals:
-                journal = journals[0]
+            journal = search_location.index.find(talking, Journal)
+            npc = search_location.index.find(talking, Npc)
+            if journal:
                 text = f'IMPORTTANT:\n\t{journal.story}\n\n Journal log:\n\t{journal.dialogue}'
                 return text
-            elif npcs:
-                npc = npcs[0]
+            elif npc:
                 text = f'{npc.dialogue}'
                 return text
 
@@ -123,20 +116,107 @@ class ActionProcessor:
         """ 
         if args:
             moving = args[0]
-            transitions: list[Transition] = [
-                game_objects[f'{kind}s'][obj_id]
-                for kind, obj_id
-                in search_location.entities
-                if game_objects[f'{kind}s'][obj_id].name == moving
-                and isinstance(game_objects[f'{kind}s'][obj_id], Transition)
-            ]
-            if transitions:
-                transition: Transition = transitions[0] 
+            transition: Transition = search_location.index.find(moving, Transition)
+            if transition:
                 if not transition.blocked:
-                    return transition.target
+                    return unpack(transition.target)
                 return f"You can't go that way because the {moving} is {transition.state}"
             return f"You can't move to the {moving}, try using the help command."
 
+    def travel(self, search_location: Location, game_objects: dict[str, GameObject], *args) -> tuple[str, int, str] or str:
+        """Command to take the first move on the shortest open way to a location.
+
+        Only one move is taken per command so the events of every location on
+        the way run as if the player had moved there.
+
+        Args:
+            search_location (Location): Location object the player is in.
+            game_objects (dict[str, GameObject]): Dictionary of game objects.
+
+        Returns:
+            tuple[str, int, str] or str: Reference to the next location and a message, or error message.
+        """
+        if not args:
+            return 'Invalid usage of command [travel]. requires a location. please use the help command for more information'
+        if self.location_graph is None:
+            return "You can't find your bearings."
+        name = ' '.join(args)
+        destination = self.location_graph.find(name)
+        if destination is None:
+            return f"You don't know of any place called {name}."
+        name = game_objects['locations'][destination].name
+        if destination == search_location.obj_id:
+            return f"You are already at {name}."
+        path = self.location_graph.path(search_location.obj_id, destination)
+        if path is None:
+            return f"You can't find a way to {name} from here."
+        transition = game_objects.resolve(path[0])
+        if len(path) == 1:
+            message = f"You arrive at {name} through the {transition.name}."
+        else:
+            message = f"You head for {name} through the {transition.name}, {len(path) - 1} more to go."
+        return (*unpack(transition.target), message)
+
+    def reachable(self, search_location: Location, game_objects: dict[str, GameObject], *args) -> str:
+        """God mode command listing where the player can get to, or the way to one location.
+
+        Args:
+            search_location (Location): Location object the player is in.
+            game_objects (dict[str, GameObject]): Dictionary of game objects.
+
+        Returns:
+            str: Reachable locations with their distance, or the path to the named location.
+        """
+        if self.location_graph is None:
+            return "You can't find your bearings."
+        source = search_location.obj_id
+        if args:
+            name = ' '.join(args)
+            destination = self.location_graph.find(name)
+            if destination is None:
+                return f"There is no location called {name}."
+            path = self.location_graph.path(source, destination)
+            if path is None:
+                return f"{game_objects['locations'][destination].name} can't be reached from {search_location.name}."
+            steps = [search_location.name]
+            for handle in path:
+                transition = game_objects.resolve(handle)
+                steps.append(f"{transition.name}|{transition.obj_id}")
+                steps.append(game_objects['locations'][unpack(transition.target)[1]].name)
+            return ' -> '.join(steps)
+        distances = self.location_graph.reachable(source)
+        lines = [f"reachable from {search_location.name}:"]
+        for location_id, moves in sorted(distances.items(), key=lambda item: (item[1], item[0])):
+            if location_id != source:
+                lines.append(f"\t{game_objects['locations'][location_id].name}|{location_id}, {moves} move{'s' if moves != 1 else ''}")
+        unreachable = [f"{location.name}|{location.obj_id}" for location in game_objects['locations'].values() if location.obj_id not in distances]
+        if unreachable:
+            lines.append(f"unreachable: {', '.join(unreachable)}")
+        return '\n'.join(lines)
+
+    def stats(self, game_objects: dict[str, GameObject]) -> str:
+        """God mode command to report the metrics of the session's process.
+
+        Args:
+            game_objects (dict[str, GameObject]): Dictionary of game objects.
+
+        Returns:
+            str: Stage timings, command latencies and event counts, or error message.
+        """
+        if self.metrics is None:
+            return 'metrics are not being collected, start the game with --metrics'
+        return self.metrics.format(game_objects.get('events'))
+
+    def reload(self) -> str:
+        """God mode command to reload the data files that changed since the game started.
+
+        Returns:
+            str: Files reloaded and the warnings about them, or why nothing was reloaded.
+        """
+        if self.reloader is None:
+            return 'reloading is not enabled, start the game with --reload'
+        return self.reloader.report()
+
     def invalid(self) -> str:
         """Invalid command error message.
 
@@ -158,55 +238,27 @@ class ActionProcessor:
         if args:
             if len(args) == 1:
                 looking_for = args[0]
-                items = [
-                    (kind, obj_id)
-                    for kind, obj_id
-                    in search_location.entities
-                    if game_objects[f'{kind}s'][obj_id].name == looking_for
-                    and not isinstance(game_objects[f'{kind}s'][obj_id], Transition)
-                    and not isinstance(game_objects[f'{kind}s'][obj_id], Npc)
-                ]
+                item = search_location.index.find(looking_for, exclude=(Transition, Npc))
                 player = game_objects['players'][0]
-                if items:
-                    item = items[0]
-                    player.inventory.append(
-                        search_location.entities.pop(search_location.entities.index(item))
-                    )
-                    kind, obj_id = item
-                    return f"You pickup the {game_objects[f'{kind}s'][obj_id].name}."
+                if item:
+                    player.add_item(search_location.remove_entity(item))
+                    return f"You pickup the {item.name}."
                 return f"You can't pick up the {looking_for}."
             if len(args) == 2:
                 looking_for = args[0]
-                container = args[1]
-                containers = [
-                    game_objects[f'{kind}s'][obj_id]
-                    for kind, obj_id
-                    in search_location.entities
-                    if game_objects[f'{kind}s'][obj_id].name == container
-                ]
+                container_name = args[1]
+                container = search_location.index.find(container_name)
                 player = game_objects['players'][0]
-                if containers:
-                    container = containers[0]
+                if container:
                     if not isinstance(container, Container):
                         return f"{container.name.capitalize()} is not a container."
-                    items = [
-                        (kind, obj_id)
-                        for kind, obj_id
-                        in container.inventory
-                        if game_objects[f'{kind}s'][obj_id].name == looking_for
-                        and not isinstance(game_objects[f'{kind}s'][obj_id], Location)
-                        and not isinstance(game_objects[f'{kind}s'][obj_id], Npc)
-                    ]
-                    if items:
-                        item = items[0]
-                        player.inventory.append(
-                            container.inventory.pop(container.inventory.index(item))
-                        )
-                        kind, obj_id = item
-                        return f"You take the {game_objects[f'{kind}s'][obj_id].name} from inside the {container.name}."
+                    item = container.index.find(looking_for, exclude=(Location, Npc))
+                    if item:
+                        player.add_item(container.remove_item(item))
+                        return f"You take the {item.name} from inside the {container.name}."
 
                     return f"You can't take the {looking_for} from the {container.name}"
-                return f"You can't seem to find a {container} here."
+                return f"You can't seem to find a {container_name} here."
 
     def drop(self, search_location: Location, game_objects: dict[str, GameObject], *args) -> str:
         """Command to drop items from the player's inventory or a container.
@@ -222,49 +274,25 @@ class ActionProcessor:
             if len(args) == 1:
                 looking_for = args[0]
                 player = game_objects['players'][0]
-                items = [
-                    (kind, obj_id)
-                    for kind, obj_id
-                    in player.inventory
-                    if game_objects[f'{kind}s'][obj_id].name == looking_for
-                ]
-                if items:
-                    item = items[0]
-                    search_location.entities.append(
-                        player.inventory.pop(player.inventory.index(item))
-                    )
-                    kind, obj_id = item
-                    return f"You drop the {game_objects[f'{kind}s'][obj_id].name} on the ground."
+                item = player.index.find(looking_for)
+                if item:
+                    search_location.add_entity(player.remove_item(item))
+                    return f"You drop the {item.name} on the ground."
                 return f"You don't have a {looking_for}."
             if len(args) == 2:
                 looking_for = args[0]
-                container = args[1]
-                containers = [
-                                game_objects[f'{kind}s'][obj_id]
-                                for kind, obj_id
-                                in search_location.entities
-                                if game_objects[f'{kind}s'][obj_id].name == container
-                             ]
+                container_name = args[1]
+                container = search_location.index.find(container_name)
                 player = game_objects['players'][0]
-                if containers:
-                    container = containers[0]
+                if container:
                     if not isinstance(container, Container):
                         return f"{container.name.capitalize()} is not a container."
-                    items = [
-                                (kind, obj_id)
-                                for kind, obj_id
-                                in player.inventory
-                                if game_objects[f'{kind}s'][obj_id].name == looking_for
-                            ]
-                    if items:
-                        item = items[0]
-                        container.inventory.append(
-                            player.inventory.pop(player.inventory.index(item))
-                        )
-                        kind, obj_id = item
-                        return f"You put the {game_objects[f'{kind}s'][obj_id].name} in the {container.name}."
+                    item = player.index.find(looking_for)
+                    if item:
+                        container.add_item(player.remove_item(item))
+                        return f"You put the {item.name} in the {container.name}."
                     return f"You don't have a {looking_for}."
-                return f"You can't seem to find a {container} here."
+                return f"You can't seem to find a {container_name} here."
 
     def inventory(self, game_objects: dict[str, GameObject], *args) -> str:
         """Command to view the player's inventory.
@@ -278,65 +306,29 @@ class ActionProcessor:
         player: Player = game_objects['players'][0]
         if len(args) == 1:
             looking_for = args[0]
-            player = game_objects['players'][0]
-            items = [
-                (kind, obj_id)
-                for kind, obj_id
-                in player.inventory
-                if game_objects[f'{kind}s'][obj_id].name == looking_for
-            ]
-            if items:
-                item = items[0]
-                kind, obj_id = item
-                item_obj = game_objects[f'{kind}s'][obj_id]
+            item_obj = player.index.find(looking_for)
+            if item_obj:
                 text = f"{item_obj.name}: {item_obj.description}"
-                if kind == 'container':
-                    items = [
-                        (kind, obj_id)
-                        for kind, obj_id
-                        in item_obj.inventory
-                    ]
-                    if items:
+                if item_obj.kind == 'container':
+                    if item_obj.inventory:
                         text = f'{text}\n\tinventory:'
-                        for item in items:
-                            kind, obj_id = item
-                            text = f"{text}\n\t\t{game_objects[f'{kind}s'][obj_id].name}"
+                        for handle in item_obj.inventory:
+                            text = f"{text}\n\t\t{game_objects.resolve(handle).name}"
                 return text
             return f"You don't have a {looking_for}."
         if len(args) == 2:
             looking_for = args[1]
-            player = game_objects['players'][0]
-            containers = [
-                game_objects[f'{kind}s'][obj_id]
-                for kind, obj_id
-                in player.inventory
-                if game_objects[f'{kind}s'][obj_id].name == args[0]
-                and isinstance(game_objects[f'{kind}s'][obj_id], Container)
-            ]
-            if containers:
-                container = containers[0]
-                items = [
-                    (kind, obj_id)
-                    for kind, obj_id
-                    in container.inventory
-                    if game_objects[f'{kind}s'][obj_id].name == looking_for
-                ]
-                if items:
-                    item = items[0]
-                    kind, obj_id = item
-                    return f"{game_objects[f'{kind}s'][obj_id].name}: {game_objects[f'{kind}s'][obj_id].description}"
+            container = player.index.find(args[0], Container)
+            if container:
+                item = container.index.find(looking_for)
+                if item:
+                    return f"{item.name}: {item.description}"
             return f"You don't have a {looking_for}."
 
-        items = [
-            (kind, obj_id)
-            for kind, obj_id
-            in player.inventory
-        ]
-        if items:
+        if player.inventory:
             text = '\ninventory:'
-            for item in items:
-                kind, obj_id = item
-                text = f"{text}\n\t{game_objects[f'{kind}s'][obj_id].name}"
+            for handle in player.inventory:
+                text = f"{text}\n\t{game_objects.resolve(handle).name}"
             return text
         return "Your inventory is empty."
 
@@ -352,48 +344,23 @@ class ActionProcessor:
         """        
         if len(args) == 1:
             target = args[0]
-            intractables: list[Intractable] = [
-                game_objects[f'{kind}s'][obj_id]
-                for kind, obj_id
-                in search_location.entities
-                if game_objects[f'{kind}s'][obj_id].name == target
-                and isinstance(game_objects[f'{kind}s'][obj_id], Intractable)
-            ]
-            if intractables:
-                intractable: Intractable = intractables[0]
+            intractable: Intractable = search_location.index.find(target, Intractable)
+            if intractable:
                 return intractable.cycle()
             return f"You can't use the {target} right now."
         if len(args) == 2:
             key_name = args[0]
             target_name = args[1]
 
-            keys = [
-                (kind, obj_id)
-                for kind, obj_id
-                in search_location.entities
-                if game_objects[f'{kind}s'][obj_id].name == key_name
-            ]
-            if not keys:
+            key = search_location.index.find(key_name)
+            if not key:
                 player = game_objects['players'][0]
-                keys = [
-                    (kind, obj_id)
-                    for kind, obj_id
-                    in player.inventory
-                    if game_objects[f'{kind}s'][obj_id].name == key_name
-                ]
-            if not keys:
+                key = player.index.find(key_name)
+            if not key:
                 return f"You don't have a {key_name} and there isn't one near you either."
-            targets = [
-                game_objects[f'{kind}s'][obj_id] 
-                for kind, obj_id
-                in search_location.entities
-                if game_objects[f'{kind}s'][obj_id].name == target_name
-                and isinstance(game_objects[f'{kind}s'][obj_id], Intractable)
-            ]
-            if targets:
-                key = keys[0]
-                target: Intractable = targets[0]
-                return target.unlock(key, key_name)
+            target: Intractable = search_location.index.find(target_name, Intractable)
+            if target:
+                return target.unlock(key.handle, key_name)
             return f"There isn't a {target_name} here."
 
         if len(args) < 1:
@@ -426,6 +393,14 @@ class ActionProcessor:
         if command == 'talk':
             return self.talk(search_location, game_objects, *args)
         if command == 'music':
-            return self.music(game_state, *args)
+            return self.music(*args)
+        if command == 'travel':
+            return self.travel(search_location, game_objects, *args)
+        if command == 'reachable' and game_state['god_mode']:
+            return self.reachable(search_location, game_objects, *args)
+        if command == 'stats' and game_state['god_mode']:
+            return self.stats(game_objects)
+        if command == 'reload' and game_state['god_mode']:
+            return self.reload()
         return self.invalid()
     
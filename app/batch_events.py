@@ -0,0 +1,311 @@
+#imports
+from app.container import Container
+from app.entity import Entity
+from app.event import Event
+from app.event_scheduler import EventScheduler, EventIndex, MAX_ROUNDS
+from app.game_session import GameSession, StepResult
+from app.handle import KIND_MASK, unpack
+from app.state_store import StateStore
+from app.world import World
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CompiledEvent:
+    """An event's triggers and change rewritten as column slots and codes of a StateStore."""
+    __slots__ = ('event', 'active_slot', 'conditions', 'changes', 'text')
+
+    def __init__(self, event: Event, active_slot: int, conditions: list[tuple], changes: list[tuple], text: str) -> None:
+        self.event = event
+        self.active_slot = active_slot
+        self.conditions = conditions
+        self.changes = changes
+        self.text = text
+
+
+class DeferredEvents:
+    """Stands in for a session's EventScheduler and leaves the turn's events to a BatchEvents pass.
+
+    God mode turns still go to the scheduler, they need the failure diagnostics.
+    """
+    def __init__(self, scheduler: EventScheduler) -> None:
+        self.scheduler = scheduler
+        self.location = None
+
+    def process(self, current_location: int, god_mode: bool) -> str:
+        if god_mode:
+            return self.scheduler.process(current_location, god_mode)
+        self.location = current_location
+        return ''
+
+
+class BatchEvents:
+    """Evaluates the events of a batch of StateStore sessions with NumPy.
+
+    Every trigger condition is compiled to an integer comparison on the store's
+    columns: state codes for 'state', the holder column of the members for
+    'inventory' and the player locations of the batch for 'current_location'.
+    Events are still taken one at a time in dependency order, so an event sees
+    the changes of the events before it exactly like a full pass does, but
+    each is tested and applied for the whole batch with a few array
+    operations. Events activated or deactivated by a later event are checked
+    again in further passes over only the sessions and events concerned, the
+    way EventScheduler settles them, and fire at most once per turn.
+    """
+    def __init__(self, store: StateStore) -> None:
+        """Initializes the BatchEvents class.
+
+        Args:
+            store (StateStore): Store holding the state of every session in a batch.
+        """
+        if np is None:
+            raise RuntimeError('batched event evaluation requires numpy')
+        self.store = store
+        events = store.template.get('events', {})
+        index: EventIndex = store.template.shared('event_index', EventIndex)
+        self.dependents = index.dependents
+        self.active = store.code('active')
+        self.events = [self.compile(events[event_id]) for event_id in index.order]
+
+    def compile(self, event: Event) -> CompiledEvent:
+        store = self.store
+        template = store.template
+        conditions = []
+        for trigger in event.triggers:
+            kind, obj_id = unpack(trigger.object)
+            if obj_id not in template.get(f'{kind}s', {}):
+                # Sample events in the data name objects that do not exist, they can never pass
+                conditions.append(('never',))
+                continue
+            trigger_obj = template.resolve(trigger.object)
+            state_conditions = trigger.conditions.get('state', False)
+            if state_conditions:
+                if 'is' in state_conditions:
+                    conditions.append(('state_is', store.state_slots[trigger.object], store.code(state_conditions['is'])))
+                if 'is_not' in state_conditions:
+                    conditions.append(('state_is_not', store.state_slots[trigger.object], store.code(state_conditions['is_not'])))
+
+            inventory_conditions = trigger.conditions.get('inventory', False)
+            if inventory_conditions and isinstance(trigger_obj, Container):
+                row = store.owner_slots[trigger.object]
+                if 'item' in inventory_conditions:
+                    required = list(inventory_conditions['item'])
+                    if any(handle not in store.member_slots for handle in required):
+                        conditions.append(('never',))
+                    elif required:
+                        conditions.append(('has', row, [store.member_slots[handle] for handle in required]))
+                    else:
+                        conditions.append(('not_empty', row))
+                if 'no_item' in inventory_conditions:
+                    forbidden = [store.member_slots[handle] for handle in inventory_conditions['no_item'] if handle in store.member_slots]
+                    if forbidden:
+                        conditions.append(('lacks', row, forbidden))
+
+            location_conditions = trigger.conditions.get('current_location', False)
+            if location_conditions:
+                if 'is' in location_conditions:
+                    conditions.append(('location_is', location_conditions['is']))
+                if 'is_not' in location_conditions:
+                    conditions.append(('location_is_not', location_conditions['is_not']))
+
+        changes = []
+        for handle in event.affected_objects:
+            kind, obj_id = unpack(handle)
+            if obj_id not in template.get(f'{kind}s', {}):
+                continue
+            affected = template.resolve(handle)
+            if event.change.state and isinstance(affected, Entity):
+                changes.append(('state', handle, store.state_slots[handle], store.code(event.change.state)))
+            if event.change.inventory and isinstance(affected, Container):
+                row = store.owner_slots[handle]
+                for member in event.change.inventory.get('item', ()):
+                    changes.append(('add', handle, row, store.member_slots[member]))
+                for member in event.change.inventory.get('no_item', ()):
+                    if member in store.member_slots:
+                        changes.append(('remove', handle, row, store.member_slots[member]))
+        return CompiledEvent(event, store.state_slots[event.handle], conditions, changes, f'\n{event.description}')
+
+    def held(self, holder, ids, batch: dict[int, int], row: int, slots: list[int]):
+        # Returns a bool per session of the batch and slot, whether the owner holds the member
+        held = holder[np.ix_(ids, slots)] == row + 1
+        extra = self.store.extra
+        for session, position in batch.items():
+            members = extra.get(session, {}).get(row)
+            if members:
+                for column, slot in enumerate(slots):
+                    if slot in members:
+                        held[position, column] = True
+        return held
+
+    def test(self, condition: tuple, state, holder, head, ids, batch: dict[int, int], locations):
+        # Returns a bool per session of the batch
+        test = condition[0]
+        if test == 'state_is':
+            return state[ids, condition[1]] == condition[2]
+        if test == 'state_is_not':
+            return state[ids, condition[1]] != condition[2]
+        if test == 'has':
+            return self.held(holder, ids, batch, condition[1], condition[2]).all(axis=1)
+        if test == 'not_empty':
+            passed = head[ids, condition[1]] != 0
+            extra = self.store.extra
+            for session, position in batch.items():
+                if condition[1] in extra.get(session, ()):
+                    passed[position] = True
+            return passed
+        if test == 'lacks':
+            return ~self.held(holder, ids, batch, condition[1], condition[2]).any(axis=1)
+        if test == 'location_is':
+            return locations == condition[1]
+        if test == 'location_is_not':
+            return locations != condition[1]
+        return np.zeros(len(ids), dtype=bool)
+
+    def evaluate(self, worlds: list[World], locations: list[int]) -> list[str]:
+        """Runs a full pass over the events for every session of the batch.
+
+        Args:
+            worlds (list[World]): Worlds of the sessions, from StateStore.world().
+            locations (list[int]): Location of the player of each session.
+
+        Returns:
+            list[str]: Event text of each session for the turn.
+        """
+        store = self.store
+        texts = [[] for _ in worlds]
+        if not worlds or not self.events:
+            return ['' for _ in worlds]
+
+        ids = np.array([world.session for world in worlds], dtype=np.intp)
+        locations = np.array(locations)
+        batch = {session: position for position, session in enumerate(ids.tolist())}
+        # Views over the columns, dropped before returning so the arrays can grow again
+        state = np.frombuffer(store.state, dtype=f'u{store.state.itemsize}').reshape(-1, len(store.initial_state))
+        holder, seq, link = (np.frombuffer(column, dtype=f'u{column.itemsize}').reshape(-1, store.width) for column in (store.holder, store.seq, store.link))
+        head, tail = (np.frombuffer(column, dtype=f'u{column.itemsize}').reshape(-1, len(store.owner_slots)) for column in (store.head, store.tail))
+        clock = np.frombuffer(store.clock, dtype=f'u{store.clock.itemsize}')
+        try:
+            # None is the first pass over every event, later passes only hold the masks of the sessions to check
+            pending = None
+            # Sessions each event fired for this turn
+            fired = {}
+            for _ in range(MAX_ROUNDS):
+                rerun = {}
+                for position, compiled in enumerate(self.events):
+                    if pending is None:
+                        mask = None
+                    else:
+                        mask = pending.get(position)
+                        if mask is None:
+                            continue
+                    passed = state[ids, compiled.active_slot] == self.active
+                    if mask is not None:
+                        passed &= mask
+                    if position in fired:
+                        passed &= ~fired[position]
+                    for condition in compiled.conditions:
+                        if not passed.any():
+                            break
+                        passed &= self.test(condition, state, holder, head, ids, batch, locations)
+                    positions = np.flatnonzero(passed)
+                    if not len(positions):
+                        continue
+                    rows = ids[positions]
+                    fired[position] = fired[position] | passed if position in fired else passed
+                    for change, handle, target, value in compiled.changes:
+                        if change == 'state':
+                            slot, code = target, value
+                            changed = positions[state[rows, slot] != code]
+                            state[rows, slot] = code
+                        elif change == 'add':
+                            row, slot = target, value
+                            # Members held nowhere are appended to the owner's list for the whole batch at once
+                            free = (holder[rows, slot] == 0) & ~self.held(holder, ids, batch, row, [slot])[positions, 0]
+                            appended = rows[free]
+                            last = tail[appended, row].astype(np.intp)
+                            linked = last != 0
+                            link[appended[linked], last[linked] - 1] = slot + 1
+                            head[appended[~linked], row] = slot + 1
+                            tail[appended, row] = slot + 1
+                            holder[appended, slot] = row + 1
+                            seq[appended, slot] = clock[appended]
+                            link[appended, slot] = 0
+                            clock[appended] += 1
+                            for session in appended.tolist():
+                                store.indexed(session, row, slot, True)
+                            for session in rows[~free].tolist():
+                                store.add_member(session, handle, store.member_handles[slot])
+                            changed = positions
+                        else:
+                            row, slot = target, value
+                            changed = positions[self.held(holder, ids, batch, row, [slot])[positions, 0]]
+                            for session in ids[changed].tolist():
+                                store.remove_member(session, handle, store.member_handles[slot])
+                        for session in changed:
+                            worlds[session].touch(handle)
+                        if len(changed):
+                            self.propagate(handle, position, changed, len(ids), pending, rerun)
+                    for session in positions:
+                        texts[session].append(compiled.text)
+                pending = rerun
+                if not pending:
+                    break
+        finally:
+            del state, holder, seq, link, head, tail, clock
+        return [''.join(text) for text in texts]
+
+    def propagate(self, handle: int, position: int, changed, count: int, pending: dict, rerun: dict) -> None:
+        """Marks the sessions whose events depending on a changed object must be checked again.
+
+        The first pass checks every event after position anyway, later passes
+        only check what was marked. Events before position are only checked
+        again when their own state changed.
+        """
+        control = handle & KIND_MASK == Event.code
+        if pending is None and not control:
+            return
+        mask = np.zeros(count, dtype=bool)
+        mask[changed] = True
+        for dependent in self.dependents.get(handle, ()):
+            if dependent > position:
+                if pending is not None:
+                    pending[dependent] = pending[dependent] | mask if dependent in pending else mask
+            elif dependent < position and control:
+                rerun[dependent] = rerun[dependent] | mask if dependent in rerun else mask
+
+    def install(self, session: GameSession) -> None:
+        """Defers the events of a session's turns to step()."""
+        if not isinstance(session.event_scheduler, DeferredEvents):
+            session.event_scheduler = DeferredEvents(session.event_scheduler)
+
+    def step(self, sessions: list[GameSession], lines: list[str]) -> list[StepResult]:
+        """Steps a batch of sessions by one command each, evaluating their events together.
+
+        Args:
+            sessions (list[GameSession]): Sessions set up with install(), at most once each.
+            lines (list[str]): Command of each session.
+
+        Returns:
+            list[StepResult]: Result of each session, as step() would return it.
+        """
+        results = []
+        for session, line in zip(sessions, lines):
+            session.event_scheduler.location = None
+            results.append(session.step(line))
+
+        pending = [position for position, session in enumerate(sessions) if session.event_scheduler.location is not None]
+        texts = self.evaluate(
+            [sessions[position].game_objects for position in pending],
+            [sessions[position].event_scheduler.location for position in pending]
+        )
+        for position, text in zip(pending, texts):
+            session = sessions[position]
+            result = results[position]
+            # The event text always ends the turn's text, events may also change the status line
+            result.text += text
+            session.game_state['previous_text'] += text
+            result.status = session.status()
+        return results
@@ -0,0 +1,344 @@
+#imports
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+from array import array
+from collections.abc import Mapping, Sequence
+from app.loader import TEXT_FILES, OBJECT_TYPES, OBJECT_BUILDERS, DATA_DIR, shape_text, load_data, load_game_objects
+from app.event_scheduler import EventIndex
+from app.world import World
+from app.game_object import GameObject
+from app.text_store import TextStore, TextRef
+from app.world_compiler import Problem
+
+MAGIC = b'STRANDED'
+BUNDLE_VERSION = 3
+HEADER = struct.Struct('<8sII')  # magic, format version, directory length
+# Strings under these record keys are stored once in the string table and only decoded when read
+TEXT_FIELDS = {'description', 'story', 'dialogue', 'state_descriptions', 'state_transitions', 'message'}
+
+
+class BundleError(Exception):
+    pass
+
+
+def source_files(data_dir: str) -> list[str]:
+    return [os.path.join(data_dir, f'{name}.txt') for name in TEXT_FILES] + \
+           [os.path.join(data_dir, f'{object_type}.json') for object_type in OBJECT_TYPES]
+
+
+def source_stats(data_dir: str) -> dict[str, list[int]]:
+    """Returns the size and mtime of every source file that exists, keyed by file name."""
+    stats = {}
+    for source in source_files(data_dir):
+        try:
+            stat = os.stat(source)
+        except OSError:
+            continue
+        stats[os.path.basename(source)] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+def source_hash(data_dir: str) -> str:
+    digest = hashlib.sha256()
+    for source in source_files(data_dir):
+        with open(source, 'rb') as source_file:
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+class StringTable:
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.strings: list[bytes] = []
+
+    def add(self, text: str) -> int:
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.strings)
+            self.strings.append(text.encode('utf-8'))
+        return string_id
+
+    def intern(self, value: any, is_text: bool = False) -> any:
+        # Swap the strings of text fields in a record for {"$": string id} references
+        if isinstance(value, dict):
+            return {key: self.intern(item, is_text or key in TEXT_FIELDS) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.intern(item, is_text) for item in value]
+        if is_text and isinstance(value, str):
+            return {'$': self.add(value)}
+        return value
+
+
+def align(buffer: bytearray) -> None:
+    buffer.extend(b'\0' * (-len(buffer) % 8))
+
+
+def build_bundle(data_dir: str = DATA_DIR, bundle_path: str = None) -> str:
+    """Compiles the data directory into a single versioned bundle.
+
+    Layout: a header, a JSON directory, then 8 byte aligned binary areas. The
+    string table is an offsets array followed by the UTF-8 blob, it holds the
+    scene texts and every string under a record text field. Every object
+    section is an obj_id array, a record offsets array and the compact JSON
+    records, so any record can be decoded on its own.
+
+    The data is compiled first, bundle worlds are built lazily and trust
+    that their references were checked here. The names of the objects and the
+    event index are stored in the directory, so starting a session does not
+    build every object to get them.
+
+    Args:
+        data_dir (str, optional): Directory holding the source data files. Defaults to DATA_DIR.
+        bundle_path (str, optional): Output path. Defaults to world.bundle in data_dir.
+
+    Returns:
+        str: Path of the written bundle.
+
+    Raises:
+        WorldError: If a reference or state name in the data is broken.
+    """
+    objects = load_game_objects(load_data(data_dir))
+    if bundle_path is None:
+        bundle_path = os.path.join(data_dir, 'world.bundle')
+    stats = source_stats(data_dir)
+
+    table = StringTable()
+    texts = {}
+    for name in TEXT_FILES:
+        with open(os.path.join(data_dir, f'{name}.txt'), 'r', encoding='utf-8') as text_file:
+            texts[name] = table.add(text_file.read())
+
+    body = bytearray()
+    sections = {}
+    for object_type in OBJECT_TYPES:
+        with open(os.path.join(data_dir, f'{object_type}.json'), 'r', encoding='utf-8') as loading:
+            records = json.load(loading)
+        blobs = [
+            json.dumps(table.intern(record), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            for record in records
+        ]
+        offsets = array('I', [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        section = {'count': len(records)}
+        if object_type != 'events':
+            section['names'] = [game_obj.name for game_obj in objects[object_type].values()]
+        align(body)
+        section['ids'] = len(body)
+        body.extend(array('q', [record['obj_id'] for record in records]).tobytes())
+        section['offsets'] = len(body)
+        body.extend(offsets.tobytes())
+        section['records'] = len(body)
+        body.extend(b''.join(blobs))
+        sections[object_type] = section
+
+    align(body)
+    strings = {'count': len(table.strings), 'offsets': len(body)}
+    offsets = array('I', [0])
+    for string in table.strings:
+        offsets.append(offsets[-1] + len(string))
+    body.extend(offsets.tobytes())
+    strings['blob'] = len(body)
+    body.extend(b''.join(table.strings))
+
+    directory = {
+        'byteorder': sys.byteorder,
+        'source_hash': source_hash(data_dir),
+        'source_stats': stats,
+        'event_index': objects.shared('event_index', EventIndex).snapshot(),
+        'problems': [[problem.severity, problem.where, problem.message] for problem in objects.problems],
+        'texts': texts,
+        'sections': sections,
+        'strings': strings,
+    }
+    directory_bytes = json.dumps(directory, separators=(',', ':')).encode('utf-8')
+    head = bytearray(HEADER.pack(MAGIC, BUNDLE_VERSION, len(directory_bytes)) + directory_bytes)
+    align(head)
+
+    temporary_path = f'{bundle_path}.tmp'
+    with open(temporary_path, 'wb') as bundle_file:
+        bundle_file.write(head)
+        bundle_file.write(body)
+    os.replace(temporary_path, bundle_path)
+    return bundle_path
+
+
+class Bundle:
+    """Memory-mapped world bundle, records are only decoded when asked for.
+
+    Text fields of decoded records are TextRefs into the bundle's TextStore, so
+    a description or journal entry is only decoded once a player reads it.
+    """
+    def __init__(self, bundle_path: str) -> None:
+        self.path = bundle_path
+        with open(bundle_path, 'rb') as bundle_file:
+            try:
+                self.map = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:
+                raise BundleError(f'{bundle_path} is empty') from error
+        if len(self.map) < HEADER.size:
+            raise BundleError(f'{bundle_path} is truncated')
+        magic, version, directory_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != BUNDLE_VERSION:
+            raise BundleError(f'{bundle_path} is not a version {BUNDLE_VERSION} world bundle')
+        directory = json.loads(self.map[HEADER.size:HEADER.size + directory_length])
+        if directory['byteorder'] != sys.byteorder:
+            raise BundleError(f'{bundle_path} was built on a {directory["byteorder"]} endian machine')
+        self.source_hash: str = directory['source_hash']
+        self.source_stats: dict[str, list[int]] = directory['source_stats']
+        self.event_index: dict[str, any] = directory['event_index']
+        self.problems: list[Problem] = [Problem(*problem) for problem in directory['problems']]
+        self.base = HEADER.size + directory_length + (-(HEADER.size + directory_length) % 8)
+        self.view = memoryview(self.map)
+        self.texts: dict[str, int] = directory['texts']
+        self.sections: dict[str, dict[str, int]] = directory['sections']
+
+        strings = directory['strings']
+        start = self.base + strings['offsets']
+        self.string_offsets = self.view[start:start + 4 * (strings['count'] + 1)].cast('I')
+        self.string_blob = self.base + strings['blob']
+        self.text_store = TextStore(self)
+
+    def is_stale(self, data_dir: str = DATA_DIR) -> bool:
+        """Checks whether the source files differ from the ones the bundle was built from.
+
+        Sizes and mtimes that match the recorded ones are trusted. Otherwise,
+        after a checkout, copy or touch, the files are hashed and only a
+        different hash makes the bundle stale.
+        """
+        stats = source_stats(data_dir)
+        if stats == self.source_stats:
+            return False
+        if len(stats) < len(source_files(data_dir)):
+            # Sources that are partly missing can not be built from, the bundle is all there is
+            return False
+        return source_hash(data_dir) != self.source_hash
+
+    def string(self, string_id: int) -> str:
+        start = self.string_blob + self.string_offsets[string_id]
+        end = self.string_blob + self.string_offsets[string_id + 1]
+        return str(self.view[start:end], 'utf-8')
+
+    def resolve_strings(self, value: dict) -> any:
+        if len(value) == 1 and '$' in value:
+            return TextRef(self.text_store, value['$'])
+        return value
+
+    def section(self, object_type: str) -> 'BundleRecords':
+        return BundleRecords(self, object_type)
+
+    def data(self) -> 'BundleData':
+        return BundleData(self)
+
+    def world(self) -> World:
+        """Creates a world whose objects are built from their records on first access."""
+        world = BundleWorld()
+        for object_type, build in OBJECT_BUILDERS.items():
+            world[object_type] = BundleObjects(world, self.section(object_type), build)
+        index = world.cache['event_index'] = EventIndex()
+        index.restore(self.event_index)
+        world.problems = list(self.problems)
+        return world
+
+
+class BundleWorld(World):
+    """Template world of a bundle, the names of sections still read from the bundle come from its directory."""
+    def names(self) -> list[str]:
+        names = []
+        for object_type, objects in self.items():
+            if object_type == 'events':
+                continue
+            if isinstance(objects, BundleObjects):
+                names.extend(objects.records.names)
+            else:
+                names.extend(game_obj.name for game_obj in objects.values())
+        return names
+
+
+class BundleRecords(Sequence):
+    """Records of one object type, each decoded on access."""
+    def __init__(self, bundle: Bundle, object_type: str) -> None:
+        self.bundle = bundle
+        section = bundle.sections[object_type]
+        self.count = section['count']
+        self.names: list[str] = section.get('names', [])
+        start = bundle.base + section['ids']
+        self.ids = bundle.view[start:start + 8 * self.count].cast('q')
+        start = bundle.base + section['offsets']
+        self.offsets = bundle.view[start:start + 4 * (self.count + 1)].cast('I')
+        self.records = bundle.base + section['records']
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> dict:
+        if isinstance(position, slice):
+            return [self[index] for index in range(*position.indices(self.count))]
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        start = self.records + self.offsets[position]
+        end = self.records + self.offsets[position + 1]
+        return json.loads(str(self.bundle.view[start:end], 'utf-8'), object_hook=self.bundle.resolve_strings)
+
+    def positions(self) -> dict[int, int]:
+        positions = {}
+        for position, obj_id in enumerate(self.ids):
+            positions[obj_id] = position
+        return positions
+
+
+class BundleData(Mapping):
+    """load_data compatible view of a bundle."""
+    def __init__(self, bundle: Bundle) -> None:
+        self.bundle = bundle
+        self.cache: dict[str, any] = {}
+
+    def __getitem__(self, name: str) -> any:
+        if name not in self.cache:
+            if name in self.bundle.texts:
+                self.cache[name] = shape_text(name, self.bundle.string(self.bundle.texts[name]))
+            elif name in self.bundle.sections:
+                self.cache[name] = self.bundle.section(name)
+            else:
+                raise KeyError(name)
+        return self.cache[name]
+
+    def __iter__(self):
+        yield from self.bundle.texts
+        yield from self.bundle.sections
+
+    def __len__(self) -> int:
+        return len(self.bundle.texts) + len(self.bundle.sections)
+
+
+class BundleObjects(Mapping):
+    """Objects of one kind in a bundle world, built from their record on first access."""
+    def __init__(self, world: World, records: BundleRecords, build: callable) -> None:
+        self.world = world
+        self.records = records
+        self.build = build
+        self.positions = records.positions()
+        self.objects: dict[int, GameObject] = {}
+
+    def __getitem__(self, obj_id: int) -> GameObject:
+        game_obj = self.objects.get(obj_id)
+        if game_obj is None:
+            game_obj = self.build(self.records[self.positions[obj_id]])
+            game_obj.world = self.world
+            self.objects[obj_id] = game_obj
+        return game_obj
+
+    def __contains__(self, obj_id: int) -> bool:
+        return obj_id in self.positions
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __len__(self) -> int:
+        return len(self.positions)
@@ -1,8 +1,15 @@
 #imports
+from array import array
 from app.entity import Entity
+from app.entity_index import EntityIndex, name_index
+from app.game_object import GameObject
+from app.handle import pack_ref
 
 
 class Container(Entity):
+    __slots__ = ('inventory', '_index')
+    kind = 'container'
+
     def __init__(self,
                  obj_id: str,
                  name: str,
@@ -11,7 +18,39 @@ class Container(Entity):
                  inventory: list[dict[str, int or str]]
                  ):
         super().__init__(obj_id, name, description, state)
-        self.inventory = []
-        if inventory:
-            for item in inventory:
-                self.inventory.append((item['kind'], item['obj_id']))
+        self.inventory = array('q', [pack_ref(item) for item in inventory or ()])
+
+    @property
+    def index(self) -> EntityIndex:
+        # Built on first lookup so overlays index the objects of their own world
+        index = self.owned('_index')
+        if index is None:
+            index = EntityIndex(name_index(self.world))
+            for handle in self.inventory:
+                index.add(self.world.resolve(handle))
+            self._index = index
+        return index
+
+    def snapshot(self) -> dict[str, any]:
+        fields = super().snapshot()
+        fields['inventory'] = self.inventory.tolist()
+        return fields
+
+    def restore(self, fields: dict[str, any]) -> None:
+        super().restore(fields)
+        if 'inventory' in fields:
+            self.inventory = array('q', fields['inventory'])
+            self.forget('_index')
+
+    def add_item(self, item: GameObject) -> None:
+        index = self.index
+        self.own('inventory').append(item.handle)
+        index.add(item)
+        self.touch()
+
+    def remove_item(self, item: GameObject) -> GameObject:
+        index = self.index
+        self.own('inventory').remove(item.handle)
+        index.remove(item)
+        self.touch()
+        return item
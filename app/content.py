@@ -0,0 +1,275 @@
+#imports
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from app.loader import DATA_DIR, OBJECT_TYPES, load_data, load_game_objects
+from app.world_compiler import WorldError
+
+try:
+    import yaml
+    # libyaml parses several times faster than the pure Python loader
+    SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+except ImportError:
+    yaml = None
+
+MANIFEST_NAME = '.content_manifest.json'
+MANIFEST_VERSION = 1
+VOCABULARY_FILES = ('actions', 'selectors', 'reservedkeywords')
+# Fields every record of an object file needs, the loader's builders index them directly
+REQUIRED_FIELDS = {
+    'locations': ('obj_id', 'name', 'description'),
+    'items': ('obj_id', 'name', 'description'),
+    'transitions': ('obj_id', 'name', 'description', 'state', 'state_descriptions', 'state_transitions',
+                    'state_list', 'target', 'blocking_states'),
+    'players': ('obj_id', 'name', 'description', 'state'),
+    'containers': ('obj_id', 'name', 'description', 'state'),
+    'npcs': ('obj_id', 'name', 'description', 'state'),
+    'journals': ('obj_id', 'name', 'description', 'dialogue', 'story'),
+    'events': ('obj_id', 'name', 'description', 'state', 'triggers', 'affected_objects', 'change'),
+}
+
+
+def add_newlines_to_strings(data, max_line_length=200):
+    """Rewraps every string in the data to lines of at most max_line_length characters.
+
+    Breaks already in a string are dropped, the new ones are written as the two
+    characters \\n.
+    """
+    if isinstance(data, dict):
+        for key, value in data.items():
+            data[key] = add_newlines_to_strings(value, max_line_length)
+    elif isinstance(data, list):
+        for i, item in enumerate(data):
+            data[i] = add_newlines_to_strings(item, max_line_length)
+    elif isinstance(data, str):
+        # Replace '\\n' with a space and '\n' with a space
+        data = data.replace('\\n', ' ').replace('\n', ' ')
+
+        # Split the string into words and format with newlines
+        words = data.split()
+        lines = []
+        current_line = []  # Store lines as a list
+
+        for word in words:
+            if len(' '.join(current_line + [word])) <= max_line_length:
+                current_line.append(word)
+            else:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+
+        if current_line:
+            lines.append(' '.join(current_line))
+
+        return '\\n'.join(lines)
+    return data
+
+
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as source_file:
+        return hashlib.sha256(source_file.read()).hexdigest()
+
+
+def validate(name: str, data: any) -> list[str]:
+    """Checks the shape of one converted file, references between files are left to the world compiler.
+
+    Args:
+        name (str): Name of the file without extension.
+        data (any): Parsed contents.
+
+    Returns:
+        list[str]: Problems found, empty when the file is usable.
+    """
+    problems = []
+    if name in REQUIRED_FIELDS:
+        if not isinstance(data, list):
+            return [f'{name} must be a list of records']
+        seen = set()
+        for position, record in enumerate(data):
+            if not isinstance(record, dict):
+                problems.append(f'record {position} is not a mapping')
+                continue
+            missing = [field for field in REQUIRED_FIELDS[name] if field not in record]
+            if missing:
+                problems.append(f'record {position} is missing {", ".join(missing)}')
+            obj_id = record.get('obj_id')
+            if not isinstance(obj_id, int):
+                problems.append(f'record {position} has obj_id {obj_id!r}, it must be an integer')
+            elif obj_id in seen:
+                problems.append(f'record {position} repeats obj_id {obj_id}')
+            seen.add(obj_id)
+    elif name in VOCABULARY_FILES:
+        if not isinstance(data, dict):
+            return [f'{name} must map every word to a list of synonyms']
+        for word, synonyms in data.items():
+            if not isinstance(synonyms, list) or not all(isinstance(synonym, str) for synonym in synonyms):
+                problems.append(f'{word!r} must map to a list of words')
+    return problems
+
+
+def convert(yaml_path: str, json_path: str, wrap: int = None) -> tuple[str, list[str]]:
+    """Converts one YAML file to JSON, runs in the worker processes.
+
+    The JSON is only written when the file validates, and only replaced when
+    its text changed.
+
+    Args:
+        yaml_path (str): Source file.
+        json_path (str): Output file.
+        wrap (int, optional): Rewrap every string to lines of at most this many characters the way
+            linebreaker.py does. Defaults to None, strings are kept as written.
+
+    Returns:
+        tuple[str, list[str]]: Hash of the JSON written, None if it was not, and the problems found.
+    """
+    name = os.path.splitext(os.path.basename(yaml_path))[0]
+    try:
+        with open(yaml_path, 'r', encoding='utf-8') as yaml_file:
+            data = yaml.load(yaml_file, Loader=SafeLoader)
+    except yaml.YAMLError as error:
+        return None, [str(error).replace('\n', ' ')]
+    problems = validate(name, data)
+    if problems:
+        return None, problems
+    if wrap:
+        data = add_newlines_to_strings(data, wrap)
+
+    text = json.dumps(data, indent=4)
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    if not os.path.exists(json_path) or file_hash(json_path) != digest:
+        partial = f'{json_path}.tmp'
+        with open(partial, 'w', encoding='utf-8') as json_file:
+            json_file.write(text)
+        os.replace(partial, json_path)
+    return digest, []
+
+
+class ContentBuild:
+    """Converts the YAML sources of a data directory to the JSON the game loads, only where they changed.
+
+    A manifest next to the sources remembers the size, mtime and hash of
+    every source and its output. A file whose size and mtime are unchanged is
+    not read, one that was only touched is recognized by its hash. A source is
+    converted again when it or its output changed. Changed files
+    are converted and validated in a process pool, then the whole world is
+    compiled to check the references between files.
+    """
+    def __init__(self, data_dir: str = DATA_DIR, jobs: int = None, wrap: int = None) -> None:
+        """Initializes the ContentBuild class.
+
+        Args:
+            data_dir (str, optional): Directory holding the YAML sources. Defaults to DATA_DIR.
+            jobs (int, optional): Worker processes. Defaults to the number of CPUs.
+            wrap (int, optional): Line length to rewrap strings to, see convert(). Defaults to None.
+        """
+        if yaml is None:
+            raise RuntimeError('building content requires PyYAML, install dev_requirements.txt')
+        self.data_dir = data_dir
+        self.jobs = jobs or os.cpu_count() or 1
+        self.wrap = wrap
+        self.manifest_path = os.path.join(data_dir, MANIFEST_NAME)
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self) -> dict[str, any]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            manifest = None
+        # Another wrap width gives other output, so every file is stale
+        if not manifest or manifest.get('version') != MANIFEST_VERSION or manifest.get('wrap') != self.wrap:
+            manifest = {'version': MANIFEST_VERSION, 'wrap': self.wrap, 'files': {}, 'world_ok': False}
+        return manifest
+
+    def save_manifest(self) -> None:
+        partial = f'{self.manifest_path}.tmp'
+        with open(partial, 'w', encoding='utf-8') as manifest_file:
+            json.dump(self.manifest, manifest_file, indent=4, sort_keys=True)
+        os.replace(partial, self.manifest_path)
+
+    def sources(self) -> list[str]:
+        return sorted(name for name in os.listdir(self.data_dir) if name.endswith('.yaml'))
+
+    @staticmethod
+    def unchanged(entry: dict[str, any], path: str) -> bool:
+        """Compares a file to its manifest entry, reading it only when its size or mtime moved."""
+        stat = os.stat(path)
+        if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return True
+        if entry['hash'] != file_hash(path):
+            return False
+        # Touched but not edited, remember the new mtime so the next run skips reading it
+        entry['size'], entry['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+        return True
+
+    @staticmethod
+    def entry(path: str, digest: str) -> dict[str, any]:
+        stat = os.stat(path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+
+    def stale(self) -> list[str]:
+        """Returns the sources whose output is missing or out of date."""
+        stale = []
+        for source in self.sources():
+            yaml_path = os.path.join(self.data_dir, source)
+            json_path = f'{os.path.splitext(yaml_path)[0]}.json'
+            entry = self.manifest['files'].get(source)
+            if entry is None or not os.path.exists(json_path) \
+                    or not self.unchanged(entry['source'], yaml_path) or not self.unchanged(entry['output'], json_path):
+                stale.append(source)
+        return stale
+
+    def build(self) -> tuple[list[str], dict[str, list[str]]]:
+        """Converts the stale sources and checks the world when anything changed.
+
+        Returns:
+            tuple[list[str], dict[str, list[str]]]: Sources converted, and the problems by source, 'world'
+                for the errors of the world compiler.
+        """
+        stale = self.stale()
+        tasks = [
+            (source, os.path.join(self.data_dir, source), os.path.join(self.data_dir, f'{os.path.splitext(source)[0]}.json'))
+            for source in stale
+        ]
+        if len(tasks) > 1 and self.jobs > 1:
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(tasks))) as pool:
+                results = list(pool.map(convert, *zip(*[(yaml_path, json_path, self.wrap) for _, yaml_path, json_path in tasks])))
+        else:
+            # A pool costs more to start than converting the one file an author just saved
+            results = [convert(yaml_path, json_path, self.wrap) for _, yaml_path, json_path in tasks]
+
+        problems = {}
+        built = []
+        for (source, yaml_path, json_path), (output, errors) in zip(tasks, results):
+            if errors:
+                problems[source] = errors
+                self.manifest['files'].pop(source, None)
+                continue
+            self.manifest['files'][source] = {
+                'source': self.entry(yaml_path, file_hash(yaml_path)),
+                'output': self.entry(json_path, output),
+            }
+            built.append(source)
+
+        if problems:
+            self.manifest['world_ok'] = False
+        elif built or not self.manifest['world_ok']:
+            world_errors = self.check_world()
+            if world_errors:
+                problems['world'] = world_errors
+            self.manifest['world_ok'] = not world_errors
+        self.save_manifest()
+        return built, problems
+
+    def check_world(self) -> list[str]:
+        """Compiles the converted world, returns its errors."""
+        object_sources = [f'{object_type}.json' for object_type in OBJECT_TYPES]
+        if not all(os.path.exists(os.path.join(self.data_dir, source)) for source in object_sources):
+            return []
+        try:
+            load_game_objects(load_data(self.data_dir))
+        except WorldError as error:
+            return [str(problem) for problem in error.problems]
+        except (KeyError, TypeError, ValueError, OSError) as error:
+            return [f'the world does not load: {error!r}']
+        return []
@@ -2,6 +2,28 @@
 from app.game_object import GameObject
 
 class Entity(GameObject):
+    __slots__ = ('_state',)
+
     def __init__(self, obj_id: str, name: str, description: str, state: str):
         super().__init__(obj_id, name, description)
-        self.state = state
+        self._state = state
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @state.setter
+    def state(self, state: str) -> None:
+        if state != self._state:
+            self._state = state
+            self.touch()
+
+    def snapshot(self) -> dict[str, any]:
+        fields = super().snapshot()
+        fields['state'] = self.state
+        return fields
+
+    def restore(self, fields: dict[str, any]) -> None:
+        super().restore(fields)
+        if 'state' in fields:
+            self._state = fields['state']
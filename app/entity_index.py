@@ -0,0 +1,82 @@
+from app.fuzzy_index import FuzzyIndex
+from app.game_object import GameObject
+
+
+def name_index(world) -> FuzzyIndex:
+    """Returns the typo tolerant index of every object name, shared by the sessions of a template."""
+    return world.shared('name_index', lambda template: FuzzyIndex(template.names()))
+
+
+class EntityIndex:
+    """Name to entity multimap kept in step with a Location's entities or a Container's inventory.
+
+    Entities sharing a name keep the order they were added in. Names rarely collide,
+    so a lookup restricted to a class (Transition, Intractable, Npc, Journal, ...)
+    filters the few same-name entries instead of keeping a bucket per class, which
+    keeps the per-session copies of the index small.
+
+    A name that matches nothing here and is not the name of any object is
+    looked up in the shared FuzzyIndex, the closest names are then checked
+    against this index, so the cost does not grow with the number of entities.
+    """
+    def __init__(self, fuzzy: FuzzyIndex = None) -> None:
+        self.names: dict[str, list[GameObject]] = {}
+        self.fuzzy = fuzzy
+
+    def add(self, entity: GameObject) -> None:
+        entities = self.names.get(entity.name)
+        if entities is None:
+            self.names[entity.name] = [entity]
+        else:
+            entities.append(entity)
+
+    def remove(self, entity: GameObject) -> None:
+        entities = self.names[entity.name]
+        entities.remove(entity)
+        if not entities:
+            del self.names[entity.name]
+
+    def find_all(self, name: str, kind: type = GameObject) -> list[GameObject]:
+        """Finds every entity with the given name.
+
+        Args:
+            name (str): Name of the entity.
+            kind (type, optional): Only return instances of this class. Defaults to GameObject.
+
+        Returns:
+            list[GameObject]: Matching entities, in the order they were added.
+        """
+        return [entity for entity in self.names.get(name, ()) if isinstance(entity, kind)]
+
+    def find_exact(self, name: str, kind: type, exclude: tuple[type, ...]) -> GameObject:
+        for entity in self.names.get(name, ()):
+            if isinstance(entity, kind) and not isinstance(entity, exclude):
+                return entity
+        return None
+
+    def find(self, name: str, kind: type = GameObject, exclude: tuple[type, ...] = ()) -> GameObject:
+        """Finds the first entity with the given name, or with the only close enough name if none has it.
+
+        Args:
+            name (str): Name of the entity, possibly mistyped.
+            kind (type, optional): Only return instances of this class. Defaults to GameObject.
+            exclude (tuple[type, ...], optional): Skip instances of these classes. Defaults to ().
+
+        Returns:
+            GameObject: The matching entity, or None.
+        """
+        entity = self.find_exact(name, kind, exclude)
+        if entity is not None or self.fuzzy is None or name in self.fuzzy.words:
+            return entity
+        found = None
+        closest = None
+        for distance, candidate in self.fuzzy.lookup(name):
+            if closest is not None and distance > closest:
+                break
+            entity = self.find_exact(candidate, kind, exclude)
+            if entity is not None:
+                if found is not None:
+                    # Two names are equally close, guessing could pick the wrong one
+                    return None
+                found, closest = entity, distance
+        return found
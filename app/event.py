@@ -1,6 +1,12 @@
+from array import array
+from app.container import Container
 from app.entity import Entity
+from app.handle import pack_ref, refs
 
 class Event(Entity):
+    __slots__ = ('triggers', 'affected_objects', 'change')
+    kind = 'event'
+
     def __init__(
         self,
         obj_id: int,
@@ -23,19 +29,11 @@ class Event(Entity):
             change (dict): Change dictionary.
         """
         super().__init__(obj_id, name, description, state)
-        self.triggers: list[Trigger] = []
-
         # Convert trigger dictionaries into Trigger objects
-        for trigger_data in triggers:
-            trigger = Trigger(trigger_data)
-            self.triggers.append(trigger)
+        self.triggers: tuple[Trigger, ...] = tuple(Trigger(trigger_data) for trigger_data in triggers)
 
-        # Convert affected object dictionaries into tuples
-        self.affected_objects: list[tuple[str, int]] = [
-            (obj['kind'], obj['obj_id'])
-            for obj
-            in affected_objects
-        ]
+        # Convert affected object dictionaries into handles
+        self.affected_objects: array = array('q', [pack_ref(obj) for obj in affected_objects])
 
         # Convert change dictionary into Change object
         self.change: Change = Change(
@@ -44,6 +42,8 @@ class Event(Entity):
         )
 
 class Trigger:
+    __slots__ = ('object', 'conditions', 'checks')
+
     def __init__(self, trigger_data: dict) -> None:
         """
         Initialize a Trigger object.
@@ -51,17 +51,125 @@ class Trigger:
         Args:
             trigger_data (dict): Trigger data dictionary.
         """
-        trigger_object: tuple[str, int] = (trigger_data['object']['kind'], trigger_data['object']['obj_id'])
-        conditions: dict = trigger_data['conditions']
+        trigger_object: int = pack_ref(trigger_data['object'])
+        conditions: dict = dict(trigger_data['conditions'])
 
         # Convert 'item' and 'no_item' conditions
         if 'inventory' in conditions.keys():
-            conditions['inventory'] = {key: [(item['kind'], item['obj_id']) for item in value] for key, value in conditions['inventory'].items()}
+            conditions['inventory'] = {key: array('q', [pack_ref(item) for item in value]) for key, value in conditions['inventory'].items()}
 
-        self.object: tuple[str, int] = trigger_object
+        self.object: int = trigger_object
         self.conditions: dict = conditions
+        self.checks: list[tuple[callable, callable]] = self.compile(conditions)
+
+    @staticmethod
+    def compile(conditions: dict) -> list[tuple[callable, callable]]:
+        """
+        Compile condition blocks into (predicate, explain) pairs.
+
+        Predicates take the trigger object and the player location and return
+        whether the condition holds. Explain builds the failure message and is
+        only called when diagnostics are requested.
+
+        Args:
+            conditions (dict): Conditions of the trigger.
+
+        Returns:
+            list[tuple[callable, callable]]: Compiled checks in evaluation order.
+        """
+        checks = []
+        state_conditions = conditions.get('state', False)
+        if state_conditions:
+            if 'is' in state_conditions:
+                state_is = state_conditions['is']
+                checks.append((
+                    lambda obj, location: obj.state == state_is,
+                    lambda obj, location: f"{obj.name} is {obj.state} expected {state_is}"
+                ))
+            if 'is_not' in state_conditions:
+                state_is_not = state_conditions['is_not']
+                checks.append((
+                    lambda obj, location: obj.state != state_is_not,
+                    lambda obj, location: f"{obj.name} is {obj.state} expected not {state_is_not}"
+                ))
+
+        inventory_conditions = conditions.get('inventory', False)
+        if inventory_conditions:
+            if 'item' in inventory_conditions:
+                items = inventory_conditions['item']
+                required = frozenset(items)
+
+                def explain_items(obj, location):
+                    if not obj.inventory:
+                        return f'{obj.name} is empty and does not have {refs(items)}'
+                    return f'{obj.name} has {refs(obj.inventory)} does not have {refs(items)}'
+
+                checks.append((
+                    lambda obj, location: (
+                        not isinstance(obj, Container)
+                        or bool(obj.inventory) and required.issubset(obj.inventory)
+                    ),
+                    explain_items
+                ))
+            if 'no_item' in inventory_conditions:
+                no_items = inventory_conditions['no_item']
+                forbidden = frozenset(no_items)
+                checks.append((
+                    lambda obj, location: not isinstance(obj, Container) or forbidden.isdisjoint(obj.inventory),
+                    lambda obj, location: f"{obj.name} has {refs(obj.inventory)} should not have {refs(no_items)}"
+                ))
+
+        location_conditions = conditions.get('current_location', False)
+        if location_conditions:
+            if 'is' in location_conditions:
+                location_is = location_conditions['is']
+                checks.append((
+                    lambda obj, location: location == location_is,
+                    lambda obj, location: f'Location is {location} expected {location_is}'
+                ))
+            if 'is_not' in location_conditions:
+                location_is_not = location_conditions['is_not']
+                checks.append((
+                    lambda obj, location: location != location_is_not,
+                    lambda obj, location: f'Location is {location} expected not {location_is_not}'
+                ))
+        return checks
+
+    def test(self, trigger_obj, player_location: int) -> bool:
+        """
+        Check whether every condition of the trigger holds.
+
+        Args:
+            trigger_obj (GameObject): The object the trigger listens to.
+            player_location (int): Id of the location the player is in.
+
+        Returns:
+            bool: True if all conditions hold.
+        """
+        for predicate, _ in self.checks:
+            if not predicate(trigger_obj, player_location):
+                return False
+        return True
+
+    def explain(self, trigger_obj, player_location: int) -> str:
+        """
+        Describe the first condition that does not hold.
+
+        Args:
+            trigger_obj (GameObject): The object the trigger listens to.
+            player_location (int): Id of the location the player is in.
+
+        Returns:
+            str: Failure message, or None if all conditions hold.
+        """
+        for predicate, explain in self.checks:
+            if not predicate(trigger_obj, player_location):
+                return explain(trigger_obj, player_location)
+        return None
 
 class Change:
+    __slots__ = ('state', 'inventory')
+
     def __init__(self, state: str = None, inventory: dict = None) -> None:
         """
         Initialize a Change object.
@@ -70,5 +178,7 @@ class Change:
             state (str, optional): The new state value. Defaults to None.
             inventory (dict, optional): Inventory change dictionary. Defaults to None.
         """
+        if inventory:
+            inventory = {key: array('q', [pack_ref(item) for item in value]) for key, value in inventory.items()}
         self.state: str = state
         self.inventory: dict = inventory
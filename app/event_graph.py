@@ -0,0 +1,135 @@
+#imports
+import heapq
+from collections.abc import Mapping
+from app.event import Event
+from app.handle import KIND_BITS, KIND_MASK
+
+
+class EventGraph:
+    """Dependencies between events, built from their static parts.
+
+    An event depends on another when the other's change writes the event's
+    own state or an object its triggers read. Cycles are grouped into
+    strongly connected components, an edge through an event's own state is a
+    control edge, one event activating or deactivating another.
+    """
+    def __init__(self, events: Mapping[int, Event]) -> None:
+        """Initializes the EventGraph class.
+
+        Args:
+            events (Mapping[int, Event]): Events of a world keyed by obj_id.
+        """
+        self.ids: list[int] = sorted(events)
+        readers: dict[int, set[int]] = {}
+        for event_id in self.ids:
+            event = events[event_id]
+            readers.setdefault(event.handle, set()).add(event_id)
+            for trigger in event.triggers:
+                readers.setdefault(trigger.object, set()).add(event_id)
+
+        self.successors: dict[int, set[int]] = {event_id: set() for event_id in self.ids}
+        self.controls: dict[int, set[int]] = {event_id: set() for event_id in self.ids}
+        for event_id in self.ids:
+            event = events[event_id]
+            for handle in event.affected_objects:
+                self.successors[event_id].update(readers.get(handle, ()))
+                if handle & KIND_MASK == Event.code and handle >> KIND_BITS in events:
+                    self.controls[event_id].add(handle >> KIND_BITS)
+            # An event re-reading what it wrote itself is not a dependency
+            self.successors[event_id].discard(event_id)
+            self.controls[event_id].discard(event_id)
+
+        self.components: list[list[int]] = components(self.ids, self.successors)
+        self.order: list[int] = topological_order(self.components, self.successors)
+        self.cycles: list[list[int]] = [component for component in self.components if len(component) > 1]
+        self.control_cycles: list[list[int]] = [
+            component for component in components(self.ids, self.controls) if len(component) > 1
+        ]
+
+
+def components(nodes: list[int], successors: dict[int, set[int]]) -> list[list[int]]:
+    """Finds the strongly connected components of a graph with Tarjan's algorithm.
+
+    Args:
+        nodes (list[int]): Every node of the graph.
+        successors (dict[int, set[int]]): Nodes each node has an edge to.
+
+    Returns:
+        list[list[int]]: Components with their nodes sorted, in no particular order.
+    """
+    index: dict[int, int] = {}
+    low: dict[int, int] = {}
+    stack: list[int] = []
+    on_stack: set[int] = set()
+    found = []
+    for root in nodes:
+        if root in index:
+            continue
+        # Iterative depth first search, each frame is a node and the iterator over its successors
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        frames = [(root, iter(sorted(successors[root])))]
+        while frames:
+            node, children = frames[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    frames.append((child, iter(sorted(successors[child]))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                frames.pop()
+                if frames:
+                    parent = frames[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    found.append(sorted(component))
+    return found
+
+
+def topological_order(found: list[list[int]], successors: dict[int, set[int]]) -> list[int]:
+    """Orders the nodes so every edge that is not inside a component points forward.
+
+    Components that do not depend on each other, and the nodes inside a
+    component, are taken by lowest id, so the order never depends on the
+    order the nodes were loaded in.
+
+    Args:
+        found (list[list[int]]): Strongly connected components from components().
+        successors (dict[int, set[int]]): Nodes each node has an edge to.
+
+    Returns:
+        list[int]: Every node once.
+    """
+    component_of = {node: position for position, component in enumerate(found) for node in component}
+    incoming = [0] * len(found)
+    edges: list[set[int]] = [set() for _ in found]
+    for position, component in enumerate(found):
+        for node in component:
+            for child in successors[node]:
+                target = component_of[child]
+                if target != position and target not in edges[position]:
+                    edges[position].add(target)
+                    incoming[target] += 1
+    ready = [(found[position][0], position) for position in range(len(found)) if not incoming[position]]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        _, position = heapq.heappop(ready)
+        order.extend(found[position])
+        for target in edges[position]:
+            incoming[target] -= 1
+            if not incoming[target]:
+                heapq.heappush(ready, (found[target][0], target))
+    return order
@@ -0,0 +1,204 @@
+import heapq
+from app.event import Event
+from app.event_graph import EventGraph
+from app.event_handler import EventHandler
+from app.handle import KIND_MASK
+from app.world import World
+
+# Passes a turn may take to settle events activated or deactivated by an event after them
+MAX_ROUNDS = 4
+
+
+class EventIndex:
+    """Events in dependency order with the trigger objects and locations they depend on.
+
+    The order is a topological order of the event graph, an event comes after
+    every event whose change it reads unless the two are in a cycle. It only
+    reads the static parts of the events, so one index is shared by every
+    session spawned from the same world. A world bundle stores the index with
+    snapshot(), its worlds restore() it instead of building every event.
+    """
+    def __init__(self, game_objs: World = None):
+        """Initializes the EventIndex class.
+
+        Args:
+            game_objs (World, optional): World whose events are indexed. Defaults to None, an empty index to restore() into.
+        """
+        self.graph: EventGraph = None
+        self.order: list[int] = []
+        self.dependents: dict[int, set[int]] = {}
+        self.location_dependents: dict[int, set[int]] = {}
+        if game_objs is None:
+            return
+        events = game_objs.get('events', {})
+        self.graph = EventGraph(events)
+        self.order = self.graph.order
+        for index, event_id in enumerate(self.order):
+            event = events[event_id]
+            self.dependents.setdefault(event.handle, set()).add(index)
+            for trigger_data in event.triggers:
+                self.dependents.setdefault(trigger_data.object, set()).add(index)
+                location_conditions = trigger_data.conditions.get('current_location', False)
+                if location_conditions:
+                    for location_id in location_conditions.values():
+                        self.location_dependents.setdefault(location_id, set()).add(index)
+
+    def snapshot(self) -> dict[str, any]:
+        """Returns the index in a JSON friendly form, the graph is left out."""
+        return {
+            'order': self.order,
+            'dependents': [[handle, sorted(indexes)] for handle, indexes in self.dependents.items()],
+            'location_dependents': [[location_id, sorted(indexes)] for location_id, indexes in self.location_dependents.items()],
+        }
+
+    def restore(self, fields: dict[str, any]) -> None:
+        """Sets the index taken by snapshot()."""
+        self.order = list(fields['order'])
+        self.dependents = {handle: set(indexes) for handle, indexes in fields['dependents']}
+        self.location_dependents = {location_id: set(indexes) for location_id, indexes in fields['location_dependents']}
+
+
+class EventScheduler:
+    """Re-evaluates only the events whose trigger objects changed since they were last checked.
+
+    Events are indexed by the handles of their trigger objects and by the
+    locations named in their current_location conditions. Every mutation of a
+    watched object is reported through touch(), so the per turn cost is
+    proportional to what changed instead of to the number of events.
+
+    The results match a full pass over every active event in dependency
+    order: an event that fired stays armed and is checked again every turn,
+    and an event touched by an earlier event in the same pass is checked later
+    in that pass. An event activated or deactivated by a later event, which
+    only happens inside a cycle, is checked again in another pass of the same
+    turn, up to MAX_ROUNDS passes, but an event fires at most once per turn,
+    like in a single full pass. Other changes that go back up a cycle wait
+    for the next turn, that is what lets a creature's states advance one step
+    per turn.
+    """
+    def __init__(self, game_objs: World, event_handler: EventHandler):
+        """Initializes the EventScheduler class.
+
+        Args:
+            game_objs (World): Dictionary of game objects.
+            event_handler (EventHandler): Instance of the EventHandler class.
+        """
+        self.game_objs = game_objs
+        self.event_handler = event_handler
+        self.events = game_objs.get('events', {})
+        self.index: EventIndex = game_objs.shared('event_index', EventIndex)
+
+        self.dirty: set[int] = set(range(len(self.index.order)))
+        self.armed: set[int] = set()
+        self.location = None
+        self.position = None
+        self.queue: list[int] = []
+        self.queued: set[int] = set()
+        self.rerun: set[int] = set()
+        self.fired: set[int] = set()
+
+    def reload(self) -> None:
+        """Picks up the events and index of a reloaded world, every event is checked on the next turn.
+
+        Fired events stay armed where their obj_id still exists, the rest of
+        the scheduling state indexes the old order and is dropped.
+        """
+        armed = {self.index.order[index] for index in self.armed}
+        self.events = self.game_objs.get('events', {})
+        self.index = self.game_objs.shared('event_index', EventIndex)
+        positions = {event_id: index for index, event_id in enumerate(self.index.order)}
+        self.armed = {positions[event_id] for event_id in armed if event_id in positions}
+        self.dirty = set(range(len(self.index.order)))
+        self.location = None
+
+    def watch(self) -> None:
+        """Registers the scheduler as the observer of the world's objects."""
+        self.game_objs.observer = self.touch
+
+    def touch(self, handle: int) -> None:
+        """Marks the events depending on an object as needing re-evaluation.
+
+        Args:
+            handle (int): Handle of the mutated object.
+        """
+        control = handle & KIND_MASK == Event.code
+        for index in self.index.dependents.get(handle, ()):
+            self.schedule(index, control)
+
+    def schedule(self, index: int, control: bool = False) -> None:
+        if self.position is not None and index > self.position:
+            if index not in self.queued:
+                self.queued.add(index)
+                heapq.heappush(self.queue, index)
+        elif self.position is not None and control and index < self.position:
+            self.rerun.add(index)
+        else:
+            self.dirty.add(index)
+
+    def move(self, current_location: int) -> None:
+        """Marks the events with conditions on the previous or the new location as dirty.
+
+        Args:
+            current_location (int): Id of the location the player is now in.
+        """
+        if current_location == self.location:
+            return
+        for location_id in (self.location, current_location):
+            self.dirty.update(self.index.location_dependents.get(location_id, ()))
+        self.location = current_location
+
+    def process(self, current_location: int, god_mode: bool) -> str:
+        """Evaluates the pending events and applies the changes of those that pass.
+
+        Args:
+            current_location (int): Id of the location the player is in.
+            god_mode (bool): Whether failure diagnostics should be reported.
+
+        Returns:
+            str: Concatenated event text for the turn.
+        """
+        self.move(current_location)
+        pending = self.dirty | self.armed
+        if god_mode:
+            pending.update(range(len(self.index.order)))
+        self.dirty = set()
+        self.fired = set()
+
+        event_txt = ""
+        for _ in range(MAX_ROUNDS):
+            if not pending:
+                break
+            self.rerun = set()
+            event_txt += self.sweep(pending, current_location, god_mode)
+            pending = self.rerun
+        # Whatever did not settle within the bound is checked next turn
+        self.dirty.update(pending)
+        self.rerun = set()
+        return event_txt
+
+    def sweep(self, pending: set[int], current_location: int, god_mode: bool) -> str:
+        """Checks the pending events and the events they touch in dependency order."""
+        self.queue = sorted(pending)
+        self.queued = set(pending)
+
+        event_txt = ""
+        while self.queue:
+            index = heapq.heappop(self.queue)
+            if index in self.fired:
+                continue
+            self.position = index
+            event = self.events[self.index.order[index]]
+            if event.state != "active":
+                self.armed.discard(index)
+                continue
+            passed, message = self.event_handler.check_event(event, current_location, god_mode)
+            if passed:
+                self.armed.add(index)
+                self.fired.add(index)
+                event_txt += self.event_handler.fire_event(event, god_mode)
+            else:
+                self.armed.discard(index)
+                event_txt += self.event_handler.failure_text(event, message, god_mode)
+        self.position = None
+        self.queued = set()
+        return event_txt
@@ -0,0 +1,116 @@
+def edit_distance(source: str, target: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it is known to exceed limit."""
+    if abs(len(source) - len(target)) > limit:
+        return limit + 1
+    # A typo leaves most of a word alone, only the differing middle goes through the table
+    start = 0
+    end_source, end_target = len(source), len(target)
+    while start < end_source and start < end_target and source[start] == target[start]:
+        start += 1
+    while end_source > start and end_target > start and source[end_source - 1] == target[end_target - 1]:
+        end_source -= 1
+        end_target -= 1
+    source, target = source[start:end_source], target[start:end_target]
+    if not source or not target:
+        return len(source) + len(target)
+
+    # Only cells within limit of the diagonal can stay within limit, the rest are left at limit + 1
+    over = limit + 1
+    previous_row = None
+    row = [j if j <= limit else over for j in range(len(target) + 1)]
+    for i in range(1, len(source) + 1):
+        before_row, previous_row, row = previous_row, row, [over] * (len(target) + 1)
+        if i <= limit:
+            row[0] = i
+        best = over
+        for j in range(max(1, i - limit), min(len(target), i + limit) + 1):
+            if source[i - 1] == target[j - 1]:
+                cell = previous_row[j - 1]
+            else:
+                cell = min(previous_row[j - 1], previous_row[j], row[j - 1]) + 1
+                if i > 1 and j > 1 and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1] and before_row[j - 2] + 1 < cell:
+                    cell = before_row[j - 2] + 1
+            row[j] = cell if cell < over else over
+            if cell < best:
+                best = cell
+        if best > limit:
+            return over
+    return row[-1]
+
+
+class FuzzyIndex:
+    """Typo tolerant lookup of a fixed vocabulary, SymSpell style.
+
+    Every word is indexed under each string obtained by deleting up to
+    max_distance characters from its first prefix_length characters. A lookup
+    generates the same deletes of the typed word, so it checks at most a few
+    dozen keys and verifies only the words stored under them, whatever the
+    size of the vocabulary. Matching ignores case.
+    """
+    def __init__(self, words: list[str], max_distance: int = 2, prefix_length: int = 7) -> None:
+        """Initializes the FuzzyIndex class.
+
+        Args:
+            words (list[str]): Vocabulary to match against.
+            max_distance (int, optional): Largest edit distance ever accepted. Defaults to 2.
+            prefix_length (int, optional): Characters of a word the deletes are generated from. Defaults to 7.
+        """
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words: set[str] = set(words)
+        self.folded: dict[str, list[str]] = {}
+        self.deletes: dict[str, set[str]] = {}
+        for word in self.words:
+            folded = word.casefold()
+            self.folded.setdefault(folded, []).append(word)
+            for delete in self.edits(folded[:prefix_length], max_distance):
+                self.deletes.setdefault(delete, set()).add(folded)
+
+    @staticmethod
+    def edits(word: str, distance: int) -> set[str]:
+        edits = {word}
+        frontier = {word}
+        for _ in range(distance):
+            frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+            edits |= frontier
+        return edits
+
+    def allowed_distance(self, word: str) -> int:
+        # Short words are too close to each other to guess at
+        if len(word) < 3:
+            return 0
+        if len(word) < 6:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    def lookup(self, word: str) -> list[tuple[int, str]]:
+        """Finds the vocabulary words within the allowed distance of a typed word.
+
+        Args:
+            word (str): Word as typed.
+
+        Returns:
+            list[tuple[int, str]]: (distance, word) pairs, closest first.
+        """
+        folded = word.casefold()
+        limit = self.allowed_distance(folded)
+        candidates = set()
+        for delete in self.edits(folded[:self.prefix_length], limit):
+            candidates.update(self.deletes.get(delete, ()))
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(folded, candidate, limit)
+            if distance <= limit:
+                matches.extend((distance, original) for original in self.folded[candidate])
+        matches.sort()
+        return matches
+
+    def correct(self, word: str) -> str:
+        """Returns the only closest vocabulary word, None if there is none or it is ambiguous."""
+        matches = self.lookup(word)
+        if not matches:
+            return None
+        closest = [match for distance, match in matches if distance == matches[0][0]]
+        if len(closest) > 1:
+            return None
+        return closest[0]
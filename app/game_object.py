@@ -1,14 +1,112 @@
+import random
+from copy import copy
+from app.handle import KIND_BITS, KIND_CODES
+from app.render_cache import RenderCache
+from app.text_store import resolve_text
+
 
 class GameObject:
+    """Base of every game object.
+
+    Objects use __slots__, subclasses list the fields they add in their own
+    __slots__. An overlay leaves every slot it did not write empty, reading an
+    empty slot falls through to the template.
+    """
+    __slots__ = ('obj_id', 'name', '_description', 'world', '_template')
+    kind = 'game_object'
+    code = KIND_CODES['game_object']
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.code = KIND_CODES[cls.kind]
+
     def __init__(self, obj_id: str, name: str, description: str):
         self.obj_id = obj_id
         self.name = name
         self._description = description
-    
+        self.world = None
+        self._template = None
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes this object does not hold, overlays read them from their template
+        template = self._template
+        if template is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return getattr(template, name)
+
+    def spawn(self, world, cls: type = None) -> 'GameObject':
+        """Creates a copy-on-write overlay of this object for another world.
+
+        Args:
+            world (World): World the overlay belongs to.
+            cls (type, optional): Class of the overlay, a subclass of this object's class. Defaults to its class.
+
+        Returns:
+            GameObject: Overlay holding no fields of its own yet.
+        """
+        game_obj = object.__new__(cls or type(self))
+        game_obj._template = self
+        game_obj.world = world
+        return game_obj
+
+    def owned(self, name: str, default=None):
+        """Returns an attribute set on this object itself, without reading through to the template."""
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return default
+
+    def own(self, name: str):
+        """Returns a mutable attribute for writing, copying it from the template the first time."""
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            value = copy(getattr(self._template, name))
+            setattr(self, name, value)
+            return value
+
+    def forget(self, name: str) -> None:
+        """Empties a slot set on this object, if it is set."""
+        try:
+            delattr(self, name)
+        except AttributeError:
+            pass
+
+    def snapshot(self) -> dict[str, any]:
+        """Returns the fields a session can mutate, in a JSON friendly form."""
+        return {}
+
+    def restore(self, fields: dict[str, any]) -> None:
+        """Sets the fields taken by snapshot() without notifying the observer."""
+        if self.world is not None:
+            self.world.invalidate(self.handle)
+
+    @property
+    def handle(self) -> int:
+        return self.obj_id << KIND_BITS | self.code
+
+    @property
+    def rng(self) -> random.Random:
+        """Random stream of the world this object belongs to."""
+        if self.world is not None:
+            return self.world.rng
+        return random
+
+    def touch(self) -> None:
+        """Notifies the observer of the world, if any, that this object was mutated."""
+        if self.world is not None:
+            self.world.touch(self.handle)
+
+    def render_description(self) -> str:
+        return ''.join(f"{line}\n" for line in resolve_text(self._description).split(sep='\\n'))
+
+    def cached_description(self, state: str) -> str:
+        # Descriptions only read static data and the state, one cache serves every session of the template
+        if self.world is None:
+            return self.render_description()
+        descriptions: RenderCache = self.world.shared('descriptions', lambda template: RenderCache())
+        return descriptions.render((self.handle, state), None, self.render_description)
+
     @property
     def description(self) -> str:
-        description = self._description.split(sep= '\\n')
-        text = ''
-        for line in description:
-            text = f"{text}{line}\n"
-        return text
+        return self.cached_description(None)
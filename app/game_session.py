@@ -0,0 +1,286 @@
+from app.parser import Parser
+from app.action_processor import ActionProcessor
+from app.event_handler import EventHandler
+from app.event_scheduler import EventScheduler
+from app.location import Location
+from app.location_graph import LocationGraph
+from app.metrics import Metrics
+from app.save_journal import SaveJournal
+from app.world import World
+
+
+class StepResult:
+    def __init__(self, scene: str, text: str, status: str, quit: bool = False) -> None:
+        """
+        Initialize a StepResult object.
+
+        Args:
+            scene (str): Name of the scene after the step.
+            text (str): Text to display for the scene.
+            status (str): Status line of the player.
+            quit (bool, optional): Whether the player asked to quit. Defaults to False.
+        """
+        self.scene: str = scene
+        self.text: str = text
+        self.status: str = status
+        self.quit: bool = quit
+
+
+class GameSession:
+    """Headless game state and rules for a single player, with no UI or audio imports.
+    """
+    # Verbs outside the vocabulary files, they are never corrected to another verb
+    COMMANDS = ('start', 'quit', 'help', 'goto', 'map', 'poweroverwhelming', 'disable', 'enable', 'music', 'reachable', 'stats', 'reload')
+    # Scenes whose text only comes from the static data
+    STATIC_SCENES = ('title', 'opening', 'help', 'map', 'victory', 'defeat')
+
+    def __init__(self, data: dict[str, any], game_objects: World, sound_manager=None,
+                 save_journal: SaveJournal = None, metrics: Metrics = None, reloader=None):
+        """Initializes the GameSession class.
+
+        Args:
+            data (dict[str, any]): Static game data from load_data.
+            game_objects (World): Game objects from load_game_objects, or a world spawned from them.
+            sound_manager (SoundManager, optional): Audio backend, None to run without sound. Defaults to None.
+            save_journal (SaveJournal, optional): Journal to resume from and record every turn to. Defaults to None.
+            metrics (Metrics, optional): Metrics to instrument the session with, None collects nothing. Defaults to None.
+            reloader (WorldReloader, optional): Reloader of the world's data, enables the god mode reload command. Defaults to None.
+        """
+        self.data = data
+        self.game_objects = game_objects
+        self.parser = game_objects.shared('parser', lambda world: Parser(world.names(), self.COMMANDS))
+        self.scene_text: dict[str, str] = game_objects.shared('scene_text', lambda world: self.render_static_scenes())
+        self.event_handler = EventHandler(self.game_objects)
+        self.event_scheduler = EventScheduler(self.game_objects, self.event_handler)
+        self.event_scheduler.watch()
+        self.game_state = {
+            "current_scene": "title",
+            "current_location": 1,
+            "location_name": '',
+            "god_mode": False,
+            "user_command": '',
+            "previous_text": '',
+        }
+        self.location_graph = LocationGraph(self.game_objects)
+        self.location_graph.attach()
+        self.action_processor = ActionProcessor(sound_manager, self.location_graph, metrics, reloader)
+        self.scenes = {
+            "title": self.title,
+            "opening": self.opening,
+            "help": self.help_func,
+            "map": self.map_func,
+            "playing": self.playing,
+            "victory": self.victory,
+            "defeat": self.defeat,
+        }
+        self.save_journal = save_journal
+        if save_journal is not None:
+            save_journal.attach(self.game_objects)
+            if save_journal.resume(self.game_objects, self.game_state):
+                self.game_state['user_command'] = ''
+                if self.game_state['current_scene'] == "playing":
+                    location = self.game_objects["locations"][self.game_state['current_location']]
+                    self.game_state['previous_text'] = self.generate_location_text(location)
+        if metrics is not None:
+            metrics.instrument(self)
+        if reloader is not None:
+            reloader.attach(self)
+
+    def reload(self, data: dict[str, any]) -> None:
+        """Picks up world data a WorldReloader replaced in place, the game state is kept.
+
+        Args:
+            data (dict[str, any]): Static game data after the reload.
+        """
+        self.data = data
+        self.scene_text = self.game_objects.shared('scene_text', lambda world: self.render_static_scenes())
+        self.event_scheduler.reload()
+        self.location_graph.reload()
+        locations = self.game_objects['locations']
+        if self.game_state['current_location'] not in locations:
+            # The compiler makes sure the starting location is still there
+            self.game_state['current_location'] = 1
+        if self.game_state['location_name']:
+            self.game_state['location_name'] = locations[self.game_state['current_location']].name
+
+    def step(self, input_text: str) -> StepResult:
+        """Processes one line of player input and renders the resulting scene.
+
+        Args:
+            input_text (str): Raw text typed by the player.
+
+        Returns:
+            StepResult: Scene, text and status after the input.
+        """
+        result = self.handle_user_input(input_text)
+        if result == "Quitting...":
+            step_result = StepResult(self.game_state['current_scene'], result, self.status(), quit=True)
+        else:
+            step_result = self.render(result)
+        if self.save_journal is not None:
+            self.save_journal.record(self.game_objects, self.game_state)
+        return step_result
+
+    def render(self, *args) -> StepResult:
+        """Renders the current scene, prefixed by the result of the last input if given.
+
+        Returns:
+            StepResult: Scene, text and status of the session.
+        """
+        scene_name = self.game_state['current_scene']
+        scene = self.scenes.get(scene_name, self.title)
+        if args:
+            text = f"{args[0]}\n{scene()}"
+        else:
+            text = scene()
+        return StepResult(scene_name, text, self.status())
+
+    def status(self) -> str:
+        return f"{self.game_objects['players'][0].state} @ {self.game_state['location_name']}"
+
+    def process_parsed_text(self, parsed_text):
+        result = ""
+        if "start" == parsed_text[0]:
+            if self.game_state['current_scene'] == "title":
+                self.game_state['current_scene'] = "opening"
+        elif "quit" == parsed_text[0]:
+            return "Quitting..."
+        elif "help" == parsed_text[0]:
+            self.game_state["previous_scene"] = self.game_state['current_scene']
+            self.game_state['current_scene'] = "help"
+        elif "goto" == parsed_text[0] and self.game_state['current_scene'] == "playing" and self.game_state['god_mode']:
+            if len(parsed_text) > 1 and parsed_text[1].isdigit():
+                target_location = int(parsed_text[1])
+                if target_location in self.game_objects['locations'].keys():
+                    self.game_state["current_location"] = target_location
+        elif "map" == parsed_text[0]:
+            self.game_state["previous_scene"] = self.game_state['current_scene']
+            self.game_state['current_scene'] = "map"
+        elif "poweroverwhelming" == parsed_text[0] and self.game_state['current_scene'] == "playing":
+            if not self.game_state['god_mode']:
+                self.game_state['god_mode'] = True
+            else:
+                self.game_state['god_mode'] = False
+        elif "disable" == parsed_text[0] and self.game_state['god_mode']:
+            if len(parsed_text) > 1 and parsed_text[1].isdigit():
+                if len(parsed_text) == 3 and parsed_text[2].isdigit():
+                    start = int(parsed_text[1])
+                    end = int(parsed_text[2])
+                    for event_id in range(start, end + 1):
+                        if event_id in self.game_objects['events'].keys():
+                            self.game_objects['events'][event_id].state = 'inactive'
+                else:
+                    target_event = int(parsed_text[1])
+                    self.game_objects['events'][target_event].state = 'inactive'
+        elif "enable" == parsed_text[0] and self.game_state['god_mode']:
+            if len(parsed_text) > 1 and parsed_text[1].isdigit():
+                if len(parsed_text) == 3 and parsed_text[2].isdigit():
+                    start = int(parsed_text[1])
+                    end = int(parsed_text[2])
+                    for event_id in range(start, end + 1):
+                        if event_id in self.game_objects['events'].keys():
+                            self.game_objects['events'][event_id].state = 'active'
+                else:
+                    target_event = int(parsed_text[1])
+                    self.game_objects['events'][target_event].state = 'active'
+        elif "music" == parsed_text[0] and self.game_state['current_scene'] != "playing":
+            result = self.action_processor.process(parsed_text[0], None, None, self.game_state, *parsed_text[1:])
+        else:
+            self.game_state['user_command'] = parsed_text
+        return result
+
+    def handle_user_input(self, input_text: str):
+        result = ""
+        if self.game_state['current_scene'] == "help":
+            self.game_state['current_scene'] = self.game_state['previous_scene']
+            self.game_state['previous_scene'] = "help"
+        elif self.game_state['current_scene'] == "map":
+            self.game_state['current_scene'] = self.game_state['previous_scene']
+            self.game_state['previous_scene'] = "map"
+        elif self.game_state['current_scene'] == "opening":
+            self.game_state['current_scene'] = "playing"
+        elif input_text:
+            parsed_text = self.parser.parse(input_text)
+            if parsed_text:
+                result = self.process_parsed_text(parsed_text)
+                if result == "Quitting...":
+                    return result
+                self.game_state['user_command'] = parsed_text
+        return result
+
+    def render_static_scenes(self) -> dict[str, str]:
+        title = ''.join(f"{line}\n" for line in self.data['title'])
+        opening = ''.join(f"{string}\n" for string_list in self.data['opening'] for string in string_list)
+        return {
+            "title": f"{title}\nType START to play",
+            "opening": opening,
+            "help": self.data['help'],
+            "map": self.data['map'],
+            "victory": self.data['victory'],
+            "defeat": self.data['defeat'],
+        }
+
+    def title(self):
+        return self.scene_text['title']
+
+    def opening(self):
+        self.game_state["location_name"] = self.game_objects["locations"][self.game_state['current_location']].name
+        return self.scene_text['opening']
+
+    def help_func(self):
+        return self.scene_text['help']
+
+    def map_func(self):
+        return self.scene_text['map']
+
+    def render_location(self, location: Location) -> str:
+        text = location.description
+        if 0 < len(location.entities):
+            names = [self.game_objects.resolve(handle).name for handle in location.entities]
+            text = '\n\t'.join([f"{text}\nAround you, you can see:"] + names)
+        return text
+
+    def generate_location_text(self, location: Location):
+        # Names never change, the listing only needs rendering again after the location's entities did
+        handle = location.handle
+        return self.game_objects.rendered.render(handle, self.game_objects.version(handle), self.render_location, location)
+
+    def playing(self):
+        text = self.generate_location_text(self.game_objects["locations"][self.game_state['current_location']])
+        command = self.game_state['user_command']
+        if command and command != "":
+            result = self.action_processor.process(
+                                                command[0],
+                                                self.game_objects["locations"][self.game_state['current_location']],
+                                                self.game_objects,
+                                                self.game_state,
+                                                *command[1:]
+                                                )
+            if isinstance(result, str):
+                text = self.generate_location_text(self.game_objects["locations"][self.game_state['current_location']])
+                text = f"{text}\n\n {result}"
+            elif isinstance(result, tuple):
+                kind, target_obj_id, *message = result
+                if kind == "location":
+                    self.game_state["current_location"] = target_obj_id
+                    location = self.game_objects["locations"][target_obj_id]
+                    self.game_state["location_name"] = location.name
+                    text = self.generate_location_text(location)
+                    if message:
+                        text = f"{text}\n\n {message[0]}"
+
+            if "events" in self.game_objects:
+                event_txt = self.event_scheduler.process(self.game_state['current_location'],
+                                                         self.game_state["god_mode"])
+                text += f"\n{event_txt}"
+            self.game_state["previous_text"] = text
+        if not command:
+            text = self.game_state.get("previous_text", text)
+
+        return text
+
+    def victory(self):
+        return self.scene_text['victory']
+
+    def defeat(self):
+        return self.scene_text['defeat']
@@ -0,0 +1,30 @@
+"""Packed integer references to game objects.
+
+A handle is obj_id << KIND_BITS | kind code, so a single int replaces the
+(kind, obj_id) tuple and the f'{kind}s' section name needed to look it up.
+"""
+
+KINDS = ('game_object', 'location', 'item', 'transition', 'player', 'container', 'npc', 'journal', 'event', 'intractable')
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+# World section holding the objects of each kind code
+SECTIONS = tuple(f'{kind}s' for kind in KINDS)
+KIND_BITS = 8
+KIND_MASK = (1 << KIND_BITS) - 1
+
+
+def pack(kind: str, obj_id: int) -> int:
+    return obj_id << KIND_BITS | KIND_CODES[kind]
+
+
+def unpack(handle: int) -> tuple[str, int]:
+    return KINDS[handle & KIND_MASK], handle >> KIND_BITS
+
+
+def pack_ref(ref: dict[str, int | str]) -> int:
+    """Packs a {'kind': ..., 'obj_id': ...} reference from the data files."""
+    return pack(ref['kind'], ref['obj_id'])
+
+
+def refs(handles) -> list[tuple[str, int]]:
+    """Unpacks handles into (kind, obj_id) tuples for display."""
+    return [unpack(handle) for handle in handles]
@@ -0,0 +1,250 @@
+#imports
+import os
+import json
+import time
+from app.container import Container
+from app.content import VOCABULARY_FILES, file_hash, validate
+from app.event import Event
+from app.game_object import GameObject
+from app.handle import SECTIONS, KIND_BITS, KIND_MASK
+from app.intractable import Intractable
+from app.loader import DATA_DIR, TEXT_FILES, OBJECT_TYPES, OBJECT_BUILDERS, shape_text
+from app.location import Location
+from app.world import World
+from app.world_compiler import EVENT_STATES, Problem, WorldCompiler
+
+WATCHED_FILES = [f'{name}.txt' for name in TEXT_FILES] + [f'{name}.json' for name in (*VOCABULARY_FILES, *OBJECT_TYPES)]
+
+
+class ReloadError(Exception):
+    """Raised when changed data can't be reloaded, the running world is left as it was."""
+
+
+class WorldReloader:
+    """Reloads the data files that changed on disk into a running template world and its sessions.
+
+    Only the object types whose file changed are built again. The new objects
+    are compiled together with the unchanged ones before anything is
+    replaced, so data with broken references is refused and play goes on with
+    the old data. Every attached session then keeps the runtime state of the
+    objects whose obj_id still exists, as far as it is still valid: entity
+    states, the rotation of state lists, inventories and the entities of
+    locations. The shared caches are dropped and the parser is reloaded in
+    place.
+
+    The template itself is never played, it keeps the initial state the new
+    objects are checked against. Every session playing a world spawned from
+    it must be attached. Sessions held in a StateStore can't be reloaded.
+    """
+    def __init__(self, data: dict[str, any], world: World, data_dir: str = DATA_DIR) -> None:
+        """Initializes the WorldReloader class.
+
+        Args:
+            data (dict[str, any]): Static game data the world was loaded with.
+            world (World): Template world the data was loaded into.
+            data_dir (str, optional): Directory holding the data files. Defaults to DATA_DIR.
+
+        Raises:
+            ReloadError: If world is a spawned world.
+        """
+        if world.template is not None:
+            raise ReloadError('only the template world can be reloaded, not a world spawned from it')
+        self.data = dict(data)
+        self.world = world
+        self.data_dir = data_dir
+        self.sessions = []
+        self.warnings: list[Problem] = []
+        self.hashes: dict[str, str] = {name: self.hash(name) for name in WATCHED_FILES}
+        self.stats = self.stat()
+
+    def attach(self, session) -> None:
+        """Moves a session onto the data of every later reload, until it is detached.
+
+        Args:
+            session (GameSession): Session playing a world spawned from the template.
+
+        Raises:
+            ReloadError: If the session plays another world, or the template itself.
+        """
+        if session.game_objects.template is not self.world:
+            raise ReloadError('only sessions playing a world spawned from the template can be reloaded')
+        self.sessions.append(session)
+
+    def detach(self, session) -> None:
+        self.sessions.remove(session)
+
+    def hash(self, name: str) -> str:
+        try:
+            return file_hash(os.path.join(self.data_dir, name))
+        except OSError:
+            return None
+
+    def stat(self) -> dict[str, tuple[int, int]]:
+        stats = {}
+        for name in WATCHED_FILES:
+            try:
+                stat = os.stat(os.path.join(self.data_dir, name))
+            except OSError:
+                stats[name] = None
+                continue
+            stats[name] = (stat.st_size, stat.st_mtime_ns)
+        return stats
+
+    def modified(self) -> bool:
+        """Returns whether a data file was saved since the last call, only the sizes and mtimes are read."""
+        stats = self.stat()
+        if stats == self.stats:
+            return False
+        self.stats = stats
+        return True
+
+    def reload(self) -> list[str]:
+        """Reloads the data files whose contents changed.
+
+        Returns:
+            list[str]: Names of the files reloaded, empty when none changed.
+
+        Raises:
+            ReloadError: If a changed file does not load or the world does not compile, nothing is reloaded then.
+        """
+        if 'state_store' in self.world.cache:
+            raise ReloadError('sessions held in a StateStore can not be reloaded')
+        hashes = {name: self.hash(name) for name in WATCHED_FILES}
+        changed = [name for name in WATCHED_FILES if hashes[name] != self.hashes[name]]
+        if not changed:
+            return []
+
+        data = self.read(changed)
+        sections = self.build(data)
+        self.warnings = self.check(sections) if sections else []
+
+        for object_type, objects in sections.items():
+            self.world[object_type] = objects
+        # Everything shared was built from the old objects, the parser is kept so wrapped parse methods stay valid
+        parser = self.world.cache.get('parser')
+        self.world.cache.clear()
+        if parser is not None:
+            parser.load(self.world.names())
+            self.world.cache['parser'] = parser
+        self.world.linked.clear()
+        WorldCompiler(self.world).link()
+        if sections:
+            self.world.problems = self.warnings
+
+        self.data.update({name: value for name, value in data.items() if name not in VOCABULARY_FILES})
+        for session in self.sessions:
+            self.rebase(session.game_objects, list(sections))
+            session.reload(self.data)
+        self.hashes = hashes
+        return changed
+
+    def read(self, changed: list[str]) -> dict[str, any]:
+        data = {}
+        for name in changed:
+            stem, extension = os.path.splitext(name)
+            try:
+                with open(os.path.join(self.data_dir, name), 'r', encoding='utf-8') as data_file:
+                    text = data_file.read()
+                data[stem] = shape_text(stem, text) if extension == '.txt' else json.loads(text)
+            except (OSError, ValueError) as error:
+                raise ReloadError(f'{name}: {error}') from error
+            problems = validate(stem, data[stem])
+            if problems:
+                raise ReloadError('\n'.join(f'{name}: {problem}' for problem in problems))
+        return data
+
+    def build(self, data: dict[str, any]) -> dict[str, dict[int, GameObject]]:
+        """Builds the objects of the object types that changed, they belong to the template from the start."""
+        sections = {}
+        for object_type in OBJECT_TYPES:
+            if object_type not in data:
+                continue
+            build = OBJECT_BUILDERS[object_type]
+            objects = sections[object_type] = {}
+            for record in data[object_type]:
+                try:
+                    game_obj = build(record)
+                except (KeyError, TypeError, ValueError) as error:
+                    raise ReloadError(f'{object_type}.json: record {record.get("obj_id")!r} does not load: {error!r}') from error
+                game_obj.world = self.world
+                objects[game_obj.obj_id] = game_obj
+        return sections
+
+    def check(self, sections: dict[str, dict[int, GameObject]]) -> list[Problem]:
+        """Compiles the new objects with the unchanged ones, returns the warnings."""
+        candidate = World()
+        for object_type, objects in self.world.items():
+            candidate[object_type] = sections.get(object_type, objects)
+        compiler = WorldCompiler(candidate)
+        compiler.check()
+        if compiler.errors():
+            raise ReloadError('\n'.join(str(problem) for problem in compiler.errors()))
+        return compiler.warnings()
+
+    def exists(self, handle: int) -> bool:
+        code = handle & KIND_MASK
+        return code < len(SECTIONS) and handle >> KIND_BITS in self.world.get(SECTIONS[code], ())
+
+    def rebase(self, world: World, object_types: list[str]) -> None:
+        """Moves the runtime state of a session's objects onto the objects reloaded in their place.
+
+        Args:
+            world (World): World of the session, spawned from the template.
+            object_types (list[str]): Object types whose objects were built again.
+        """
+        world.linked.clear()
+        world.rendered.clear()
+        for object_type in object_types:
+            # Overlays that were never accessed read the new template without help
+            section = world[object_type]
+            old_objects = section.objects
+            section.templates = self.world[object_type]
+            section.objects = {}
+            for obj_id, old in old_objects.items():
+                if obj_id in section:
+                    self.carry(old, section[obj_id])
+        for objects in world.values():
+            for game_obj in list(objects.objects.values()):
+                if isinstance(game_obj, (Location, Container)):
+                    self.prune(game_obj)
+
+    def carry(self, old: GameObject, new: GameObject) -> None:
+        """Restores the runtime state of an object onto its reloaded replacement, the fields the new data allows."""
+        fields = old.snapshot()
+        if 'state' in fields:
+            if isinstance(new, Event):
+                states = EVENT_STATES
+            elif isinstance(new, Intractable):
+                states = new.state_descriptions
+            else:
+                states = None
+            if states is not None and fields['state'] not in states:
+                del fields['state']
+        # A rotation is only kept when the list still holds the same states
+        if 'state_list' in fields and sorted(fields['state_list']) != sorted(new.state_list):
+            del fields['state_list']
+        for name in ('inventory', 'entities'):
+            if name in fields:
+                fields[name] = [handle for handle in fields[name] if self.exists(handle)]
+        new.restore(fields)
+
+    def prune(self, game_obj: Location or Container) -> None:
+        # Handles of deleted objects are dropped, and the name index is rebuilt on its next lookup
+        name = 'entities' if isinstance(game_obj, Location) else 'inventory'
+        handles = game_obj.owned(name)
+        if handles is not None and not all(self.exists(handle) for handle in handles):
+            game_obj.restore({name: [handle for handle in handles if self.exists(handle)]})
+        game_obj.forget('_index')
+
+    def report(self) -> str:
+        """Reloads and describes the outcome for the player or author who asked, never raises."""
+        start = time.perf_counter()
+        try:
+            changed = self.reload()
+        except ReloadError as error:
+            return f'The data was not reloaded:\n{error}'
+        if not changed:
+            return 'The data has not changed.'
+        lines = [f'Reloaded {", ".join(changed)} in {(time.perf_counter() - start) * 1000:.0f} ms.']
+        lines += [str(warning) for warning in self.warnings]
+        return '\n'.join(lines)
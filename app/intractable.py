@@ -1,9 +1,14 @@
 #imports
 
 from app.entity import Entity
+from app.handle import pack_ref
+from app.text_store import resolve_text
 
 
 class Intractable(Entity):
+    __slots__ = ('state_descriptions', 'state_transitions', 'state_list', 'key', 'key_message', 'key_state')
+    kind = 'intractable'
+
     def __init__(self,
                  obj_id: str,
                  name: str,
@@ -19,29 +24,50 @@ class Intractable(Entity):
         self.state_transitions = state_transitions
         self.state_list = state_list
         if not key_info:
-            key_info = {'key': '', 'message': '', 'state': ''}
+            key_info = {'key': None, 'message': '', 'state': ''}
         else:
-            key_info['key'] = (key_info['key']['kind'], key_info['key']['obj_id'])
+            key_info = dict(key_info)
+            key_info['key'] = pack_ref(key_info['key'])
         self.key = key_info['key']
         self.key_message = key_info['message']
         self.key_state = key_info['state']
 
+    def render_description(self) -> str:
+        return f"{resolve_text(self._description)} {resolve_text(self.state_descriptions[self.state])}"
+
     @property
     def description(self) -> str:
-        return f"{self._description} {self.state_descriptions[self.state]}"
+        return self.cached_description(self.state)
+
+    def snapshot(self) -> dict[str, any]:
+        fields = super().snapshot()
+        fields['state_list'] = list(self.state_list)
+        return fields
+
+    def restore(self, fields: dict[str, any]) -> None:
+        super().restore(fields)
+        if 'state_list' in fields:
+            self.state_list = list(fields['state_list'])
+
+    def rotate(self) -> str:
+        """Moves the first state of state_list to the end and returns it."""
+        state_list = self.own('state_list')
+        state = state_list.pop(0)
+        state_list.append(state)
+        return state
 
     def cycle(self) -> str:
         if self.state in self.state_list:
-            self.state = self.state_list.pop(0)
-            self.state_list.append(self.state)
-            return self.state_transitions[self.state]
+            self.state = self.rotate()
+            self.touch()
+            return resolve_text(self.state_transitions[self.state])
         return f'The {self.name} remains {self.state}. Perhaps you are missing something?'
 
-    def unlock(self, key: tuple[str, int], name: str) -> str:
-        if self.key:
+    def unlock(self, key: int, name: str) -> str:
+        if self.key is not None:
             if key == self.key:
                 self.state = self.key_state
-                return self.key_message
+                return resolve_text(self.key_message)
             return f"The {name} doesn't seem to work here..."
         return f"I don't think I can use anything on the {self.name}"
     
\ No newline at end of file
@@ -3,4 +3,5 @@ from app.entity import Entity
 
 
 class Item(Entity):
-    pass
+    __slots__ = ()
+    kind = 'item'
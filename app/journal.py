@@ -1,13 +1,20 @@
 from app.game_object import GameObject
-import random
+from app.text_store import resolve_text
 
 
 class Journal(GameObject):
+    __slots__ = ('_story', '_dialogue')
+    kind = 'journal'
+
     def __init__(self, obj_id: str, name: str, description: str, dialogue: list[str], story: str  ):
         super().__init__(obj_id, name, description)
-        self.story = story
+        self._story = story
         self._dialogue = dialogue
 
+    @property
+    def story(self) -> str:
+        return resolve_text(self._story)
+
     @property
     def dialogue(self) -> str:
-        return random.choice(self._dialogue)
+        return resolve_text(self.rng.choice(self._dialogue))
@@ -0,0 +1,191 @@
+#imports
+import os
+import json
+from app.event import Event
+from app.npc import Npc
+from app.location import Location
+from app.item import Item
+from app.transition import Transition
+from app.player import Player
+from app.container import Container
+from app.journal import Journal
+from app.world import World
+from app.world_compiler import compile_world
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+BUNDLE_PATH = os.path.join(DATA_DIR, 'world.bundle')
+
+TEXT_FILES = ['title', 'opening', 'help', 'map', 'victory', 'defeat']
+OBJECT_TYPES = ['locations', 'items', 'transitions', 'players', 'containers', 'npcs', "journals", 'events']
+
+
+def shape_text(name: str, text: str) -> any:
+    """Shapes the raw text of a scene file the way the scenes expect it.
+
+    Args:
+        name (str): Name of the text file without extension.
+        text (str): Contents of the file.
+
+    Returns:
+        any: List of lines for the title, list of 50 line splices for the opening, the text otherwise.
+    """
+    if name == 'title':
+        return text.splitlines(keepends=True)
+    if name == 'opening':
+        plot = text.splitlines()
+        plot_splice = []
+        splice_len = 50
+        for i in range(0, len(plot), splice_len):
+            plot_splice.append(plot[i:i+splice_len])
+        return plot_splice
+    return text
+
+
+def load_data(data_dir: str = DATA_DIR) -> dict[str, any]:
+    data = {}
+    for name in TEXT_FILES:
+        with open(os.path.join(data_dir, f"{name}.txt"), "r", encoding="utf-8") as text_file:
+            data[name] = shape_text(name, text_file.read())
+
+    for object_type in OBJECT_TYPES:
+        with open(os.path.join(data_dir, f"{object_type}.json"), "r", encoding="utf-8") as loading:
+            data[object_type] = json.load(loading)
+
+    return data
+
+
+def build_npc(npc: dict) -> Npc:
+    return Npc(npc['obj_id'],
+               npc['name'],
+               npc['description'],
+               npc['state'],
+               npc.get('inventory', []),
+               npc.get('dialogue', [])
+               )
+
+
+def build_location(location: dict) -> Location:
+    return Location(location['obj_id'],
+                    location['name'],
+                    location['description'],
+                    location.get('entities', [])
+                    )
+
+
+def build_journal(journal: dict) -> Journal:
+    return Journal(journal['obj_id'],
+                   journal['name'],
+                   journal['description'],
+                   journal['dialogue'],
+                   journal['story']
+                   )
+
+
+def build_item(item: dict) -> Item:
+    return Item(item['obj_id'], item['name'], item['description'], None)
+
+
+def build_transition(transition: dict) -> Transition:
+    return Transition(transition['obj_id'],
+                      transition['name'],
+                      transition['description'],
+                      transition['state'],
+                      transition['state_descriptions'],
+                      transition['state_transitions'],
+                      transition['state_list'],
+                      transition.get('key_info', {}),
+                      transition['target'],
+                      transition['blocking_states']
+                      )
+
+
+def build_player(player: dict) -> Player:
+    return Player(player['obj_id'],
+                  player['name'],
+                  player['description'],
+                  player['state'],
+                  player.get('inventory', [])
+                  )
+
+
+def build_container(container: dict) -> Container:
+    return Container(container['obj_id'],
+                     container['name'],
+                     container['description'],
+                     container['state'],
+                     container.get('inventory', [])
+                     )
+
+
+def build_event(event_data: dict) -> Event:
+    return Event(event_data['obj_id'],
+                 event_data['name'],
+                 event_data['description'],
+                 event_data['state'],
+                 event_data['triggers'],
+                 event_data['affected_objects'],
+                 event_data['change']
+                 )
+
+
+OBJECT_BUILDERS = {
+    'npcs': build_npc,
+    'locations': build_location,
+    'journals': build_journal,
+    'items': build_item,
+    'transitions': build_transition,
+    'players': build_player,
+    'containers': build_container,
+    'events': build_event,
+}
+
+
+def load_game_objects(data: dict[str, any], strict: bool = True) -> World:
+    """Builds the game objects from the data and compiles them.
+
+    Args:
+        data (dict[str, any]): Data from load_data.
+        strict (bool, optional): Raise when a reference or state name is broken. Defaults to True.
+
+    Returns:
+        World: Template world with every handle linked to its object, the compiler's warnings in its problems.
+
+    Raises:
+        WorldError: If strict and the world does not compile.
+    """
+    objects = World()
+    for object_type, build in OBJECT_BUILDERS.items():
+        objects[object_type] = {}
+        for record in data[object_type]:
+            game_obj = build(record)
+            objects[object_type][game_obj.obj_id] = game_obj
+
+    for object_type in objects.values():
+        for game_obj in object_type.values():
+            game_obj.world = objects
+
+    objects.problems = compile_world(objects, strict)
+    return objects
+
+
+def load_world(bundle_path: str = BUNDLE_PATH, data_dir: str = DATA_DIR) -> tuple[dict[str, any], World]:
+    """Loads the game data and objects, from the compiled bundle when it is up to date.
+
+    Args:
+        bundle_path (str, optional): Path of the compiled bundle. Defaults to BUNDLE_PATH.
+        data_dir (str, optional): Directory holding the source data files. Defaults to DATA_DIR.
+
+    Returns:
+        tuple[dict[str, any], World]: Static game data and the game objects.
+    """
+    from app.bundle import Bundle, BundleError
+
+    if os.path.exists(bundle_path):
+        try:
+            bundle = Bundle(bundle_path)
+        except BundleError:
+            bundle = None
+        if bundle is not None and not bundle.is_stale(data_dir):
+            return bundle.data(), bundle.world()
+    data = load_data(data_dir)
+    return data, load_game_objects(data)
@@ -1,11 +1,49 @@
 #imports
+from array import array
+from app.entity_index import EntityIndex, name_index
 from app.game_object import GameObject
+from app.handle import pack_ref
 
 
 class Location(GameObject):
+    __slots__ = ('entities', '_index')
+    kind = 'location'
+
     def __init__(self, obj_id: str, name: str, description: str, entities: list[dict[str, int or str]]):
         super().__init__(obj_id, name, description)
-        self.entities = []
-        if entities:
-            for entity in entities:
-                self.entities.append((entity['kind'], entity['obj_id']))
\ No newline at end of file
+        self.entities = array('q', [pack_ref(entity) for entity in entities or ()])
+
+    @property
+    def index(self) -> EntityIndex:
+        # Built on first lookup so overlays index the objects of their own world
+        index = self.owned('_index')
+        if index is None:
+            index = EntityIndex(name_index(self.world))
+            for handle in self.entities:
+                index.add(self.world.resolve(handle))
+            self._index = index
+        return index
+
+    def snapshot(self) -> dict[str, any]:
+        fields = super().snapshot()
+        fields['entities'] = self.entities.tolist()
+        return fields
+
+    def restore(self, fields: dict[str, any]) -> None:
+        super().restore(fields)
+        if 'entities' in fields:
+            self.entities = array('q', fields['entities'])
+            self.forget('_index')
+
+    def add_entity(self, entity: GameObject) -> None:
+        index = self.index
+        self.own('entities').append(entity.handle)
+        index.add(entity)
+        self.touch()
+
+    def remove_entity(self, entity: GameObject) -> GameObject:
+        index = self.index
+        self.own('entities').remove(entity.handle)
+        index.remove(entity)
+        self.touch()
+        return entity
@@ -0,0 +1,148 @@
+#imports
+from collections import deque
+from app.fuzzy_index import FuzzyIndex
+from app.handle import unpack
+from app.transition import Transition
+from app.world import World
+
+ARTICLES = ('the', 'a', 'an')
+
+
+class LocationEdges:
+    """Connectivity of a template world, every transition is an edge from the location holding it.
+
+    Transitions are never taken or dropped, so the edges are the same in every
+    session and built once per template. Only whether an edge is blocked is
+    up to the session.
+    """
+    def __init__(self, template: World) -> None:
+        self.exits: dict[int, list[tuple[int, int]]] = {}
+        self.edges: dict[int, tuple[int, int]] = {}
+        self.names: dict[str, int] = {}
+        for location in template.get('locations', {}).values():
+            self.names.setdefault(location.name, location.obj_id)
+            # The parser drops articles, so "The Beach" arrives as "beach"
+            words = location.name.split()
+            if len(words) > 1 and words[0].casefold() in ARTICLES:
+                self.names.setdefault(' '.join(words[1:]), location.obj_id)
+            exits = self.exits[location.obj_id] = []
+            for handle in location.entities:
+                transition = template.resolve(handle)
+                if isinstance(transition, Transition):
+                    _, target = unpack(transition.target)
+                    if target in template['locations']:
+                        exits.append((handle, target))
+                        self.edges[handle] = (location.obj_id, target)
+        self.fuzzy = FuzzyIndex(list(self.names))
+
+
+class LocationGraph:
+    """Shortest paths between the locations of one session over the transitions that are not blocked.
+
+    The breadth first tree from a location is computed on its first query and
+    kept. The graph chains itself in front of the world's observer, and when a
+    transition's blocked status flips it only drops the trees that change: a
+    blocked edge invalidates the trees that enter a location through it, an
+    opened edge the trees it makes a shorter or new path in.
+    """
+    def __init__(self, world: World) -> None:
+        """Initializes the LocationGraph class.
+
+        Args:
+            world (World): World of the session.
+        """
+        self.world = world
+        self.blocked: dict[int, bool] = None
+        self.trees: dict[int, tuple[dict[int, int], dict[int, int]]] = {}
+
+    @property
+    def edges(self) -> LocationEdges:
+        # Built on the first query, a session that never travels does not build every location and transition
+        return self.world.shared('location_edges', LocationEdges)
+
+    def attach(self) -> None:
+        """Chains the graph in front of the world's observer to learn about transition changes."""
+        forward = self.world.observer
+
+        def observer(handle: int) -> None:
+            self.changed(handle)
+            if forward is not None:
+                forward(handle)
+
+        self.world.observer = observer
+
+    def reload(self) -> None:
+        """Picks up the edges of a reloaded world, every tree is computed again on its next query."""
+        self.blocked = None
+        self.trees = {}
+
+    def changed(self, handle: int) -> None:
+        if self.blocked is None or handle not in self.edges.edges:
+            return
+        blocked = self.world.resolve(handle).blocked
+        if blocked == self.blocked[handle]:
+            return
+        self.blocked[handle] = blocked
+        source, target = self.edges.edges[handle]
+        for origin, (distances, via) in list(self.trees.items()):
+            if blocked:
+                stale = via.get(target) == handle
+            else:
+                stale = source in distances and (target not in distances or distances[source] + 1 < distances[target])
+            if stale:
+                del self.trees[origin]
+
+    def tree(self, source: int) -> tuple[dict[int, int], dict[int, int]]:
+        """Returns the moves to every reachable location and the transition each is entered through."""
+        tree = self.trees.get(source)
+        if tree is not None:
+            return tree
+        if self.blocked is None:
+            self.blocked = {handle: self.world.resolve(handle).blocked for handle in self.edges.edges}
+        distances = {source: 0}
+        via = {}
+        queue = deque([source])
+        while queue:
+            location = queue.popleft()
+            for handle, target in self.edges.exits.get(location, ()):
+                if target not in distances and not self.blocked[handle]:
+                    distances[target] = distances[location] + 1
+                    via[target] = handle
+                    queue.append(target)
+        tree = self.trees[source] = (distances, via)
+        return tree
+
+    def reachable(self, source: int) -> dict[int, int]:
+        """Returns the number of moves from source to every location reachable from it."""
+        return self.tree(source)[0]
+
+    def path(self, source: int, target: int) -> list[int]:
+        """Finds the shortest open path between two locations.
+
+        Args:
+            source (int): Id of the location to start from.
+            target (int): Id of the location to reach.
+
+        Returns:
+            list[int]: Handles of the transitions to take in order, None if target can't be reached.
+        """
+        distances, via = self.tree(source)
+        if target not in distances:
+            return None
+        path = []
+        location = target
+        while location != source:
+            handle = via[location]
+            path.append(handle)
+            location = self.edges.edges[handle][0]
+        path.reverse()
+        return path
+
+    def find(self, name: str) -> int:
+        """Returns the id of the location with this name, or the only one close to it, None otherwise."""
+        location = self.edges.names.get(name)
+        if location is None:
+            closest = self.edges.fuzzy.correct(name)
+            if closest is not None:
+                location = self.edges.names[closest]
+        return location
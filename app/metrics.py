@@ -0,0 +1,233 @@
+#imports
+import json
+import os
+import time
+from bisect import bisect_left
+from collections.abc import Mapping
+from types import SimpleNamespace
+
+STAGES = ('parse', 'action', 'events', 'render')
+# Upper bounds in seconds of the command latency buckets, the last bucket is +Inf
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class Histogram:
+    """Counts of observations per latency bucket, with their sum."""
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> list[int]:
+        """Observations at or below each bound, the way Prometheus buckets count them."""
+        running = 0
+        counts = []
+        for count in self.counts:
+            running += count
+            counts.append(running)
+        return counts
+
+    def quantile(self, fraction: float) -> float:
+        """Returns the bound of the bucket holding the quantile, inf past the last bound."""
+        rank = fraction * self.count
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), self.cumulative()):
+            if count >= rank:
+                return bound
+        return float('inf')
+
+
+class Metrics:
+    """Stage timings, event counts and command latencies of instrumented sessions.
+
+    The game never calls into Metrics. instrument() shadows the methods of one
+    session with counting and timing wrappers, the way replay.py times turn
+    stages, so a session that is not instrumented runs exactly the code it
+    did before. One Metrics can be shared by every session of a process.
+    Events a BatchEvents pass evaluates for a session are not counted.
+    """
+    def __init__(self) -> None:
+        self.stage_seconds: dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self.stage_calls: dict[str, int] = dict.fromkeys(STAGES, 0)
+        self.commands: dict[str, Histogram] = {}
+        self.evaluations: dict[int, int] = {}
+        self.fires: dict[int, int] = {}
+        self.sessions = 0
+        self.turns = 0
+
+    def timed(self, stage: str, func: callable) -> callable:
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.stage_seconds[stage] += time.perf_counter() - start
+                self.stage_calls[stage] += 1
+        return timed
+
+    def instrument(self, session) -> None:
+        """Wraps the parser, action, event and render entry points of a session.
+
+        Args:
+            session (GameSession): Session to collect metrics from.
+        """
+        self.sessions += 1
+        parser = session.parser
+        # Only verbs the parser knows become labels, so typos can't grow the metrics without bound
+        verbs = set(parser.tokens.values()) - {None} | parser.commands
+        parse = self.timed('parse', parser.parse)
+        step = session.step
+        command = 'none'
+
+        def parse_command(user_input: str) -> list[str]:
+            nonlocal command
+            parsed = parse(user_input)
+            if parsed:
+                command = parsed[0] if parsed[0] in verbs else 'other'
+            return parsed
+
+        def timed_step(input_text: str):
+            nonlocal command
+            command = 'none'
+            start = time.perf_counter()
+            try:
+                return step(input_text)
+            finally:
+                self.observe(command, time.perf_counter() - start)
+
+        # Instance attributes shadow the methods, the parser is shared so it gets a per session stand-in
+        session.parser = SimpleNamespace(parse=parse_command)
+        session.step = timed_step
+        session.action_processor.process = self.timed('action', session.action_processor.process)
+        session.event_scheduler.process = self.timed('events', session.event_scheduler.process)
+        session.generate_location_text = self.timed('render', session.generate_location_text)
+
+        event_handler = session.event_handler
+        check_event = event_handler.check_event
+        fire_event = event_handler.fire_event
+
+        def counted_check(event, current_location: int, explain: bool = False):
+            self.evaluations[event.obj_id] = self.evaluations.get(event.obj_id, 0) + 1
+            return check_event(event, current_location, explain)
+
+        def counted_fire(event, god_mode: bool) -> str:
+            self.fires[event.obj_id] = self.fires.get(event.obj_id, 0) + 1
+            return fire_event(event, god_mode)
+
+        event_handler.check_event = counted_check
+        event_handler.fire_event = counted_fire
+
+    def observe(self, command: str, seconds: float) -> None:
+        histogram = self.commands.get(command)
+        if histogram is None:
+            histogram = self.commands[command] = Histogram()
+        histogram.observe(seconds)
+        self.turns += 1
+
+    def snapshot(self) -> dict[str, any]:
+        """Returns every metric as plain data for JSON."""
+        return {
+            'sessions': self.sessions,
+            'turns': self.turns,
+            'stages': {
+                stage: {'seconds': self.stage_seconds[stage], 'calls': self.stage_calls[stage]} for stage in STAGES
+            },
+            'events': {
+                str(event_id): {'evaluated': self.evaluations.get(event_id, 0), 'fired': self.fires.get(event_id, 0)}
+                for event_id in sorted(self.evaluations.keys() | self.fires.keys())
+            },
+            'commands': {
+                command: {
+                    'buckets': dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ['+Inf'], histogram.cumulative())),
+                    'sum': histogram.total,
+                    'count': histogram.count,
+                }
+                for command, histogram in sorted(self.commands.items())
+            },
+        }
+
+    def prometheus(self) -> str:
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = [
+            '# HELP stranded_sessions_total Sessions instrumented.',
+            '# TYPE stranded_sessions_total counter',
+            f'stranded_sessions_total {self.sessions}',
+            '# HELP stranded_turns_total Commands stepped.',
+            '# TYPE stranded_turns_total counter',
+            f'stranded_turns_total {self.turns}',
+            '# HELP stranded_stage_seconds_total Time spent in each stage of a turn.',
+            '# TYPE stranded_stage_seconds_total counter',
+        ]
+        lines += [f'stranded_stage_seconds_total{{stage="{stage}"}} {self.stage_seconds[stage]!r}' for stage in STAGES]
+        lines += [
+            '# HELP stranded_stage_calls_total Calls of each stage of a turn.',
+            '# TYPE stranded_stage_calls_total counter',
+        ]
+        lines += [f'stranded_stage_calls_total{{stage="{stage}"}} {self.stage_calls[stage]}' for stage in STAGES]
+        lines += [
+            '# HELP stranded_event_evaluations_total Times the triggers of each event were checked.',
+            '# TYPE stranded_event_evaluations_total counter',
+        ]
+        lines += [f'stranded_event_evaluations_total{{event="{event_id}"}} {count}' for event_id, count in sorted(self.evaluations.items())]
+        lines += [
+            '# HELP stranded_event_fires_total Times each event fired.',
+            '# TYPE stranded_event_fires_total counter',
+        ]
+        lines += [f'stranded_event_fires_total{{event="{event_id}"}} {count}' for event_id, count in sorted(self.fires.items())]
+        lines += [
+            '# HELP stranded_command_seconds Time to step one command, by verb.',
+            '# TYPE stranded_command_seconds histogram',
+        ]
+        for command, histogram in sorted(self.commands.items()):
+            for bound, count in zip([repr(bound) for bound in LATENCY_BUCKETS] + ['+Inf'], histogram.cumulative()):
+                lines.append(f'stranded_command_seconds_bucket{{command="{command}",le="{bound}"}} {count}')
+            lines.append(f'stranded_command_seconds_sum{{command="{command}"}} {histogram.total!r}')
+            lines.append(f'stranded_command_seconds_count{{command="{command}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> None:
+        """Writes a snapshot, JSON when the path ends in .json and Prometheus text otherwise.
+
+        The file is replaced in one step, so a collector never reads half of it.
+        """
+        if path.endswith('.json'):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.prometheus()
+        partial = f'{path}.tmp'
+        with open(partial, 'w', encoding='utf-8') as metrics_file:
+            metrics_file.write(text)
+        os.replace(partial, path)
+
+    def format(self, events: Mapping = None) -> str:
+        """Formats the metrics for the god mode stats command.
+
+        Args:
+            events (Mapping, optional): Events by obj_id to name the event counts with. Defaults to None.
+
+        Returns:
+            str: Report with a line per stage, command and evaluated event.
+        """
+        lines = [f'{self.turns} turns in {self.sessions} session{"s" if self.sessions != 1 else ""}']
+        lines.append(f"\t{'stage':<10}{'calls':>8}{'total ms':>12}{'mean us':>10}")
+        for stage in STAGES:
+            calls = self.stage_calls[stage]
+            seconds = self.stage_seconds[stage]
+            lines.append(f"\t{stage:<10}{calls:>8}{seconds * 1e3:>12.2f}{seconds * 1e6 / max(1, calls):>10.1f}")
+        lines.append(f"\t{'command':<18}{'count':>8}{'mean us':>12}{'p95 <= ms':>10}")
+        for command, histogram in sorted(self.commands.items()):
+            lines.append(
+                f"\t{command:<18}{histogram.count:>8}{histogram.total * 1e6 / max(1, histogram.count):>12.1f}"
+                f"{histogram.quantile(0.95) * 1e3:>10g}"
+            )
+        lines.append(f"\t{'event':<30}{'checked':>8}{'fired':>8}")
+        for event_id in sorted(self.evaluations.keys() | self.fires.keys()):
+            name = str(event_id) if events is None or event_id not in events else f'{events[event_id].name}|{event_id}'
+            lines.append(f"\t{name[:30]:<30}{self.evaluations.get(event_id, 0):>8}{self.fires.get(event_id, 0):>8}")
+        return '\n'.join(lines)
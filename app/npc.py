@@ -1,8 +1,11 @@
 from app.container import Container
-import random
+from app.text_store import resolve_text
 
 
 class Npc(Container):
+    __slots__ = ('_dialogue',)
+    kind = 'npc'
+
     def __init__(self,
                  obj_id: str,
                  name: str,
@@ -18,5 +21,5 @@ class Npc(Container):
         
     @property
     def dialogue(self) -> str:
-        return random.choice(self._dialogue)
+        return resolve_text(self.rng.choice(self._dialogue))
         
\ No newline at end of file
@@ -1,81 +1,145 @@
 #imports
 from os import path
+from collections import OrderedDict
 import json
+from app.fuzzy_index import FuzzyIndex
+from app.loader import DATA_DIR
+
+# Key of the trie node ending a phrase, words are never empty
+PHRASE_END = ''
+
 
 class Parser:
-    def __init__(self) -> None:
-        with open(
-            path.abspath(f"{'/'.join(path.abspath(__file__).split('/')[:-1])}/../data/actions.json"),
-            encoding="utf-8"
-            ) as actions_file:
-            actions = json.load(actions_file)
-
-        self.action_list: list[str] = []
-        self.action_synonyms: dict[str, str] = {}
-
-        for action in list(actions.keys()):
-            self.action_list.append(action)
-            for synonym in actions[action]:
-                self.action_synonyms[synonym] = action
-
-        with open(
-            path.abspath(f"{'/'.join(path.abspath(__file__).split('/')[:-1])}/../data/selectors.json"),
-            encoding="utf-8"
-            ) as selectors_file:
-            selectors = json.load(selectors_file)
-
-        self.selector_list: list[str] = []
-        self.selector_synonyms: dict[str, str] = {}
-
-        for selector in list(selectors.keys()):
-            self.selector_list.append(selector)
-            for synonym in selectors[selector]:
-                self.selector_synonyms[synonym] = selector
-
-        with open(
-            path.abspath(f"{'/'.join(path.abspath(__file__).split('/')[:-1])}/../data/reservedkeywords.json"),
-            encoding="utf-8"
-            ) as keywords_file:
-            keywords = json.load(keywords_file)
-
-        self.reserved_list: list[str] = []
-        self.reserved_synonyms: dict[str, str] = {}
-
-        for keyword in list(keywords.keys()):
-            self.reserved_list.append(keywords)
-            for synonym in keywords[keyword]:
-                self.reserved_synonyms[synonym] = keyword
+    """Turns a line of player input into a command list.
+
+    The action, selector and reserved keyword vocabularies are compiled into a
+    single token table mapping every word to its canonical form, or to None for
+    the selector words that are dropped. Multi-word object names are matched
+    longest first through a trie of their words and kept as one token. An
+    unknown first word is corrected to the closest verb when exactly one is
+    close enough. Parsed commands are kept in a bounded LRU keyed by the
+    whitespace normalized input.
+    """
+    def __init__(self, names: list[str] = (), commands: list[str] = (), data_dir: str = DATA_DIR,
+                 cache_size: int = 1024) -> None:
+        """Initializes the Parser class.
+
+        Args:
+            names (list[str], optional): Object names, the ones with several words are matched as phrases. Defaults to ().
+            commands (list[str], optional): Verbs handled outside the vocabulary files, kept as typed. Defaults to ().
+            data_dir (str, optional): Directory holding the vocabulary files. Defaults to DATA_DIR.
+            cache_size (int, optional): Number of parsed inputs to keep. Defaults to 1024.
+        """
+        self.commands: set[str] = set(commands)
+        self.data_dir = data_dir
+        self.cache_size = cache_size
+        self.load(names)
+
+    def load(self, names: list[str]) -> None:
+        """Reads the vocabulary files and compiles the tables, again whenever the data is reloaded.
+
+        The parser is shared by every session of a world, reloading it in place
+        keeps every session and anything wrapping its parse method on the new
+        vocabulary.
+
+        Args:
+            names (list[str]): Object names, the ones with several words are matched as phrases.
+        """
+        vocabulary = {}
+        for name in ('actions', 'selectors', 'reservedkeywords'):
+            with open(path.join(self.data_dir, f'{name}.json'), encoding="utf-8") as vocabulary_file:
+                vocabulary[name] = json.load(vocabulary_file)
+
+        self.action_list: list[str] = list(vocabulary['actions'].keys())
+        self.selector_list: list[str] = list(vocabulary['selectors'].keys())
+        self.reserved_list: list[str] = list(vocabulary['reservedkeywords'].keys())
+
+        # Filled from the lowest precedence up so later entries win, words not in it are kept as typed
+        self.tokens: dict[str, str] = {}
+        for keyword, synonyms in vocabulary['reservedkeywords'].items():
+            for synonym in synonyms:
+                self.tokens[synonym] = keyword
+        for selector, synonyms in vocabulary['selectors'].items():
+            for synonym in synonyms:
+                self.tokens[synonym] = None
+            self.tokens[selector] = None
+        for action, synonyms in vocabulary['actions'].items():
+            for synonym in synonyms:
+                self.tokens[synonym] = action
+            self.tokens[action] = action
+        self.names: set[str] = set(names)
+        self.verbs = FuzzyIndex({word for word, token in self.tokens.items() if token} | set(self.tokens.values()) - {None} | self.commands)
+
+        self.phrases: dict[str, dict] = {}
+        for name in names:
+            words = name.split()
+            if len(words) > 1:
+                node = self.phrases
+                for word in words:
+                    node = node.setdefault(word, {})
+                node[PHRASE_END] = name
+
+        self.cache: OrderedDict[str, tuple[str, ...]] = OrderedDict()
 
     def process_token(self, token: str) -> str:
-        if token in self.action_list:
-            return token
-        if token in list(self.action_synonyms.keys()):
-            return self.action_synonyms[token]
-        if token in self.selector_list:
-            return None
-            # return token
-        if token in list(self.selector_synonyms.keys()):
-            return None
-            #return self.selector_synonyms[token]
-        if token in self.reserved_list:
-            return token
-        if token in list(self.reserved_synonyms.keys()):
-            return self.reserved_synonyms[token]
-        return token
-
-
-    def parse(self, user_input: str) -> None:
+        return self.tokens.get(token, token)
+
+    def match_phrase(self, tokens: list[str], start: int) -> tuple[str, int]:
+        """Finds the longest object name starting at tokens[start].
+
+        Returns:
+            tuple[str, int]: The name and the position after it, or (None, start).
+        """
+        phrase, end = None, start
+        node = self.phrases
+        position = start
+        while position < len(tokens):
+            node = node.get(tokens[position])
+            if node is None:
+                break
+            position += 1
+            if PHRASE_END in node:
+                phrase, end = node[PHRASE_END], position
+        return phrase, end
+
+    def correct_verb(self, word: str) -> str:
+        if word in self.commands or word in self.names or word.isdigit():
+            return word
+        verb = self.verbs.correct(word)
+        if verb is None:
+            return word
+        return self.tokens.get(verb, verb)
+
+    def parse(self, user_input: str) -> list[str]:
         tokens = user_input.split()
+        key = ' '.join(tokens)
+        command = self.cache.get(key)
+        if command is not None:
+            self.cache.move_to_end(key)
+            return list(command)
 
         command = []
-        for token in tokens:
-            processed = self.process_token(token)
+        position = 0
+        while position < len(tokens):
+            # The first word stays a verb even when an object name starts with it
+            if command and self.phrases:
+                phrase, end = self.match_phrase(tokens, position)
+                if phrase is not None:
+                    command.append(phrase)
+                    position = end
+                    continue
+            word = tokens[position]
+            if word in self.tokens:
+                processed = self.tokens[word]
+            elif command:
+                processed = word
+            else:
+                processed = self.correct_verb(word)
             if processed:
-                if processed in self.selector_list:
-                    if len(command) < 1:
-                        continue
-                    elif command[-1] not in self.selector_list and command[0] not in self.selector_list:
-                        command.append(processed)
-                else:
-                    command.append(processed)
+                command.append(processed)
+            position += 1
+
+        self.cache[key] = tuple(command)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
         return command
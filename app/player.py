@@ -3,12 +3,15 @@ from app.container import Container
 
 
 class Player(Container):
+    __slots__ = ()
+    kind = 'player'
+
     def __init__(self,
                  obj_id: int,
                  name: str,
                  description: str,
                  state: str,
-                 inventory: list[tuple[str, int]]
+                 inventory: list[dict[str, int or str]]
                  ):
         super().__init__(obj_id, name, description, state, inventory)
         
\ No newline at end of file
@@ -0,0 +1,42 @@
+from collections import OrderedDict
+
+
+class RenderCache:
+    """Bounded LRU of rendered text, each entry tagged with the version it was rendered at.
+
+    A lookup with a different version renders again and replaces the entry, so
+    callers invalidate by changing the version they pass instead of deleting.
+    """
+    def __init__(self, capacity: int = 1024) -> None:
+        """Initializes the RenderCache class.
+
+        Args:
+            capacity (int, optional): Number of rendered texts to keep. Defaults to 1024.
+        """
+        self.capacity = capacity
+        self.entries: OrderedDict[any, tuple[any, str]] = OrderedDict()
+
+    def render(self, key: any, version: any, render: callable, *args) -> str:
+        """Returns the text cached for key at version, calling render(*args) on a miss.
+
+        Args:
+            key (any): What was rendered, usually a handle.
+            version (any): Version of the inputs of render.
+            render (callable): Builds the text.
+
+        Returns:
+            str: The rendered text.
+        """
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.entries.move_to_end(key)
+            return entry[1]
+        text = render(*args)
+        self.entries[key] = (version, text)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return text
+
+    def clear(self) -> None:
+        self.entries.clear()
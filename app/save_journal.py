@@ -0,0 +1,163 @@
+#imports
+import os
+import json
+from app.world import World
+
+SAVE_VERSION = 2
+# Display caches are rebuilt on resume rather than saved every turn
+SKIPPED_STATE = {'user_command', 'previous_text'}
+
+
+class SaveJournal:
+    """Append-only save log with periodic compact snapshots.
+
+    Every turn appends one JSON line holding the mutable fields of the objects
+    touched that turn and the game state keys that changed, so a save costs
+    O(changes). The snapshot holds every object changed since the world was
+    loaded. Resume applies the snapshot and replays the log on top of it, and
+    once the log holds compact_every turns it is folded into a new snapshot.
+    """
+    def __init__(self, path: str, compact_every: int = 200, sync: bool = False) -> None:
+        """Initializes the SaveJournal class.
+
+        Args:
+            path (str): Base path, the snapshot and log are written to path.snapshot and path.log.
+            compact_every (int, optional): Turns logged before compacting into a snapshot. Defaults to 200.
+            sync (bool, optional): Whether to fsync the log after every turn. Defaults to False.
+        """
+        self.snapshot_path = f'{path}.snapshot'
+        self.log_path = f'{path}.log'
+        self.compact_every = compact_every
+        self.sync = sync
+        self.turn = 0
+        self.logged = 0
+        self.touched: set[int] = set()
+        self.changed: set[int] = set()
+        self.saved_state: dict[str, any] = {}
+        self.log = None
+
+    def attach(self, game_objects: World) -> None:
+        """Chains the journal in front of the world's observer to learn which objects change."""
+        forward = game_objects.observer
+
+        def observer(handle: int) -> None:
+            self.touched.add(handle)
+            if forward is not None:
+                forward(handle)
+
+        game_objects.observer = observer
+
+    def objects(self, game_objects: World, handles: set[int]) -> list[list]:
+        return [[handle, game_objects.resolve(handle).snapshot()] for handle in handles]
+
+    def state_changes(self, game_state: dict[str, any]) -> dict[str, any]:
+        changes = {}
+        for key, value in game_state.items():
+            if key not in SKIPPED_STATE and self.saved_state.get(key) != value:
+                changes[key] = value
+        self.saved_state.update(changes)
+        return changes
+
+    def apply(self, game_objects: World, game_state: dict[str, any], entry: dict[str, any]) -> None:
+        for handle, fields in entry['objects']:
+            game_objects.resolve(handle).restore(fields)
+            self.changed.add(handle)
+        game_state.update(entry['game_state'])
+        self.saved_state.update(entry['game_state'])
+        self.turn = entry['turn']
+
+    def resume(self, game_objects: World, game_state: dict[str, any]) -> bool:
+        """Restores the last snapshot and replays the logged turns after it.
+
+        Args:
+            game_objects (World): Freshly loaded world to restore into.
+            game_state (dict[str, any]): Game state of the session to restore into.
+
+        Returns:
+            bool: True if a save was found.
+        """
+        found = False
+        snapshot_turn = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            if snapshot.get('version') == SAVE_VERSION:
+                self.apply(game_objects, game_state, snapshot)
+                snapshot_turn = snapshot['turn']
+                found = True
+
+        if os.path.exists(self.log_path):
+            intact = 0
+            with open(self.log_path, 'rb') as log_file:
+                for line in log_file:
+                    # A turn cut short by a crash, everything before it is intact
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    intact += len(line)
+                    if entry['turn'] > snapshot_turn:
+                        self.apply(game_objects, game_state, entry)
+                        self.logged += 1
+                        found = True
+            if intact < os.path.getsize(self.log_path):
+                # New turns are appended, after a torn line they would be skipped by the next resume
+                with open(self.log_path, 'r+b') as log_file:
+                    log_file.truncate(intact)
+        self.touched.clear()
+        return found
+
+    def record(self, game_objects: World, game_state: dict[str, any]) -> None:
+        """Appends the changes of the turn that just ended to the log.
+
+        Args:
+            game_objects (World): World of the session.
+            game_state (dict[str, any]): Game state of the session.
+        """
+        state = self.state_changes(game_state)
+        if not self.touched and not state:
+            return
+        self.turn += 1
+        entry = {'turn': self.turn, 'objects': self.objects(game_objects, self.touched), 'game_state': state}
+        self.changed.update(self.touched)
+        self.touched.clear()
+
+        if self.log is None:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.log = open(self.log_path, 'a', encoding='utf-8')
+        self.log.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self.log.flush()
+        if self.sync:
+            os.fsync(self.log.fileno())
+        self.logged += 1
+        if self.logged >= self.compact_every:
+            self.compact(game_objects)
+
+    def compact(self, game_objects: World) -> None:
+        """Writes a snapshot of every changed object and truncates the log."""
+        snapshot = {
+            'version': SAVE_VERSION,
+            'turn': self.turn,
+            'objects': self.objects(game_objects, self.changed),
+            'game_state': dict(self.saved_state),
+        }
+        temporary_path = f'{self.snapshot_path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump(snapshot, snapshot_file, separators=(',', ':'))
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary_path, self.snapshot_path)
+
+        if self.log is not None:
+            self.log.close()
+        self.log = open(self.log_path, 'w', encoding='utf-8')
+        self.logged = 0
+
+    def close(self) -> None:
+        if self.log is not None:
+            self.log.close()
+            self.log = None
@@ -0,0 +1,168 @@
+import asyncio
+from app.game_session import GameSession, StepResult
+from app.world import World
+from app.state_store import StateStore
+from app.batch_events import BatchEvents
+from app.metrics import Metrics
+from app.hot_reload import WorldReloader
+
+
+class SessionServer:
+    """Hosts many headless GameSessions from one process over a line protocol.
+
+    Sessions are copy-on-write worlds spawned from one shared template, or
+    views over a StateStore when one is given. With BatchEvents the commands
+    arriving within batch_window seconds of each other are stepped together
+    and their events evaluated in one vectorized pass.
+    Every line a client sends is one command. Every reply is a frame: a
+    'status: ...' line, the scene text, then a line holding a single '.'.
+    Text lines starting with '.' are sent with an extra '.' in front, the same
+    way SMTP escapes them.
+    With a WorldReloader every session is attached to it, so a reload moves
+    the sessions onto the new data without dropping them. Clients can't
+    trigger a reload themselves.
+    """
+    def __init__(self, data: dict[str, any], world: World, max_sessions: int = 100, idle_timeout: float = 600.0, max_line: int = 1024,
+                 state_store: StateStore = None, batch_events: BatchEvents = None, batch_window: float = 0.005,
+                 metrics: Metrics = None, reloader: WorldReloader = None):
+        """Initializes the SessionServer class.
+
+        Args:
+            data (dict[str, any]): Static game data from load_data.
+            world (World): Template world every session is spawned from.
+            max_sessions (int, optional): Cap on concurrent sessions. Defaults to 100.
+            idle_timeout (float, optional): Seconds to wait for a command before closing. Defaults to 600.0.
+            max_line (int, optional): Longest command line accepted, in bytes. Defaults to 1024.
+            state_store (StateStore, optional): Columnar store of the world to hold session state in. Defaults to None.
+            batch_events (BatchEvents, optional): Batched event evaluation over state_store. Defaults to None.
+            batch_window (float, optional): Seconds to gather commands into a batch. Defaults to 0.005.
+            metrics (Metrics, optional): Metrics every session is instrumented with. Defaults to None.
+            reloader (WorldReloader, optional): Reloader of the world's data, not usable with state_store. Defaults to None.
+        """
+        self.data = data
+        self.world = world
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_line = max_line
+        self.state_store = state_store
+        self.batch_events = batch_events
+        self.batch_window = batch_window
+        self.metrics = metrics
+        self.reloader = reloader
+        self.pending: list[tuple[GameSession, str, asyncio.Future]] = []
+        self.flush_handle = None
+        self.active = 0
+
+    def new_session(self) -> GameSession:
+        if self.state_store is not None:
+            session = GameSession(self.data, self.state_store.world(self.state_store.allocate()), metrics=self.metrics)
+            if self.batch_events is not None:
+                self.batch_events.install(session)
+            return session
+        session = GameSession(self.data, self.world.spawn(), metrics=self.metrics)
+        if self.reloader is not None:
+            self.reloader.attach(session)
+        return session
+
+    def end_session(self, session: GameSession) -> None:
+        if self.state_store is not None:
+            self.state_store.release(session.game_objects.session)
+        if self.reloader is not None:
+            self.reloader.detach(session)
+
+    def reload(self) -> str:
+        """Reloads the data files that changed into the template and every session.
+
+        Returns:
+            str: Files reloaded and the warnings about them, or why nothing was reloaded.
+        """
+        report = self.reloader.report()
+        # Sessions started from now on get the new static data too
+        self.data = self.reloader.data
+        return report
+
+    async def step(self, session: GameSession, line: str) -> StepResult:
+        if self.batch_events is None:
+            return session.step(line)
+        # A client waits for its reply before sending again, so a session is in a batch at most once
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((session, line, future))
+        if self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.batch_window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        self.flush_handle = None
+        pending, self.pending = self.pending, []
+        try:
+            results = self.batch_events.step([session for session, _, _ in pending], [line for _, line, _ in pending])
+        except Exception as error:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, _, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def send(self, writer: asyncio.StreamWriter, status: str, text: str) -> None:
+        lines = [f'status: {status}']
+        for line in text.splitlines():
+            if line.startswith('.'):
+                line = f'.{line}'
+            lines.append(line)
+        lines.append('.')
+        writer.write(('\n'.join(lines) + '\n').encode('utf-8'))
+        # Wait for the client to catch up before reading its next command
+        await writer.drain()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.active >= self.max_sessions:
+            await self.send(writer, 'full', 'The server is full, please try again later.')
+            writer.close()
+            await writer.wait_closed()
+            return
+
+        self.active += 1
+        session = None
+        try:
+            session = self.new_session()
+            result: StepResult = session.render()
+            await self.send(writer, result.status, result.text)
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    await self.send(writer, 'idle', 'Closing the connection after too long without a command.')
+                    break
+                except ValueError:
+                    await self.send(writer, 'error', f'Commands may not be longer than {self.max_line} bytes.')
+                    break
+                if not line:
+                    break
+                result = await self.step(session, line.decode('utf-8', errors='replace').strip())
+                await self.send(writer, result.status, result.text)
+                if result.quit:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.active -= 1
+            if session is not None:
+                self.end_session(session)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve_tcp(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_client, host, port, limit=self.max_line)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_unix(self, path: str) -> None:
+        server = await asyncio.start_unix_server(self.handle_client, path, limit=self.max_line)
+        async with server:
+            await server.serve_forever()
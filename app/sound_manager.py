@@ -1,26 +1,125 @@
-import pygame.mixer
+#imports
+import os
+import queue
+import threading
 
-class SoundManager:
-    def __init__(self, music_file_path, music_volume=0.5):
+
+class NullBackend:
+    """Accepts every audio command and does nothing, used when there is no audio device."""
+    name = 'null'
+
+    def load(self, music_file_path, music_volume):
+        pass
+
+    def play(self, loop_count):
+        pass
+
+    def pause(self):
+        pass
+
+    def unpause(self):
+        pass
+
+    def set_volume(self, music_volume):
+        pass
+
+
+class PygameBackend:
+    """Plays music through pygame.mixer, pygame is only imported when the backend is opened."""
+    name = 'pygame'
+
+    def __init__(self):
+        # pygame greets on import, which would land in the middle of the game's output
+        os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+        import pygame.mixer
         pygame.mixer.init()
-        self.music_channel = pygame.mixer.Channel(0)
+        self.mixer = pygame.mixer
+
+    def load(self, music_file_path, music_volume):
+        self.mixer.music.load(music_file_path)
+        self.mixer.music.set_volume(music_volume)
+
+    def play(self, loop_count):
+        self.mixer.music.play(loop_count)
+
+    def pause(self):
+        self.mixer.music.pause()
+
+    def unpause(self):
+        self.mixer.music.unpause()
+
+    def set_volume(self, music_volume):
+        self.mixer.music.set_volume(music_volume)
+
+
+def open_backend(music_file_path, music_volume):
+    """Opens the pygame backend and loads the music, or returns a NullBackend when that fails."""
+    try:
+        backend = PygameBackend()
+        backend.load(music_file_path, music_volume)
+        return backend
+    except (ImportError, RuntimeError, OSError):
+        # pygame.error is a RuntimeError, it is raised for a missing device as well as a bad file
+        return NullBackend()
+
+
+class SoundManager:
+    """Music control that never blocks the caller.
+
+    Commands are queued to a daemon worker thread that opens the audio device
+    and decodes the music on its first command, so creating a SoundManager
+    costs nothing and the UI can appear before the sound card answers. When
+    pygame or the device is missing the worker settles on a NullBackend. The
+    enabled flag and volume are kept on the caller's side so they can be
+    reported straight away.
+    """
+    def __init__(self, music_file_path, music_volume=0.5, backend=None):
+        """Initializes the SoundManager class.
+
+        Args:
+            music_file_path (str): Music to loop.
+            music_volume (float, optional): Starting volume from 0.0 to 1.0. Defaults to 0.5.
+            backend (optional): Backend to use instead of opening one, such as NullBackend(). Defaults to None.
+        """
+        self.music_file_path = music_file_path
         self.music_volume = music_volume
-        self.load_music(music_file_path)
         self.sound_enabled = True
+        self.backend = backend
+        self.commands = queue.Queue()
+        self.worker = threading.Thread(target=self.run, name='sound', daemon=True)
+        self.worker.start()
+
+    def run(self):
+        while True:
+            command = self.commands.get()
+            if command is None:
+                return
+            if self.backend is None:
+                self.backend = open_backend(self.music_file_path, self.music_volume)
+            name, args = command
+            try:
+                getattr(self.backend, name)(*args)
+            except RuntimeError:
+                # The device went away, keep accepting commands
+                self.backend = NullBackend()
+
+    def send(self, name, *args):
+        self.commands.put((name, args))
 
-    def load_music(self, music_file_path):
-        pygame.mixer.music.load(music_file_path)
-        pygame.mixer.music.set_volume(self.music_volume)
+    def close(self):
+        """Stops the worker after the commands already queued."""
+        self.commands.put(None)
+        self.worker.join()
 
     def play_music(self, loop_count=-1):
         if self.sound_enabled:
-            pygame.mixer.music.play(loop_count)
+            self.send('play', loop_count)
 
     def pause_music(self):
-        pygame.mixer.music.pause()
+        self.send('pause')
 
     def unpause_music(self):
-        pygame.mixer.music.unpause()
+        self.send('unpause')
 
     def toggle_sound(self):
         self.sound_enabled = not self.sound_enabled
@@ -30,13 +129,9 @@ class SoundManager:
             self.pause_music()
 
     def volume_up(self):
-        self.music_volume += 0.1
-        if self.music_volume > 1.0:
-            self.music_volume = 1.0
-        pygame.mixer.music.set_volume(self.music_volume)
+        self.music_volume = min(1.0, round(self.music_volume + 0.1, 1))
+        self.send('set_volume', self.music_volume)
 
     def volume_down(self):
-        self.music_volume -= 0.1
-        if self.music_volume < 0.0:
-            self.music_volume = 0.0
-        pygame.mixer.music.set_volume(self.music_volume)
+        self.music_volume = max(0.0, round(self.music_volume - 0.1, 1))
+        self.send('set_volume', self.music_volume)
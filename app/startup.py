@@ -0,0 +1,76 @@
+#imports
+import time
+from contextlib import contextmanager
+
+PHASES = ['imports', 'load_data', 'load_game_objects', 'parser', 'audio', 'window', 'first_render']
+
+
+class StartupProfile:
+    """Wall clock time of each startup phase, measured from a start time taken as early as possible.
+
+    Phases are timed either around a block with phase() or by wrapping the
+    functions that run them with wrap(), the way replay.py times turn stages.
+    """
+    def __init__(self, start: float = None) -> None:
+        """Initializes the StartupProfile class.
+
+        Args:
+            start (float, optional): time.perf_counter() taken before the module imports, they count
+                as imports up to now. Defaults to now.
+        """
+        now = time.perf_counter()
+        self.start = now if start is None else start
+        self.phases: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.phases['imports'] = now - self.start
+        self.first_frame = None
+        self.headless = False
+
+    def wrap(self, phase: str, func: callable) -> callable:
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.phases[phase] += time.perf_counter() - start
+        return timed
+
+    @contextmanager
+    def phase(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] += time.perf_counter() - start
+
+    def instrument(self) -> None:
+        """Wraps the loader, parser, audio and bundle entry points, they must be imported already."""
+        from app import loader, parser, sound_manager
+        from app.bundle import Bundle
+
+        loader.load_data = self.wrap('load_data', loader.load_data)
+        loader.load_game_objects = self.wrap('load_game_objects', loader.load_game_objects)
+        Bundle.data = self.wrap('load_data', Bundle.data)
+        Bundle.world = self.wrap('load_game_objects', Bundle.world)
+        parser.Parser.__init__ = self.wrap('parser', parser.Parser.__init__)
+        sound_manager.SoundManager.__init__ = self.wrap('audio', sound_manager.SoundManager.__init__)
+
+    def mark_first_frame(self) -> None:
+        self.first_frame = time.perf_counter()
+
+    def report(self) -> dict[str, any]:
+        """Returns the milliseconds of every phase and the time to the first frame."""
+        first_frame = (self.first_frame or time.perf_counter()) - self.start
+        report = {phase: seconds * 1000 for phase, seconds in self.phases.items()}
+        report['other'] = max(0.0, first_frame * 1000 - sum(report.values()))
+        report['first_frame'] = first_frame * 1000
+        report['headless'] = self.headless
+        return report
+
+    def format(self) -> str:
+        report = self.report()
+        lines = [f"{'phase':<20}{'ms':>10}"]
+        for phase in PHASES + ['other']:
+            lines.append(f"{phase:<20}{report[phase]:>10.1f}")
+        frame = 'first frame (headless)' if self.headless else 'first frame'
+        lines.append(f"{frame:<20}{report['first_frame']:>10.1f}")
+        return '\n'.join(lines)
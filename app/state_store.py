@@ -0,0 +1,504 @@
+#imports
+import heapq
+from array import array
+from app.world import World, OverlayObjects
+from app.game_object import GameObject
+from app.entity import Entity
+from app.container import Container
+from app.location import Location
+from app.intractable import Intractable
+from app.event import Event
+from app.entity_index import EntityIndex, name_index
+
+
+class StateStore:
+    """Mutable state of many sessions of one template world, held column by column.
+
+    Every column is one contiguous array with a fixed width block per session,
+    indexed by the dense slot of an object inside that block:
+
+        state   state code of every Entity, codes index a shared vocabulary
+        cycle   rotation of the state_list of every Intractable
+        holder  owner slot + 1 of the Location or Container holding every member, 0 if none
+        seq     insertion sequence number of every member into its holder
+        link    member slot + 1 of the next member of the same holder, 0 after the last
+        head    member slot + 1 of the first member of every owner, 0 if it has none
+        tail    member slot + 1 of the last member of every owner, 0 if it has none
+        clock   next sequence number of the session
+
+    An owner's entities or inventory is the list linked from its head in
+    insertion order, reading it costs its length. The rare member held by
+    several owners at once has its other holdings in extra, a side table of
+    session to owner slot to member slot to seq.
+
+    The name index of an owner is kept per session in indexes, the views are
+    created on every access and could not keep it, and every change of the
+    owner's members is applied to it.
+
+    Sessions read and write it through views, objects whose mutable fields are
+    properties over the columns, so a session costs its block of the columns
+    instead of a copy of every object it touched. Codes are only meaningful to the process that
+    assigned them, snapshot() is meant for moving sessions around a server,
+    not for saves.
+    """
+    def __init__(self, template: World) -> None:
+        """Initializes the StateStore class.
+
+        Args:
+            template (World): World every session starts from, it is only read.
+        """
+        self.template = template
+        self.states: list[str] = []
+        self.state_codes: dict[str, int] = {}
+        self.state_slots: dict[int, int] = {}
+        self.cycle_slots: dict[int, int] = {}
+        self.cycle_lists: list[tuple[str, ...]] = []
+        self.owner_slots: dict[int, int] = {}
+        self.member_slots: dict[int, int] = {}
+        self.member_handles: list[int] = []
+
+        self.initial_state = array('H')
+        self.initial_cycle = array('B')
+        owners: list[GameObject] = []
+        for objects in template.values():
+            for game_obj in objects.values():
+                handle = game_obj.handle
+                if isinstance(game_obj, Entity):
+                    self.state_slots[handle] = len(self.initial_state)
+                    self.initial_state.append(self.code(game_obj.state))
+                if isinstance(game_obj, Intractable):
+                    self.cycle_slots[handle] = len(self.cycle_lists)
+                    self.cycle_lists.append(tuple(game_obj.state_list))
+                    self.initial_cycle.append(0)
+                if isinstance(game_obj, (Location, Container)):
+                    self.owner_slots[handle] = len(owners)
+                    owners.append(game_obj)
+                if not isinstance(game_obj, (Location, Event)):
+                    self.member_slots[handle] = len(self.member_handles)
+                    self.member_handles.append(handle)
+
+        self.width = len(self.member_handles)
+        self.state = array('H')
+        self.cycle = array('B')
+        self.holder = array('I')
+        self.seq = array('I')
+        self.link = array('I')
+        self.head = array('I')
+        self.tail = array('I')
+        self.clock = array('I')
+        self.extra: dict[int, dict[int, dict[int, int]]] = {}
+        self.sessions = 0
+        self.free: list[int] = []
+        self.indexes: dict[int, dict[int, tuple[World, EntityIndex]]] = {}
+
+        # The starting members are added to an empty session 0, whose blocks then become the initial ones
+        empty_members = array('I', [0]) * self.width
+        empty_owners = array('I', [0]) * len(owners)
+        self.initial = [self.initial_state, self.initial_cycle, empty_members, empty_members, empty_members, empty_owners, empty_owners, array('I', [1])]
+        for column, values in zip(self.columns(), self.initial):
+            column.extend(values)
+        for owner in owners:
+            for handle in owner.entities if isinstance(owner, Location) else owner.inventory:
+                self.add_member(0, owner.handle, handle)
+        self.initial = [column[block] for column, block in self.blocks(0)]
+        self.initial_extra = self.extra.pop(0, {})
+        for column, block in self.blocks(0):
+            del column[block]
+
+    def code(self, state: str) -> int:
+        code = self.state_codes.get(state)
+        if code is None:
+            code = self.state_codes[state] = len(self.states)
+            self.states.append(state)
+        return code
+
+    def allocate(self) -> int:
+        """Adds a session in the template's starting state.
+
+        Returns:
+            int: Id of the session.
+        """
+        if self.free:
+            session = self.free.pop()
+            self.reset(session)
+            return session
+        session = self.sessions
+        self.sessions += 1
+        for column, values in zip(self.columns(), self.initial):
+            column.extend(values)
+        if self.initial_extra:
+            self.extra[session] = self.copy_extra(self.initial_extra)
+        return session
+
+    def release(self, session: int) -> None:
+        """Frees the block of a session for the next allocate()."""
+        self.extra.pop(session, None)
+        self.indexes.pop(session, None)
+        self.free.append(session)
+
+    def columns(self) -> list[array]:
+        return [self.state, self.cycle, self.holder, self.seq, self.link, self.head, self.tail, self.clock]
+
+    def blocks(self, session: int) -> list[tuple[array, slice]]:
+        widths = [len(self.initial_state), len(self.initial_cycle), self.width, self.width, self.width, len(self.owner_slots), len(self.owner_slots), 1]
+        return [(column, slice(session * width, (session + 1) * width)) for column, width in zip(self.columns(), widths)]
+
+    def copy_extra(self, extra: dict[int, dict[int, int]]) -> dict[int, dict[int, int]]:
+        return {owner_slot: dict(members) for owner_slot, members in extra.items()}
+
+    def reset(self, session: int) -> None:
+        for (column, block), values in zip(self.blocks(session), self.initial):
+            column[block] = values
+        if self.initial_extra:
+            self.extra[session] = self.copy_extra(self.initial_extra)
+        else:
+            self.extra.pop(session, None)
+        self.indexes.pop(session, None)
+
+    def snapshot(self, session: int) -> bytes:
+        """Copies the state of a session out of the columns in one pass, the extra holdings follow as triples."""
+        extra = array('I')
+        for owner_slot, members in self.extra.get(session, {}).items():
+            for slot, seq in members.items():
+                extra.extend((owner_slot, slot, seq))
+        return b''.join(column[block].tobytes() for column, block in self.blocks(session)) + extra.tobytes()
+
+    def restore(self, session: int, blob: bytes) -> None:
+        """Writes a snapshot() taken in this process back into a session's block.
+
+        Worlds of the session created before keep the text they rendered, create them again with world().
+        """
+        view = memoryview(blob)
+        start = 0
+        for column, block in self.blocks(session):
+            end = start + (block.stop - block.start) * column.itemsize
+            values = array(column.typecode)
+            values.frombytes(view[start:end])
+            column[block] = values
+            start = end
+        triples = array('I')
+        triples.frombytes(view[start:])
+        self.extra.pop(session, None)
+        self.indexes.pop(session, None)
+        for index in range(0, len(triples), 3):
+            owner_slot, slot, seq = triples[index:index + 3]
+            self.extra.setdefault(session, {}).setdefault(owner_slot, {})[slot] = seq
+
+    def world(self, session: int) -> World:
+        """Creates the world of a session, its objects are views over the columns.
+
+        Args:
+            session (int): Id from allocate().
+
+        Returns:
+            World: World whose entities read and write this session's block.
+        """
+        world = World(template=self.template)
+        world.store = self
+        world.session = session
+        for object_type, templates in self.template.items():
+            world[object_type] = StoreObjects(world, templates)
+        return world
+
+    def get_state(self, session: int, handle: int) -> str:
+        return self.states[self.state[session * len(self.initial_state) + self.state_slots[handle]]]
+
+    def set_state(self, session: int, handle: int, state: str) -> None:
+        self.state[session * len(self.initial_state) + self.state_slots[handle]] = self.code(state)
+
+    def state_list(self, session: int, handle: int) -> list[str]:
+        slot = self.cycle_slots[handle]
+        offset = self.cycle[session * len(self.initial_cycle) + slot]
+        states = self.cycle_lists[slot]
+        return list(states[offset:] + states[:offset])
+
+    def set_state_list(self, session: int, handle: int, state_list: list[str]) -> None:
+        slot = self.cycle_slots[handle]
+        states = self.cycle_lists[slot]
+        for offset in range(max(1, len(states))):
+            if list(states[offset:] + states[:offset]) == list(state_list):
+                self.cycle[session * len(self.initial_cycle) + slot] = offset
+                return
+        raise ValueError(f'{state_list} is not a rotation of {list(states)}')
+
+    def rotate(self, session: int, handle: int) -> str:
+        slot = self.cycle_slots[handle]
+        index = session * len(self.initial_cycle) + slot
+        states = self.cycle_lists[slot]
+        state = states[self.cycle[index]]
+        self.cycle[index] = (self.cycle[index] + 1) % len(states)
+        return state
+
+    def members(self, session: int, owner: int) -> list[int]:
+        """Returns the handles in a Location's entities or a Container's inventory, in insertion order."""
+        owner_slot = self.owner_slots[owner]
+        base = session * self.width
+        placed = []
+        slot = self.head[session * len(self.owner_slots) + owner_slot]
+        while slot:
+            placed.append((self.seq[base + slot - 1], slot - 1))
+            slot = self.link[base + slot - 1]
+        extra = self.extra.get(session, {}).get(owner_slot)
+        if extra:
+            placed = heapq.merge(placed, sorted((seq, slot) for slot, seq in extra.items()))
+        return [self.member_handles[slot] for _, slot in placed]
+
+    def index(self, world: World, owner: int) -> EntityIndex:
+        """Returns the name index of an owner's members in the session of a world, built on first lookup."""
+        indexes = self.indexes.setdefault(world.session, {})
+        owner_slot = self.owner_slots[owner]
+        entry = indexes.get(owner_slot)
+        # The index holds views, a world created again for the session needs its own
+        if entry is None or entry[0] is not world:
+            index = EntityIndex(name_index(world))
+            for handle in self.members(world.session, owner):
+                index.add(world.resolve(handle))
+            entry = indexes[owner_slot] = (world, index)
+        return entry[1]
+
+    def indexed(self, session: int, owner_slot: int, slot: int, added: bool) -> None:
+        """Applies an added or removed member to the owner's name index, if it has one."""
+        entry = self.indexes.get(session, {}).get(owner_slot)
+        if entry is not None:
+            world, index = entry
+            member = world.resolve(self.member_handles[slot])
+            if added:
+                index.add(member)
+            else:
+                index.remove(member)
+
+    def has_member(self, session: int, owner: int, member: int) -> bool:
+        slot = self.member_slots.get(member)
+        if slot is None:
+            return False
+        owner_slot = self.owner_slots[owner]
+        if self.holder[session * self.width + slot] == owner_slot + 1:
+            return True
+        return slot in self.extra.get(session, {}).get(owner_slot, ())
+
+    def add_member(self, session: int, owner: int, member: int) -> None:
+        # Adding a member again moves it to the end, like the lists of a World
+        if self.has_member(session, owner, member):
+            self.remove_member(session, owner, member)
+        owner_slot = self.owner_slots[owner]
+        slot = self.member_slots[member]
+        index = session * self.width + slot
+        if self.holder[index]:
+            self.extra.setdefault(session, {}).setdefault(owner_slot, {})[slot] = self.clock[session]
+        else:
+            row = session * len(self.owner_slots) + owner_slot
+            last = self.tail[row]
+            if last:
+                self.link[session * self.width + last - 1] = slot + 1
+            else:
+                self.head[row] = slot + 1
+            self.tail[row] = slot + 1
+            self.holder[index] = owner_slot + 1
+            self.seq[index] = self.clock[session]
+            self.link[index] = 0
+        self.clock[session] += 1
+        self.indexed(session, owner_slot, slot, True)
+
+    def remove_member(self, session: int, owner: int, member: int) -> None:
+        owner_slot = self.owner_slots[owner]
+        slot = self.member_slots.get(member)
+        base = session * self.width
+        if slot is not None and self.holder[base + slot] == owner_slot + 1:
+            row = session * len(self.owner_slots) + owner_slot
+            previous = 0
+            current = self.head[row]
+            while current != slot + 1:
+                previous = current
+                current = self.link[base + current - 1]
+            following = self.link[base + slot]
+            if previous:
+                self.link[base + previous - 1] = following
+            else:
+                self.head[row] = following
+            if self.tail[row] == slot + 1:
+                self.tail[row] = previous
+            self.holder[base + slot] = self.seq[base + slot] = self.link[base + slot] = 0
+            self.indexed(session, owner_slot, slot, False)
+            return
+        extra = self.extra.get(session, {})
+        if slot is None or slot not in extra.get(owner_slot, ()):
+            raise ValueError(f'{member} is not a member of {owner}')
+        del extra[owner_slot][slot]
+        if not extra[owner_slot]:
+            del extra[owner_slot]
+        if not extra:
+            del self.extra[session]
+        self.indexed(session, owner_slot, slot, False)
+
+    def set_members(self, session: int, owner: int, members: list[int]) -> None:
+        owner_slot = self.owner_slots[owner]
+        base = session * self.width
+        row = session * len(self.owner_slots) + owner_slot
+        slot = self.head[row]
+        while slot:
+            following = self.link[base + slot - 1]
+            self.holder[base + slot - 1] = self.seq[base + slot - 1] = self.link[base + slot - 1] = 0
+            slot = following
+        self.head[row] = self.tail[row] = 0
+        extra = self.extra.get(session, {})
+        extra.pop(owner_slot, None)
+        if session in self.extra and not extra:
+            del self.extra[session]
+        self.indexes.get(session, {}).pop(owner_slot, None)
+        for member in members:
+            self.add_member(session, owner, member)
+
+
+class MemberList:
+    """List-like view of one owner's members in a session."""
+    __slots__ = ('store', 'session', 'owner')
+
+    def __init__(self, store: StateStore, session: int, owner: int) -> None:
+        self.store = store
+        self.session = session
+        self.owner = owner
+
+    def __iter__(self):
+        return iter(self.store.members(self.session, self.owner))
+
+    def __len__(self) -> int:
+        return len(self.store.members(self.session, self.owner))
+
+    def __contains__(self, member: int) -> bool:
+        return self.store.has_member(self.session, self.owner, member)
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
+
+    def append(self, member: int) -> None:
+        self.store.add_member(self.session, self.owner, member)
+
+    def remove(self, member: int) -> None:
+        self.store.remove_member(self.session, self.owner, member)
+
+    def tolist(self) -> list[int]:
+        return self.store.members(self.session, self.owner)
+
+
+class View:
+    """Base of every view class, views of the same object in the same world are equal."""
+    __slots__ = ()
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, View) and self.handle == other.handle and self.world is other.world
+
+    def __hash__(self) -> int:
+        return hash(self.handle)
+
+
+class EntityView:
+    __slots__ = ()
+
+    @property
+    def _state(self) -> str:
+        return self.world.store.get_state(self.world.session, self.handle)
+
+    @_state.setter
+    def _state(self, state: str) -> None:
+        self.world.store.set_state(self.world.session, self.handle, state)
+
+
+class IntractableView:
+    __slots__ = ()
+
+    @property
+    def state_list(self) -> list[str]:
+        return self.world.store.state_list(self.world.session, self.handle)
+
+    @state_list.setter
+    def state_list(self, state_list: list[str]) -> None:
+        self.world.store.set_state_list(self.world.session, self.handle, state_list)
+
+    def rotate(self) -> str:
+        return self.world.store.rotate(self.world.session, self.handle)
+
+
+class ContainerView:
+    __slots__ = ()
+
+    @property
+    def inventory(self) -> MemberList:
+        return MemberList(self.world.store, self.world.session, self.handle)
+
+    @inventory.setter
+    def inventory(self, inventory: list[int]) -> None:
+        self.world.store.set_members(self.world.session, self.handle, inventory)
+
+    @property
+    def index(self) -> EntityIndex:
+        return self.world.store.index(self.world, self.handle)
+
+    # The store keeps the index in step with the members
+    def add_item(self, item: GameObject) -> None:
+        self.world.store.add_member(self.world.session, self.handle, item.handle)
+        self.touch()
+
+    def remove_item(self, item: GameObject) -> GameObject:
+        self.world.store.remove_member(self.world.session, self.handle, item.handle)
+        self.touch()
+        return item
+
+
+class LocationView:
+    __slots__ = ()
+
+    @property
+    def entities(self) -> MemberList:
+        return MemberList(self.world.store, self.world.session, self.handle)
+
+    @entities.setter
+    def entities(self, entities: list[int]) -> None:
+        self.world.store.set_members(self.world.session, self.handle, entities)
+
+    @property
+    def index(self) -> EntityIndex:
+        return self.world.store.index(self.world, self.handle)
+
+    # The store keeps the index in step with the members
+    def add_entity(self, entity: GameObject) -> None:
+        self.world.store.add_member(self.world.session, self.handle, entity.handle)
+        self.touch()
+
+    def remove_entity(self, entity: GameObject) -> GameObject:
+        self.world.store.remove_member(self.world.session, self.handle, entity.handle)
+        self.touch()
+        return entity
+
+
+VIEW_MIXINS = [
+    (IntractableView, Intractable),
+    (ContainerView, Container),
+    (LocationView, Location),
+    (EntityView, Entity),
+]
+VIEW_CLASSES: dict[type, type] = {}
+
+
+def view_class(cls: type) -> type:
+    """Returns the subclass of a game object class whose mutable fields live in a StateStore."""
+    view = VIEW_CLASSES.get(cls)
+    if view is None:
+        mixins = tuple(mixin for mixin, base in VIEW_MIXINS if issubclass(cls, base))
+        view = type(f'{cls.__name__}View', (View,) + mixins + (cls,), {'__slots__': ()})
+        VIEW_CLASSES[cls] = view
+    return view
+
+
+class StoreObjects(OverlayObjects):
+    """Objects of one kind in a StateStore session.
+
+    Views are created on every access and not kept, all their state is in the
+    store, so an idle session holds nothing but its block of the columns.
+    """
+    def __getitem__(self, obj_id: int) -> GameObject:
+        return self.spawn(self.templates[obj_id])
+
+    def spawn(self, template: GameObject) -> GameObject:
+        game_obj = template.spawn(self.world, view_class(type(template)))
+        game_obj.obj_id = template.obj_id
+        return game_obj
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+
+
+class TextStore:
+    """Decodes text blocks from a bundle's string table on first access.
+
+    Only the string table offsets stay resident, decoded blocks are kept in a
+    bounded LRU so the text players are currently reading stays hot.
+    """
+    def __init__(self, source, capacity: int = 256) -> None:
+        """Initializes the TextStore class.
+
+        Args:
+            source (Bundle): Object with a string(text_id) method returning the decoded block.
+            capacity (int, optional): Number of decoded blocks to keep. Defaults to 256.
+        """
+        self.source = source
+        self.capacity = capacity
+        self.blocks: OrderedDict[int, str] = OrderedDict()
+
+    def get(self, text_id: int) -> str:
+        block = self.blocks.get(text_id)
+        if block is not None:
+            self.blocks.move_to_end(text_id)
+            return block
+        block = self.source.string(text_id)
+        self.blocks[text_id] = block
+        if len(self.blocks) > self.capacity:
+            self.blocks.popitem(last=False)
+        return block
+
+
+class TextRef:
+    """Placeholder for a text block that has not been read yet."""
+    __slots__ = ('store', 'text_id')
+
+    def __init__(self, store: TextStore, text_id: int) -> None:
+        self.store = store
+        self.text_id = text_id
+
+    def load(self) -> str:
+        return self.store.get(self.text_id)
+
+    def __str__(self) -> str:
+        return self.load()
+
+    def __repr__(self) -> str:
+        return f'TextRef({self.text_id})'
+
+
+def resolve_text(value) -> str:
+    """Returns the text of a value that may be a TextRef."""
+    if isinstance(value, TextRef):
+        return value.load()
+    return value
@@ -1,7 +1,11 @@
 from app.intractable import Intractable
+from app.handle import pack_ref
 
 
 class Transition(Intractable):
+    __slots__ = ('target', 'blocking_states')
+    kind = 'transition'
+
     def __init__(self,
                  obj_id: str,
                  name: str,
@@ -11,7 +15,7 @@ class Transition(Intractable):
                  state_transitions: dict[str,str],
                  state_list: list[str],
                  key_info: dict[str, dict[str, int or str] or str],
-                 target: tuple[str, int],
+                 target: dict[str, int or str],
                  blocking_states: list[str]
                  ):
         super().__init__(
@@ -24,7 +28,7 @@ class Transition(Intractable):
             state_list,
             key_info
         )
-        self.target = (target['kind'], target['obj_id'])
+        self.target = pack_ref(target)
         if not blocking_states:
             blocking_states = []
         self.blocking_states = blocking_states
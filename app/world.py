@@ -0,0 +1,119 @@
+import random
+from collections.abc import Mapping
+from app.game_object import GameObject
+from app.handle import SECTIONS, KIND_BITS, KIND_MASK
+from app.render_cache import RenderCache
+
+
+class World(dict):
+    """Game objects keyed by f'{kind}s' and then obj_id.
+
+    A world loaded from data can act as an immutable template: spawn() returns a
+    copy-on-write world for one session whose objects are created on first
+    access and only hold the fields that session mutated, every other read falls
+    through to the template. A world that has been spawned from must not be
+    played itself.
+
+    Every world has its own random stream, so sessions can be seeded and
+    replayed independently of each other.
+
+    Every touch() bumps the version of the object, text rendered from an
+    object's mutable fields is cached in rendered under that version.
+
+    linked maps handles straight to objects. The world compiler fills it for a
+    template, a spawned world fills it as its objects are first resolved.
+
+    problems holds the warnings the world compiler found in a template, and
+    its errors when it was loaded without strict.
+    """
+    def __init__(self, *args, template: 'World' = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.template = template
+        self.observer = None
+        self.cache: dict[str, any] = {}
+        self.rng = random.Random()
+        self.versions: dict[int, int] = {}
+        self.rendered = RenderCache(capacity=64)
+        self.linked: dict[int, GameObject] = {}
+        self.problems: list = []
+        # Set on worlds whose objects are views over a StateStore
+        self.store = None
+        self.session = None
+
+    def resolve(self, handle: int) -> GameObject:
+        game_obj = self.linked.get(handle)
+        if game_obj is None:
+            game_obj = self[SECTIONS[handle & KIND_MASK]][handle >> KIND_BITS]
+            # Views over a StateStore are flyweights that are not meant to be kept
+            if self.store is None:
+                self.linked[handle] = game_obj
+        return game_obj
+
+    def touch(self, handle: int) -> None:
+        self.versions[handle] = self.versions.get(handle, 0) + 1
+        if self.observer is not None:
+            self.observer(handle)
+
+    def invalidate(self, handle: int) -> None:
+        """Bumps the version of an object without notifying the observer."""
+        self.versions[handle] = self.versions.get(handle, 0) + 1
+
+    def version(self, handle: int) -> int:
+        return self.versions.get(handle, 0)
+
+    def names(self) -> list[str]:
+        """Names of every object a player can refer to."""
+        return [game_obj.name for object_type, objects in self.items() if object_type != 'events' for game_obj in objects.values()]
+
+    def shared(self, name: str, factory: callable) -> any:
+        """Returns a value shared by every session of the template, building it on first use.
+
+        Args:
+            name (str): Cache key of the value.
+            factory (callable): Builds the value from the template world.
+
+        Returns:
+            any: The shared value.
+        """
+        owner = self.template if self.template is not None else self
+        if name not in owner.cache:
+            owner.cache[name] = factory(owner)
+        return owner.cache[name]
+
+    def spawn(self) -> 'World':
+        """Creates a copy-on-write world for a new session.
+
+        Returns:
+            World: World whose objects overlay the objects of this one.
+        """
+        world = World(template=self)
+        for object_type, templates in self.items():
+            world[object_type] = OverlayObjects(world, templates)
+        return world
+
+
+class OverlayObjects(Mapping):
+    """Objects of one kind in a spawned world, created from their template on first access."""
+    def __init__(self, world: World, templates: Mapping) -> None:
+        self.world = world
+        self.templates = templates
+        self.objects: dict[int, GameObject] = {}
+
+    def __getitem__(self, obj_id: int) -> GameObject:
+        game_obj = self.objects.get(obj_id)
+        if game_obj is None:
+            game_obj = self.spawn(self.templates[obj_id])
+            self.objects[obj_id] = game_obj
+        return game_obj
+
+    def spawn(self, template: GameObject) -> GameObject:
+        return template.spawn(self.world)
+
+    def __contains__(self, obj_id: int) -> bool:
+        return obj_id in self.templates
+
+    def __iter__(self):
+        return iter(self.templates)
+
+    def __len__(self) -> int:
+        return len(self.templates)
@@ -0,0 +1,240 @@
+#imports
+from app.container import Container
+from app.event import Event
+from app.event_scheduler import EventIndex, MAX_ROUNDS
+from app.game_object import GameObject
+from app.handle import SECTIONS, KIND_MASK, unpack
+from app.intractable import Intractable
+from app.transition import Transition
+from app.world import World
+
+EVENT_STATES = ('active', 'inactive')
+INVENTORY_CHANGES = ('item', 'no_item')
+# Kinds take can move into an inventory, every kind with objects except location, event, transition, npc and player
+PORTABLE_KINDS = ('item', 'container', 'journal')
+
+
+class Problem:
+    """A broken reference or state name found by the compiler."""
+    __slots__ = ('severity', 'where', 'message')
+
+    def __init__(self, severity: str, where: str, message: str) -> None:
+        self.severity = severity
+        self.where = where
+        self.message = message
+
+    def __str__(self) -> str:
+        return f'{self.severity}: {self.where}: {self.message}'
+
+
+class WorldError(Exception):
+    """Raised when a world has references the game would trip over during play."""
+    def __init__(self, problems: list[Problem]) -> None:
+        super().__init__('\n'.join(str(problem) for problem in problems))
+        self.problems = problems
+
+
+class WorldCompiler:
+    """Checks every reference and state name of a loaded world before it is played.
+
+    Errors would surface as a KeyError or a missing text during play. Data the
+    game silently ignores, such as a blocking state the transition can never
+    be in, is a warning, and so is every problem of an event that starts
+    inactive and that no event can activate, such events never run. Events
+    that activate or deactivate each other in a cycle are a warning too, a
+    turn stops settling them after MAX_ROUNDS passes.
+    """
+    def __init__(self, world: World) -> None:
+        """Initializes the WorldCompiler class.
+
+        Args:
+            world (World): Template world straight from the loader.
+        """
+        self.world = world
+        self.problems: list[Problem] = []
+        self.dormant: set[int] = set()
+
+    def check(self) -> list[Problem]:
+        """Checks the whole world.
+
+        Returns:
+            list[Problem]: Every problem found, errors and warnings in object order.
+        """
+        self.problems = []
+        self.dormant = self.dormant_events()
+        if 0 not in self.world.get('players', {}):
+            self.problems.append(Problem('error', 'world', 'there is no player 0'))
+        if 1 not in self.world.get('locations', {}):
+            self.problems.append(Problem('error', 'world', 'there is no starting location 1'))
+        for objects in self.world.values():
+            for game_obj in objects.values():
+                if isinstance(game_obj, Event):
+                    self.check_event(game_obj)
+                else:
+                    if isinstance(game_obj, Intractable):
+                        self.check_intractable(game_obj)
+                    if isinstance(game_obj, Container):
+                        for handle in game_obj.inventory:
+                            self.reference(game_obj, handle, 'inventory', PORTABLE_KINDS)
+                    if hasattr(game_obj, 'entities'):
+                        for handle in game_obj.entities:
+                            self.reference(game_obj, handle, 'entities')
+        # Builds the event graph of the template once, at load time
+        index: EventIndex = self.world.shared('event_index', EventIndex)
+        for cycle in index.graph.control_cycles:
+            self.problems.append(Problem(
+                'warning', 'events',
+                f'events {", ".join(map(str, cycle))} activate each other in a cycle, a turn settles them in at most {MAX_ROUNDS} passes'
+            ))
+        return self.problems
+
+    def errors(self) -> list[Problem]:
+        return [problem for problem in self.problems if problem.severity == 'error']
+
+    def warnings(self) -> list[Problem]:
+        return [problem for problem in self.problems if problem.severity == 'warning']
+
+    def dormant_events(self) -> set[int]:
+        """Returns the handles of the events that start inactive and that no event activates."""
+        events = self.world.get('events', {})
+        activated = set()
+        for event in events.values():
+            if event.change.state == 'active':
+                activated.update(event.affected_objects)
+        return {event.handle for event in events.values() if event.state != 'active' and event.handle not in activated}
+
+    def report(self, game_obj: GameObject, message: str, event: Event = None, severity: str = 'error') -> None:
+        if event is not None and event.handle in self.dormant:
+            severity = 'warning'
+        self.problems.append(Problem(severity, f'{game_obj.kind} {game_obj.obj_id} {game_obj.name!r}', message))
+
+    def lookup(self, handle: int) -> GameObject:
+        """Returns the object a handle refers to, None if there is no such object."""
+        code = handle & KIND_MASK
+        if code >= len(SECTIONS):
+            return None
+        _, obj_id = unpack(handle)
+        objects = self.world.get(SECTIONS[code], {})
+        if obj_id not in objects:
+            return None
+        return objects[obj_id]
+
+    def reference(self, game_obj: GameObject, handle: int, field: str, kinds: tuple[str, ...] = None,
+                  event: Event = None) -> GameObject:
+        """Reports a reference to an object that does not exist or is not of the expected kind.
+
+        Args:
+            game_obj (GameObject): Object holding the reference.
+            handle (int): The reference.
+            field (str): Field of game_obj the reference is in, for the report.
+            kinds (tuple[str, ...], optional): Kinds the referenced object may be. Defaults to any kind.
+            event (Event, optional): Event the reference belongs to. Defaults to None.
+
+        Returns:
+            GameObject: The referenced object, None if it does not exist.
+        """
+        target = self.lookup(handle)
+        if target is None:
+            self.report(game_obj, f'{field} refers to {self.describe(handle)} which does not exist', event)
+        elif kinds is not None and target.kind not in kinds:
+            expected = [f"{'an' if kind[0] in 'aeiou' else 'a'} {kind}" for kind in kinds]
+            if len(expected) > 1:
+                expected = [', '.join(expected[:-1]), expected[-1]]
+            self.report(game_obj, f'{field} refers to {self.describe(handle)} which is not {" or ".join(expected)}', event)
+        return target
+
+    @staticmethod
+    def describe(handle: int) -> str:
+        if handle & KIND_MASK >= len(SECTIONS):
+            return f'kind code {handle & KIND_MASK}'
+        kind, obj_id = unpack(handle)
+        return f'{kind} {obj_id}'
+
+    def check_intractable(self, game_obj: Intractable) -> None:
+        states = game_obj.state_descriptions
+        if game_obj.state not in states:
+            self.report(game_obj, f'state {game_obj.state!r} has no state description')
+        for state in game_obj.state_list:
+            if state not in states:
+                self.report(game_obj, f'state_list entry {state!r} has no state description')
+            if state not in game_obj.state_transitions:
+                self.report(game_obj, f'state_list entry {state!r} has no state transition')
+        if game_obj.key is not None:
+            self.reference(game_obj, game_obj.key, 'key_info.key', ('item',))
+            if game_obj.key_state not in states:
+                self.report(game_obj, f'key_info.state {game_obj.key_state!r} has no state description')
+        if isinstance(game_obj, Transition):
+            self.reference(game_obj, game_obj.target, 'target', ('location',))
+            for state in game_obj.blocking_states:
+                if state not in states:
+                    self.report(game_obj, f'blocking_states entry {state!r} has no state description', severity='warning')
+
+    def check_event(self, event: Event) -> None:
+        if event.state not in EVENT_STATES:
+            self.report(event, f'state {event.state!r} is not one of {EVENT_STATES}', event)
+        for trigger in event.triggers:
+            trigger_obj = self.reference(event, trigger.object, 'trigger object', event=event)
+            state_conditions = trigger.conditions.get('state') or {}
+            if isinstance(trigger_obj, (Intractable, Event)):
+                for test, state in state_conditions.items():
+                    self.check_state(event, trigger_obj, state, f'state condition {test!r}')
+            inventory_conditions = trigger.conditions.get('inventory') or {}
+            if inventory_conditions and trigger_obj is not None and not isinstance(trigger_obj, Container):
+                self.report(event, f'inventory condition on {self.describe(trigger.object)} which has no inventory', event)
+            for test, handles in inventory_conditions.items():
+                if test not in INVENTORY_CHANGES:
+                    self.report(event, f'inventory condition {test!r} is not one of {INVENTORY_CHANGES}', event, 'warning')
+                for handle in handles:
+                    self.reference(event, handle, f'inventory condition {test!r}', PORTABLE_KINDS, event)
+            location_conditions = trigger.conditions.get('current_location') or {}
+            for test, location in location_conditions.items():
+                if location not in self.world.get('locations', {}):
+                    self.report(event, f'current_location condition {test!r} names location {location} which does not exist', event)
+
+        change = event.change
+        for handle in event.affected_objects:
+            affected = self.reference(event, handle, 'affected object', event=event)
+            if affected is None:
+                continue
+            if change.state is not None and isinstance(affected, (Intractable, Event)):
+                self.check_state(event, affected, change.state, 'change.state')
+            if change.inventory and not isinstance(affected, Container):
+                self.report(event, f'inventory change on {self.describe(handle)} which has no inventory', event)
+        for key, handles in (change.inventory or {}).items():
+            if key not in INVENTORY_CHANGES:
+                self.report(event, f'inventory change {key!r} is not one of {INVENTORY_CHANGES}', event, 'warning')
+            for handle in handles:
+                self.reference(event, handle, f'inventory change {key!r}', PORTABLE_KINDS, event)
+
+    def check_state(self, event: Event, game_obj: GameObject, state: str, field: str) -> None:
+        """Reports a state name the object can never be in."""
+        states = EVENT_STATES if isinstance(game_obj, Event) else game_obj.state_descriptions
+        if state not in states:
+            self.report(event, f'{field} {state!r} is not a state of {game_obj.kind} {game_obj.obj_id}', event)
+
+    def link(self) -> None:
+        """Fills the world's flat handle table, so every resolve() is a single lookup."""
+        for objects in self.world.values():
+            for game_obj in objects.values():
+                self.world.linked[game_obj.handle] = game_obj
+
+
+def compile_world(world: World, strict: bool = True) -> list[Problem]:
+    """Checks a world and links its references to the objects they refer to.
+
+    Args:
+        world (World): Template world straight from the loader.
+        strict (bool, optional): Raise WorldError when there are errors. Defaults to True.
+
+    Returns:
+        list[Problem]: Warnings, and the errors when not strict.
+
+    Raises:
+        WorldError: If strict and a reference or state name is broken.
+    """
+    compiler = WorldCompiler(world)
+    compiler.check()
+    if strict and compiler.errors():
+        raise WorldError(compiler.errors())
+    compiler.link()
+    return compiler.problems
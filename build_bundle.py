@@ -0,0 +1,28 @@
+#! /usr/bin/env python3
+#imports
+import argparse
+import os
+import sys
+from app.bundle import Bundle, build_bundle
+from app.loader import DATA_DIR
+from app.world_compiler import WorldError
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the data directory into a memory-mappable world bundle.")
+    parser.add_argument("-d", "--data_dir", default=DATA_DIR, help="Directory holding the data files (default ./data).")
+    parser.add_argument("-o", "--output_file", help="Path of the bundle (default world.bundle in the data directory).")
+    args = parser.parse_args()
+
+    try:
+        bundle_path = build_bundle(os.path.abspath(args.data_dir), args.output_file)
+    except WorldError as error:
+        for problem in error.problems:
+            print(problem, file=sys.stderr)
+        sys.exit(1)
+    for problem in Bundle(bundle_path).problems:
+        print(problem, file=sys.stderr)
+    print(f"Compiled {args.data_dir} to {bundle_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#! /usr/bin/env python3
+#imports
+import argparse
+import os
+import sys
+import time
+from app.content import ContentBuild
+from app.loader import DATA_DIR
+
+
+def run(build: ContentBuild) -> bool:
+    """Builds once and prints what happened, returns whether the content is usable."""
+    start = time.perf_counter()
+    built, problems = build.build()
+    for source in built:
+        print(f"Converted {source}")
+    for source, errors in problems.items():
+        for error in errors:
+            print(f"{source}: {error}", file=sys.stderr)
+    if built or problems:
+        print(f"{len(built)} converted, {len(problems)} with problems in {(time.perf_counter() - start) * 1000:.0f} ms")
+    else:
+        print("Up to date")
+    return not problems
+
+
+def snapshot(data_dir: str) -> dict[str, tuple[int, int]]:
+    # Size and mtime of every source, a cheap way to notice a save
+    snapshot = {}
+    for name in os.listdir(data_dir):
+        if name.endswith('.yaml'):
+            stat = os.stat(os.path.join(data_dir, name))
+            snapshot[name] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the YAML sources in the data directory to JSON, only the ones that changed.")
+    parser.add_argument("-d", "--data_dir", default=DATA_DIR, help="Directory holding the data files (default ./data).")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes (default the number of CPUs).")
+    parser.add_argument("--wrap", type=int, help="Rewrap every string to lines of at most this many characters, like linebreaker.py.")
+    parser.add_argument("-f", "--force", action="store_true", help="Convert every source, ignoring the manifest.")
+    parser.add_argument("-w", "--watch", action="store_true", help="Keep running and rebuild whenever a source is saved.")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between checks in watch mode (default 0.5).")
+    args = parser.parse_args()
+
+    data_dir = os.path.abspath(args.data_dir)
+    build = ContentBuild(data_dir, args.jobs, args.wrap)
+    if args.force:
+        build.manifest['files'] = {}
+    ok = run(build)
+    if not args.watch:
+        sys.exit(0 if ok else 1)
+
+    print(f"Watching {data_dir}, press Ctrl+C to stop")
+    seen = snapshot(data_dir)
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = snapshot(data_dir)
+            if current != seen:
+                seen = current
+                run(build)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
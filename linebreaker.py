@@ -1,35 +1,7 @@
 import argparse
 import yaml
 import os
-
-def add_newlines_to_strings(data, max_line_length=200):
-    if isinstance(data, dict):
-        for key, value in data.items():
-            data[key] = add_newlines_to_strings(value, max_line_length)
-    elif isinstance(data, list):
-        for i, item in enumerate(data):
-            data[i] = add_newlines_to_strings(item, max_line_length)
-    elif isinstance(data, str):
-        # Replace '\\n' with a space and '\n' with a space
-        data = data.replace('\\n', ' ').replace('\n', ' ')
-
-        # Split the string into words and format with newlines
-        words = data.split()
-        lines = []
-        current_line = []  # Store lines as a list
-
-        for word in words:
-            if len(' '.join(current_line + [word])) <= max_line_length:
-                current_line.append(word)
-            else:
-                lines.append(' '.join(current_line))
-                current_line = [word]
-
-        if current_line:
-            lines.append(' '.join(current_line))
-
-        return '\\n'.join(lines)
-    return data
+from app.content import add_newlines_to_strings
 
 def main():
     parser = argparse.ArgumentParser(description="Process a YAML file and add newlines to string values.")
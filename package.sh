@@ -8,6 +8,10 @@ stranded_file="stranded.py"
 stranded_shell_file="stranded.sh"
 archive_name="stranded.tar"
 
+# Convert the YAML sources that changed, then compile the world bundle so the game starts from a memory map
+python3 build_content.py || exit 1
+python3 build_bundle.py
+
 # Ensure the deploy directory exists
 mkdir -p "$deploy_directory/app"
 mkdir -p "$deploy_directory/data"
@@ -19,6 +23,7 @@ cp -r "$app_directory"/* "$deploy_directory/app"
 cp -r "$data_directory"/*.txt "$deploy_directory/data"
 cp -r "$data_directory"/*.json "$deploy_directory/data"
 cp -r "$data_directory"/*.mp3 "$deploy_directory/data"
+cp "$data_directory"/world.bundle "$deploy_directory/data"
 
 # Copy stranded.py and stranded.sh from the current directory
 cp "$stranded_file" "$deploy_directory"
@@ -0,0 +1,176 @@
+#! /usr/bin/env python3
+#imports
+import argparse
+import json
+import sys
+import time
+from types import SimpleNamespace
+from app.game_session import GameSession
+from app.loader import load_world
+from app.state_store import StateStore
+
+STAGES = ['parse', 'action', 'events', 'render']
+
+
+def read_transcript(path: str) -> list[str]:
+    """Reads one command per line, lines starting with # are comments."""
+    with open(path, 'r', encoding='utf-8') as transcript_file:
+        return [line.rstrip('\n') for line in transcript_file if not line.startswith('#')]
+
+
+def percentile(samples: list[int], fraction: float) -> int:
+    # Nearest rank on sorted samples
+    if not samples:
+        return 0
+    rank = max(0, min(len(samples) - 1, round(fraction * len(samples) + 0.5) - 1))
+    return samples[rank]
+
+
+class StageTimer:
+    """Accumulates the time spent in each stage of the current turn."""
+    def __init__(self) -> None:
+        self.turn = dict.fromkeys(STAGES, 0)
+
+    def wrap(self, stage: str, func: callable) -> callable:
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.turn[stage] += time.perf_counter_ns() - start
+        return timed
+
+    def reset(self) -> None:
+        for stage in STAGES:
+            self.turn[stage] = 0
+
+
+def instrument(session: GameSession, timer: StageTimer) -> None:
+    # Instance attributes shadow the methods, the parser is shared so it gets a per session stand-in
+    session.parser = SimpleNamespace(parse=timer.wrap('parse', session.parser.parse))
+    session.action_processor.process = timer.wrap('action', session.action_processor.process)
+    session.event_scheduler.process = timer.wrap('events', session.event_scheduler.process)
+
+
+def replay(data, world, commands: list[str], seed: int, timer: StageTimer = None,
+           state_store: StateStore = None) -> tuple[list[str], list[dict[str, int]]]:
+    """Plays a transcript in a new session spawned from the world.
+
+    Args:
+        data (dict[str, any]): Static game data.
+        world (World): Template world, every replay gets its own spawned copy.
+        commands (list[str]): Commands to play in order.
+        seed (int): Seed of the session's random stream.
+        timer (StageTimer, optional): Timer to instrument the session with. Defaults to None.
+        state_store (StateStore, optional): Store of the world to play in instead of a spawned copy. Defaults to None.
+
+    Returns:
+        tuple[list[str], list[dict[str, int]]]: Output of every turn and nanoseconds per stage of every turn.
+    """
+    if state_store is not None:
+        store_session = state_store.allocate()
+        session_world = state_store.world(store_session)
+    else:
+        session_world = world.spawn()
+    session_world.rng.seed(seed)
+    session = GameSession(data, session_world)
+    if timer is not None:
+        instrument(session, timer)
+
+    outputs = [session.render().text]
+    turns = []
+    for command in commands:
+        if timer is not None:
+            timer.reset()
+        start = time.perf_counter_ns()
+        result = session.step(command)
+        total = time.perf_counter_ns() - start
+        outputs.append(f'> {command}\n{result.scene} | {result.status}\n{result.text}')
+        if timer is not None:
+            turn = dict(timer.turn)
+            turn['render'] = total - turn['parse'] - turn['action'] - turn['events']
+            turn['total'] = total
+            turns.append(turn)
+        if result.quit:
+            break
+    if state_store is not None:
+        state_store.release(store_session)
+    return outputs, turns
+
+
+def report(turns: list[dict[str, int]], elapsed: int) -> dict[str, any]:
+    summary = {'turns': len(turns), 'commands_per_sec': len(turns) / (elapsed / 1e9) if elapsed else 0.0}
+    for stage in STAGES + ['total']:
+        samples = sorted(turn[stage] for turn in turns)
+        summary[stage] = {
+            'p50_us': percentile(samples, 0.50) / 1000,
+            'p95_us': percentile(samples, 0.95) / 1000,
+            'p99_us': percentile(samples, 0.99) / 1000,
+            'share': sum(samples) / max(1, sum(turn['total'] for turn in turns)),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay command transcripts headlessly and benchmark the engine.")
+    parser.add_argument("transcripts", nargs='+', help="Transcript files, one command per line.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Seed of every session's random stream (default 0).")
+    parser.add_argument("-n", "--repeat", type=int, default=20, help="Timed replays of each transcript (default 20).")
+    parser.add_argument("-w", "--warmup", type=int, default=2, help="Untimed replays before measuring (default 2).")
+    parser.add_argument("--record", help="Write the output of the first transcript to this file.")
+    parser.add_argument("--check", help="Compare the output of the first transcript to this recorded file.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("--state-store", action="store_true", help="Play in a columnar StateStore instead of spawned worlds.")
+    args = parser.parse_args()
+
+    data, world = load_world()
+    state_store = world.shared('state_store', StateStore) if args.state_store else None
+    status = 0
+    results = {}
+    for index, path in enumerate(args.transcripts):
+        commands = read_transcript(path)
+        outputs, _ = replay(data, world, commands, args.seed, state_store=state_store)
+        output = '\n'.join(outputs) + '\n'
+        # Replays with the same seed must not diverge, otherwise the timings compare different games
+        for _ in range(args.warmup):
+            if '\n'.join(replay(data, world, commands, args.seed, state_store=state_store)[0]) + '\n' != output:
+                print(f"{path}: replay is not deterministic", file=sys.stderr)
+                status = 1
+                break
+
+        if index == 0 and args.record:
+            with open(args.record, 'w', encoding='utf-8') as record_file:
+                record_file.write(output)
+        if index == 0 and args.check:
+            with open(args.check, 'r', encoding='utf-8') as check_file:
+                expected = check_file.read()
+            if expected != output:
+                for turn, (old, new) in enumerate(zip(expected.split('\n> '), output.split('\n> '))):
+                    if old != new:
+                        print(f"{path}: output differs from {args.check} at turn {turn}", file=sys.stderr)
+                        break
+                else:
+                    print(f"{path}: output length differs from {args.check}", file=sys.stderr)
+                status = 1
+
+        timer = StageTimer()
+        turns = []
+        start = time.perf_counter_ns()
+        for _ in range(args.repeat):
+            turns.extend(replay(data, world, commands, args.seed, timer, state_store)[1])
+        elapsed = time.perf_counter_ns() - start
+        results[path] = report(turns, elapsed)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for path, summary in results.items():
+            print(f"{path}: {summary['turns']} turns, {summary['commands_per_sec']:.0f} commands/sec")
+            print(f"  {'stage':<8}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'share':>8}")
+            for stage in STAGES + ['total']:
+                line = summary[stage]
+                print(f"  {stage:<8}{line['p50_us']:>10.1f}{line['p95_us']:>10.1f}{line['p99_us']:>10.1f}{line['share']:>8.1%}")
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
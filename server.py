@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+#imports
+import argparse
+import asyncio
+import signal
+import sys
+from app.loader import load_world
+from app.session_server import SessionServer
+from app.state_store import StateStore
+from app.batch_events import BatchEvents
+from app.metrics import Metrics
+from app.hot_reload import WorldReloader
+
+
+async def export_metrics(metrics: Metrics, path: str, interval: float) -> None:
+    # Rewrites the snapshot for a textfile collector or anything else polling the file
+    while True:
+        await asyncio.sleep(interval)
+        metrics.write(path)
+
+
+def reload(server: SessionServer) -> None:
+    print(server.reload(), file=sys.stderr, flush=True)
+
+
+async def watch_data(server: SessionServer, interval: float) -> None:
+    # Only the sizes and mtimes are read until a file was saved
+    while True:
+        await asyncio.sleep(interval)
+        if server.reloader.modified():
+            reload(server)
+
+
+async def serve(server: SessionServer, args: argparse.Namespace, metrics: Metrics) -> None:
+    if metrics is not None:
+        exporter = asyncio.create_task(export_metrics(metrics, args.metrics, args.metrics_interval))
+    if server.reloader is not None and hasattr(signal, 'SIGHUP'):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload, server)
+    if args.watch:
+        watcher = asyncio.create_task(watch_data(server, args.watch))
+    try:
+        if args.unix:
+            await server.serve_unix(args.unix)
+        else:
+            await server.serve_tcp(args.host, args.port)
+    finally:
+        if args.watch:
+            watcher.cancel()
+        if metrics is not None:
+            exporter.cancel()
+            metrics.write(args.metrics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many Stranded sessions over a line protocol.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=4000, help="TCP port to listen on (default 4000).")
+    parser.add_argument("--unix", help="Listen on this unix socket path instead of TCP.")
+    parser.add_argument("--max-sessions", type=int, default=100, help="Cap on concurrent sessions (default 100).")
+    parser.add_argument("--idle-timeout", type=float, default=600.0, help="Seconds before an idle session is closed (default 600).")
+    parser.add_argument("--state-store", action="store_true", help="Hold session state in a columnar store instead of per session objects.")
+    parser.add_argument("--batch-events", action="store_true", help="Evaluate the events of concurrent commands together with numpy, implies --state-store.")
+    parser.add_argument("--batch-window", type=float, default=0.005, help="Seconds to gather commands into one batch (default 0.005).")
+    parser.add_argument("--metrics", help="Collect turn metrics and write them to this path, JSON if it ends in .json and Prometheus text otherwise.")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, help="Seconds between metrics writes (default 15).")
+    parser.add_argument("--reload", action="store_true", help="Reload the data files that changed into every session on SIGHUP.")
+    parser.add_argument("--watch", nargs="?", type=float, const=1.0, metavar="SECONDS",
+                        help="Reload the data files whenever they are saved, checking every SECONDS (default 1), implies --reload.")
+    args = parser.parse_args()
+    if (args.reload or args.watch) and (args.state_store or args.batch_events):
+        parser.error("--reload and --watch can't be used with --state-store or --batch-events")
+
+    data, world = load_world()
+    state_store = world.shared('state_store', StateStore) if args.state_store or args.batch_events else None
+    batch_events = BatchEvents(state_store) if args.batch_events else None
+    metrics = Metrics() if args.metrics else None
+    reloader = WorldReloader(data, world) if args.reload or args.watch else None
+    server = SessionServer(data, world, max_sessions=args.max_sessions, idle_timeout=args.idle_timeout,
+                           state_store=state_store, batch_events=batch_events, batch_window=args.batch_window,
+                           metrics=metrics, reloader=reloader)
+    try:
+        asyncio.run(serve(server, args, metrics))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
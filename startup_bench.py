@@ -0,0 +1,62 @@
+#! /usr/bin/env python3
+#imports
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from app.startup import PHASES
+
+STRANDED = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stranded.py')
+
+
+def measure(extra_args: list[str]) -> dict[str, any]:
+    """Starts stranded.py in a fresh interpreter and returns its startup profile."""
+    completed = subprocess.run(
+        [sys.executable, STRANDED, '--profile-startup', 'json'] + extra_args,
+        capture_output=True, text=True, check=True
+    )
+    # Anything a library prints at import comes before the report, which is the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time to first frame of stranded.py against a budget.")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="Timed startups (default 5).")
+    parser.add_argument("-w", "--warmup", type=int, default=1, help="Untimed startups to warm the disk cache (default 1).")
+    parser.add_argument("-b", "--budget-ms", type=float, default=300.0, help="Largest median time to first frame (default 300).")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("stranded_args", nargs=argparse.REMAINDER, help="Arguments passed on to stranded.py.")
+    args = parser.parse_args()
+
+    for _ in range(args.warmup):
+        measure(args.stranded_args)
+    runs = [measure(args.stranded_args) for _ in range(args.runs)]
+
+    summary = {
+        phase: {
+            'median_ms': statistics.median(run[phase] for run in runs),
+            'max_ms': max(run[phase] for run in runs),
+        }
+        for phase in PHASES + ['other', 'first_frame']
+    }
+    summary['headless'] = any(run['headless'] for run in runs)
+    summary['budget_ms'] = args.budget_ms
+    over_budget = summary['first_frame']['median_ms'] > args.budget_ms
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"{args.runs} startups{' without a display' if summary['headless'] else ''}")
+        print(f"  {'phase':<18}{'median ms':>12}{'max ms':>10}")
+        for phase in PHASES + ['other', 'first_frame']:
+            print(f"  {phase:<18}{summary[phase]['median_ms']:>12.1f}{summary[phase]['max_ms']:>10.1f}")
+    if over_budget:
+        print(f"time to first frame {summary['first_frame']['median_ms']:.1f} ms is over the {args.budget_ms:.0f} ms budget",
+              file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#imports
+import os
+import shutil
+import pytest
+from app.bundle import Bundle, BundleWorld, build_bundle
+from app.game_session import GameSession
+from app.loader import DATA_DIR, load_data, load_game_objects, load_world
+from replay import read_transcript, replay
+
+COMMANDS = read_transcript('transcripts/walkthrough.txt')
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    copy = tmp_path / 'data'
+    shutil.copytree(DATA_DIR, copy, ignore=shutil.ignore_patterns('world.bundle'))
+    build_bundle(str(copy))
+    return str(copy)
+
+
+def test_a_bundle_plays_like_the_source_data(data_dir):
+    bundle = Bundle(os.path.join(data_dir, 'world.bundle'))
+    data = load_data(data_dir)
+    world = load_game_objects(data)
+    assert bundle.world().names() == world.names()
+    assert replay(bundle.data(), bundle.world(), COMMANDS, 0)[0] == replay(data, world, COMMANDS, 0)[0]
+
+
+def test_a_session_starts_without_building_every_object(data_dir):
+    bundle = Bundle(os.path.join(data_dir, 'world.bundle'))
+    world = bundle.world()
+    GameSession(bundle.data(), world.spawn())
+    assert all(not objects.objects for objects in world.values())
+
+
+def test_only_changed_contents_make_a_bundle_stale(data_dir):
+    bundle = Bundle(os.path.join(data_dir, 'world.bundle'))
+    source = os.path.join(data_dir, 'items.json')
+    assert not bundle.is_stale(data_dir)
+
+    # A checkout or copy gives the same contents a new mtime
+    os.utime(source)
+    assert not bundle.is_stale(data_dir)
+    assert isinstance(load_world(bundle.path, data_dir)[1], BundleWorld)
+
+    # An edit keeping the old mtime is still found
+    stat = os.stat(source)
+    with open(source, 'a', encoding='utf-8') as source_file:
+        source_file.write('\n')
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert bundle.is_stale(data_dir)
+    assert not isinstance(load_world(bundle.path, data_dir)[1], BundleWorld)
@@ -0,0 +1,52 @@
+#imports
+import pytest
+from app.event_handler import EventHandler
+from app.event_scheduler import EventScheduler
+from app.loader import load_data, load_game_objects
+from app.state_store import StateStore
+
+
+def event(obj_id: int, state: str, affected: list[int], change: str) -> dict:
+    return {
+        'obj_id': obj_id,
+        'name': f'Event {obj_id}',
+        'description': f'Event {obj_id} fires.',
+        'state': state,
+        'triggers': [{'object': {'kind': 'player', 'obj_id': 0}, 'conditions': {}}],
+        'affected_objects': [{'kind': 'event', 'obj_id': affected_id} for affected_id in affected],
+        'change': {'state': change},
+    }
+
+
+def control_cycle():
+    # 9001 activates 9002 and 9003, which deactivate and activate it again later in the same turn
+    data = load_data()
+    data['events'] += [
+        event(9001, 'active', [9002, 9003], 'active'),
+        event(9002, 'inactive', [9001], 'inactive'),
+        event(9003, 'inactive', [9001], 'active'),
+    ]
+    return load_game_objects(data)
+
+
+def test_an_event_fires_at_most_once_per_turn():
+    world = control_cycle()
+    scheduler = EventScheduler(world, EventHandler(world))
+    scheduler.watch()
+    for _ in range(3):
+        text = scheduler.process(1, False)
+        for obj_id in (9001, 9002, 9003):
+            assert text.count(f'Event {obj_id} fires.') == 1
+
+
+def test_a_batch_fires_an_event_at_most_once_per_turn():
+    pytest.importorskip('numpy')
+    from app.batch_events import BatchEvents
+    world = control_cycle()
+    store = StateStore(world)
+    batch = BatchEvents(store)
+    worlds = [store.world(store.allocate()) for _ in range(3)]
+    for _ in range(3):
+        for text in batch.evaluate(worlds, [1] * len(worlds)):
+            for obj_id in (9001, 9002, 9003):
+                assert text.count(f'Event {obj_id} fires.') == 1
@@ -0,0 +1,73 @@
+#imports
+import json
+import os
+import shutil
+import pytest
+from app.game_session import GameSession
+from app.handle import pack
+from app.hot_reload import ReloadError, WorldReloader
+from app.loader import DATA_DIR, load_data, load_game_objects
+
+FLAREGUN = pack('item', 102)
+SURVIVAL_KIT = pack('container', 101)
+COMPASS = pack('item', 101)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    copy = tmp_path / 'data'
+    shutil.copytree(DATA_DIR, copy, ignore=shutil.ignore_patterns('world.bundle'))
+    return str(copy)
+
+
+def edit(data_dir: str, name: str, change: callable) -> None:
+    path = os.path.join(data_dir, f'{name}.json')
+    with open(path, 'r', encoding='utf-8') as data_file:
+        records = json.load(data_file)
+    change(records)
+    with open(path, 'w', encoding='utf-8') as data_file:
+        json.dump(records, data_file)
+
+
+def started(data_dir: str) -> tuple[WorldReloader, GameSession]:
+    data = load_data(data_dir)
+    world = load_game_objects(data)
+    reloader = WorldReloader(data, world, data_dir)
+    session = GameSession(data, world.spawn())
+    reloader.attach(session)
+    for command in ('start', 'x', 'take survivalKit', 'take flaregun'):
+        session.step(command)
+    return reloader, session
+
+
+def test_a_reload_rebases_sessions_and_prunes_deleted_objects(data_dir):
+    reloader, session = started(data_dir)
+    edit(data_dir, 'items', lambda items: items.remove(next(item for item in items if item['obj_id'] == 102)))
+    edit(data_dir, 'locations', lambda locations: locations[0]['entities'].remove({'kind': 'item', 'obj_id': 102}))
+    edit(data_dir, 'containers', lambda containers: containers[0].update(description='A reloaded kit.'))
+
+    assert reloader.reload() == ['locations.json', 'items.json', 'containers.json']
+    world = session.game_objects
+    # The player's inventory was not reloaded, the deleted flaregun is pruned from it
+    assert list(world['players'][0].inventory) == [SURVIVAL_KIT]
+    # The kit is a new object with the new description and the state it had in the session
+    kit = world.resolve(SURVIVAL_KIT)
+    assert kit._template is reloader.world['containers'][101]
+    assert kit.render_description() == 'A reloaded kit.\n'
+    assert list(kit.inventory) == [COMPASS]
+    # The session had taken the kit, the reloaded location keeps that
+    assert SURVIVAL_KIT not in world['locations'][1].entities
+    assert FLAREGUN not in world['locations'][1].entities
+    assert 'survivalKit' in session.step('inventory').text
+
+
+def test_a_broken_reload_leaves_the_world_as_it_was(data_dir):
+    reloader, session = started(data_dir)
+    template = reloader.world['items']
+    # The location still holds the flaregun
+    edit(data_dir, 'items', lambda items: items.remove(next(item for item in items if item['obj_id'] == 102)))
+
+    with pytest.raises(ReloadError, match='item 102'):
+        reloader.reload()
+    assert reloader.world['items'] is template
+    assert list(session.game_objects['players'][0].inventory) == [SURVIVAL_KIT, FLAREGUN]
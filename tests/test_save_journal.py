@@ -0,0 +1,47 @@
+#imports
+from app.game_session import GameSession
+from app.loader import load_data, load_game_objects
+from app.save_journal import SaveJournal
+from replay import read_transcript
+
+COMMANDS = read_transcript('transcripts/walkthrough.txt')
+
+
+def new_session(data, save_journal: SaveJournal = None) -> GameSession:
+    world = load_game_objects(data)
+    world.rng.seed(1)
+    return GameSession(data, world, save_journal=save_journal)
+
+
+def saved_state(session: GameSession) -> tuple[dict, dict]:
+    objects = {handle: session.game_objects.resolve(handle).snapshot() for handle in session.game_objects.linked}
+    game_state = {key: value for key, value in session.game_state.items() if key not in ('user_command', 'previous_text')}
+    return objects, game_state
+
+
+def test_turns_after_a_torn_line_survive_the_next_resume(tmp_path):
+    data = load_data()
+    crash = len(COMMANDS) // 3
+    save_path = str(tmp_path / 'game')
+
+    reference = new_session(data)
+    for command in COMMANDS:
+        reference.step(command)
+
+    journal = SaveJournal(save_path)
+    session = new_session(data, journal)
+    for command in COMMANDS[:crash]:
+        session.step(command)
+    journal.close()
+    with open(journal.log_path, 'a', encoding='utf-8') as log_file:
+        log_file.write('{"turn": 999, "objects": [[')
+
+    journal = SaveJournal(save_path)
+    session = new_session(data, journal)
+    for command in COMMANDS[crash:]:
+        session.step(command)
+    journal.close()
+
+    resumed = new_session(data, SaveJournal(save_path))
+    assert resumed.game_state['current_location'] == reference.game_state['current_location']
+    assert saved_state(resumed) == saved_state(reference)
@@ -0,0 +1,82 @@
+#imports
+import asyncio
+from app.loader import load_data, load_game_objects
+from app.session_server import SessionServer
+
+
+async def read_frame(reader: asyncio.StreamReader) -> list[str]:
+    lines = []
+    while True:
+        line = (await asyncio.wait_for(reader.readline(), 5)).decode('utf-8').rstrip('\n')
+        if line == '.':
+            return lines
+        lines.append(line)
+
+
+def serve(server: SessionServer, client: callable):
+    async def run():
+        listener = await asyncio.start_server(server.handle_client, '127.0.0.1', 0, limit=server.max_line)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await client(lambda: asyncio.open_connection('127.0.0.1', port))
+        finally:
+            listener.close()
+            await listener.wait_closed()
+    return asyncio.run(run())
+
+
+def new_server(**kwargs) -> SessionServer:
+    data = load_data()
+    return SessionServer(data, load_game_objects(data), **kwargs)
+
+
+def test_a_connection_above_max_sessions_is_turned_away():
+    server = new_server(max_sessions=1)
+
+    async def client(connect):
+        first_reader, first_writer = await connect()
+        assert (await read_frame(first_reader))[0].startswith('status: ')
+        second_reader, second_writer = await connect()
+        frame = await read_frame(second_reader)
+        assert frame[0] == 'status: full'
+        assert await second_reader.read() == b''
+        # The first session still plays
+        first_writer.write(b'help\n')
+        assert not (await read_frame(first_reader))[0].startswith('status: full')
+        first_writer.close()
+        second_writer.close()
+
+    serve(server, client)
+
+
+def test_an_idle_connection_is_closed():
+    server = new_server(idle_timeout=0.1)
+
+    async def client(connect):
+        reader, writer = await connect()
+        await read_frame(reader)
+        assert (await read_frame(reader))[0] == 'status: idle'
+        assert await reader.read() == b''
+        writer.close()
+        # The slot is freed for the next client
+        for _ in range(50):
+            if not server.active:
+                break
+            await asyncio.sleep(0.01)
+        assert server.active == 0
+
+    serve(server, client)
+
+
+def test_a_line_longer_than_max_line_is_refused():
+    server = new_server(max_line=64)
+
+    async def client(connect):
+        reader, writer = await connect()
+        await read_frame(reader)
+        writer.write(b'x' * 200 + b'\n')
+        assert (await read_frame(reader))[0] == 'status: error'
+        assert await reader.read() == b''
+        writer.close()
+
+    serve(server, client)
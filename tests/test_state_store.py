@@ -0,0 +1,51 @@
+#imports
+from app.loader import load_data, load_game_objects
+from app.state_store import StateStore
+from replay import read_transcript, replay
+
+COMMANDS = read_transcript('transcripts/walkthrough.txt')
+
+
+def test_a_store_session_replays_like_an_overlay_session():
+    data = load_data()
+    world = load_game_objects(data)
+    store = StateStore(world)
+    expected, _ = replay(data, world, COMMANDS, 0)
+    assert replay(data, world, COMMANDS, 0, state_store=store)[0] == expected
+    # The released session is reset for the next one
+    assert replay(data, world, COMMANDS, 0, state_store=store)[0] == expected
+
+
+def test_members_held_by_two_owners_survive_a_snapshot():
+    world = load_game_objects(load_data())
+    store = StateStore(world)
+    session = store.allocate()
+    player, location = world['players'][0].handle, world['locations'][1].handle
+    members = store.members(session, location)
+    item = members[0]
+    store.add_member(session, player, item)
+    store.add_member(session, location, members[-1])
+    expected = {owner: store.members(session, owner) for owner in (player, location)}
+    assert expected[player][-1] == item and item in expected[location]
+
+    blob = store.snapshot(session)
+    other = store.allocate()
+    store.restore(other, blob)
+    assert {owner: store.members(other, owner) for owner in (player, location)} == expected
+    store.remove_member(other, location, item)
+    assert store.has_member(other, player, item) and not store.has_member(other, location, item)
+    assert store.members(session, location) == expected[location]
+
+
+def test_the_name_index_of_an_owner_is_kept_in_step():
+    world = load_game_objects(load_data())
+    store = StateStore(world)
+    session_world = store.world(store.allocate())
+    location = session_world['locations'][1]
+    player = session_world['players'][0]
+    index = location.index
+    assert session_world['locations'][1].index is index
+    entity = session_world.resolve(store.members(session_world.session, location.handle)[0])
+    player.add_item(location.remove_entity(entity))
+    assert session_world['locations'][1].index is index
+    assert index.find(entity.name) is None and player.index.find(entity.name) == entity
@@ -0,0 +1,41 @@
+#imports
+import pytest
+from app.handle import unpack
+from app.loader import load_data, load_game_objects
+from app.world_compiler import WorldError
+
+
+def test_containers_and_journals_can_be_carried():
+    data = load_data()
+    data['players'][0]['inventory'] = [{'kind': 'journal', 'obj_id': 1}, {'kind': 'container', 'obj_id': 101}]
+    data['events'].append({
+        'obj_id': 9001,
+        'name': 'Reads the journal',
+        'description': 'You pack the journal away.',
+        'state': 'active',
+        'triggers': [{'object': {'kind': 'player', 'obj_id': 0},
+                      'conditions': {'inventory': {'item': [{'kind': 'journal', 'obj_id': 1}]}}}],
+        'affected_objects': [{'kind': 'player', 'obj_id': 0}],
+        'change': {'inventory': {'no_item': [{'kind': 'container', 'obj_id': 101}]}},
+    })
+    world = load_game_objects(data)
+    assert [unpack(handle) for handle in world['players'][0].inventory] == [('journal', 1), ('container', 101)]
+
+
+def test_a_location_can_not_be_carried():
+    data = load_data()
+    data['players'][0]['inventory'] = [{'kind': 'location', 'obj_id': 1}]
+    with pytest.raises(WorldError, match='which is not an item, a container or a journal'):
+        load_game_objects(data)
+
+
+def test_warnings_are_kept_on_the_world():
+    data = load_data()
+    data['events'] += [
+        {'obj_id': obj_id, 'name': f'Event {obj_id}', 'description': '', 'state': 'active',
+         'triggers': [{'object': {'kind': 'player', 'obj_id': 0}, 'conditions': {}}],
+         'affected_objects': [{'kind': 'event', 'obj_id': other}], 'change': {'state': 'active'}}
+        for obj_id, other in ((9001, 9002), (9002, 9001))
+    ]
+    world = load_game_objects(data)
+    assert any(problem.severity == 'warning' and 'events 9001, 9002 activate each other' in problem.message for problem in world.problems)